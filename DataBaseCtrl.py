@@ -2,16 +2,55 @@ import pandas as pd
 import numpy as np
 import pyodbc
 from pyodbc import Connection, Cursor
-from typing import List,Dict,Any,Union,Optional
+from typing import List,Dict,Any,Tuple,Union,Optional,Callable,NamedTuple,Iterator
 import os
 from enum import Enum
 from decimal import Decimal
 from datetime import datetime,date,time
+from time import perf_counter
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import json
+import hashlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+import inspect
 
 wild_card = str.maketrans({'*':'%'})
 """Wilde Card Translate"""
+quote_escape = str.maketrans({"'":"''"})
+"""文字列リテラル内のシングルクォートのエスケープ（''に重ねる）"""
 max_colmun_length:int = 127
 """Update SQLで1回コマンドの最大列数""" #これよりも長い場合SQLコマンドを分割する。
+max_colmun_len_ins:int = 255
+"""Insert SQLで1回コマンドの最大列数""" #Accessが扱える最大値
+max_batch_rows:int = 1000
+"""executemanyで1回に送る最大行数"""
+max_in_list:int = 500
+"""IN (...)で1回に指定する最大ID数"""
+max_sql_length:int = 64000
+"""AccessのSQL文の最大文字数"""
+default_chunk_rows:int = 10000
+"""分割読み込みで1回にfetchする行数"""
+default_cache_entries:int = 128
+"""ダイレクトモードの検索結果キャッシュの最大件数"""
+default_cache_ttl:float = 5.0
+"""ダイレクトモードの検索結果キャッシュの有効時間[s]"""
+default_pool_idle:int = 4
+"""接続プールにデータベースファイル毎に保持する使われていない接続の最大数"""
+default_pool_max_open:Optional[int] = None
+"""接続プールがデータベースファイル毎に貸し出す接続の最大数、Noneで制限なし"""
+default_pool_idle_timeout:float = 60.0
+"""接続プールで使われない接続を閉じるまでの時間[s]"""
+snapshot_version:int = 1
+"""スナップショットの形式のバージョン"""
+default_async_workers:int = 4
+"""AsyncDataBaseCtrlのワーカースレッド数（ダイレクトモード）"""
+default_load_workers:int = 4
+"""LoadTables()で同時に読み込むテーブル数"""
 
 class Error(Enum):
     """エラーコード"""        
@@ -37,6 +76,10 @@ class Error(Enum):
     """SQLでSELECTの条件エラー"""
     DATA_NOT_UNIQUE_BY_ID = 10
     """データがIDに対して固有ではない"""
+    SQL_EXECUTE_ERR = 11
+    """SQLの実行に失敗した行がある"""
+    SNAPSHOT_MISMATCH = 12
+    """スナップショットが使えない（無い・壊れている・テーブルや列情報が違う）"""
     
 class SerchCondition(Enum):
     """検索条件"""
@@ -142,25 +185,1053 @@ Access_dtype_py:Dict[AccessDataType,Optional[type]] = {
 }
 """Access data type dict to python data type """
 
+Access_dtype_literal:Dict[AccessDataType,Optional[Callable[[Any],str]]] = {
+    AccessDataType.CHAR:lambda val: f"'{str(val).translate(quote_escape)}'",
+    AccessDataType.VARCHAR:lambda val: f"'{str(val).translate(quote_escape)}'",
+    AccessDataType.MEMO:lambda val: f"'{str(val).translate(quote_escape)}'",
+    AccessDataType.BYTE:lambda val: f"{val}",
+    AccessDataType.INTEGER:lambda val: f"{val}",
+    AccessDataType.LONG:lambda val: f"{val}",
+    AccessDataType.SINGLE:lambda val: f"{val}",
+    AccessDataType.DOUBLE:lambda val: f"{val}",
+    AccessDataType.CURRENCY:lambda val: f"{val}",
+    AccessDataType.DECIMAL:None,
+    AccessDataType.AUTOINCREMENT:lambda val: f"{val}",
+    AccessDataType.DATE:lambda val: f"'{val.strftime('%Y/%m/%d')}'",
+    AccessDataType.TIME:lambda val: f"'{val.strftime('%H:%M:%S')}'",
+    AccessDataType.DATETIME:lambda val: f"'{val.strftime('%Y/%m/%d %H:%M:%S')}'",
+    AccessDataType.TIMESTAMP:lambda val: f"'{val}'",
+    AccessDataType.YESNO:lambda val: "1" if val else "0",
+    AccessDataType.OLEOBJECT:lambda val: f"{val}",
+    AccessDataType.HYPERLINK:None,
+    AccessDataType.GUID:lambda val: f"'{str(val).translate(quote_escape)}'",
+    AccessDataType.REAL:lambda val: f"{val}",
+    AccessDataType.VARBINARY:lambda val: f"'{val.strftime('%H:%M:%S.%f')}'",
+    AccessDataType.BIT:lambda val: "1" if val else "0"
+}
+"""Access data type dict to SQL literal formatter"""
+
+large_object_types:List[AccessDataType] = [AccessDataType.MEMO, AccessDataType.OLEOBJECT, AccessDataType.HYPERLINK]
+"""大きなデータの型（UpdateInternalDataFrame(lazy_large_objects=True)で読み込まない）"""
+
+class ColumnInfo(NamedTuple):
+    """列情報（列カタログの要素）"""
+    Name:str
+    """列名"""
+    DataType:Union[AccessDataType,str]
+    """Accessデータ型、未定義の型は型名の文字列"""
+    PyType:Optional[type]
+    """pythonデータ型"""
+    Ordinal:int
+    """列の位置(0～)"""
+    Literal:Optional[Callable[[Any],str]]
+    """SQLリテラル変換関数、Noneは使用不能な型"""
+
+class QueryOperator(Enum):
+    """検索クエリの演算"""
+    AND = 0
+    """全ての子クエリを満たす"""
+    OR = 1
+    """いずれかの子クエリを満たす"""
+    CONDITION = 2
+    """列の値の条件"""
+    IN = 3
+    """列の値が候補リストのいずれか"""
+
+class SerchQuery():
+    """複数条件の検索クエリ（AND/ORの入れ子が可能）
+    
+    Remarks:
+        q = SerchQuery.And(SerchQuery.Range("x",10,20), SerchQuery.Where("name",SerchCondition.StartWith,"A"))
+        q = SerchQuery.Where("x",SerchCondition.OrLargerThan,10) | SerchQuery.In("y",[1,2,3])
+        ダイレクトモードは1つのWHERE句、データフレームモードは1つのbool配列に変換して検索する。
+        データフレームモードもAccessと同じく文字列は大文字小文字を区別せずに比較し、日付(date)は0時の日時として比較する。
+    """
+    Operator:QueryOperator
+    """演算"""
+    Items:List['SerchQuery']
+    """子クエリ(AND/OR)"""
+    Column:Optional[str]
+    """列名(CONDITION/IN)"""
+    Condition:Optional[SerchCondition]
+    """検索条件(CONDITION)"""
+    Value:Any
+    """検索値(CONDITION)、候補リスト(IN)"""
+    
+    def __init__(self, Operator:QueryOperator, Items:Optional[List['SerchQuery']]=None,
+                 Column:Optional[str]=None, Condition:Optional[SerchCondition]=None, Value:Any=None) -> None:
+        """検索クエリ（コンストラクター）、通常はWhere/In/Range/And/Orで作る。"""
+        self.Operator = Operator
+        self.Items = list(Items) if Items != None else []
+        self.Column = Column
+        self.Condition = Condition
+        self.Value = Value
+    
+    @staticmethod
+    def Where(Column:str, Condition:SerchCondition, Value:Any) -> 'SerchQuery':
+        """列の値の条件"""
+        return SerchQuery(QueryOperator.CONDITION, Column=Column, Condition=Condition, Value=Value)
+    
+    @staticmethod
+    def In(Column:str, Values:List[Any]) -> 'SerchQuery':
+        """列の値が候補リストのいずれか"""
+        return SerchQuery(QueryOperator.IN, Column=Column, Value=list(Values))
+    
+    @staticmethod
+    def Range(Column:str, Low:Any=None, High:Any=None, LowInclusive:bool=True, HighInclusive:bool=False) -> 'SerchQuery':
+        """列の値の範囲、Noneの側は制限なし. Defaults to Low <= x < High."""
+        item_list:List[SerchQuery] = []
+        if(Low is not None):
+            item_list.append(SerchQuery.Where(Column, SerchCondition.OrLargerThan if LowInclusive else SerchCondition.LargerThan, Low))
+        if(High is not None):
+            item_list.append(SerchQuery.Where(Column, SerchCondition.OrSmallerThan if HighInclusive else SerchCondition.SmallerThan, High))
+        return SerchQuery(QueryOperator.AND, item_list)
+    
+    @staticmethod
+    def And(*Items:'SerchQuery') -> 'SerchQuery':
+        """全ての子クエリを満たす"""
+        return SerchQuery(QueryOperator.AND, list(Items))
+    
+    @staticmethod
+    def Or(*Items:'SerchQuery') -> 'SerchQuery':
+        """いずれかの子クエリを満たす"""
+        return SerchQuery(QueryOperator.OR, list(Items))
+    
+    def __and__(self, other:'SerchQuery') -> 'SerchQuery':
+        return SerchQuery.And(self, other)
+    
+    def __or__(self, other:'SerchQuery') -> 'SerchQuery':
+        return SerchQuery.Or(self, other)
+    
+    def Columns(self) -> List[str]:
+        """クエリで使う列名のリスト（子クエリを含む）"""
+        if(self.Operator in (QueryOperator.AND, QueryOperator.OR)):
+            return [col for item in self.Items for col in item.Columns()]
+        return [self.Column]
+    
+    def Validate(self, ColumnCatalog:Dict[str,'ColumnInfo']) -> Error:
+        """列名と検索値の型を確認する。
+
+        Args:
+            ColumnCatalog (Dict[str,ColumnInfo]): 列カタログ
+
+        Returns:
+            Error: エラーコード、問題なければError.NO_ERR
+        """
+        if(self.Operator in (QueryOperator.AND, QueryOperator.OR)):
+            for item in self.Items:
+                err = item.Validate(ColumnCatalog)
+                if(err != Error.NO_ERR):
+                    return err
+            return Error.NO_ERR
+        col_inf = ColumnCatalog.get(self.Column)
+        if(col_inf == None):
+            return Error.INVALID_COLUMN_NAME
+        if(self.Operator == QueryOperator.IN):
+            if(not(isinstance(self.Value,list))):
+                return Error.INVALID_INPUT
+            for val in self.Value:
+                if(not(self.__IsValueOfType(val, col_inf.PyType))):
+                    return Error.DATA_TYPE_MISMATCH
+            return Error.NO_ERR
+        if(not(self.__IsValueOfType(self.Value, col_inf.PyType))):
+            return Error.DATA_TYPE_MISMATCH
+        if(self.Condition in (SerchCondition.StartWith, SerchCondition.EndWith, SerchCondition.Contains) and col_inf.PyType != str):
+            return Error.SELECT_CONDITION_ERR
+        if(self.Condition != SerchCondition.Exact and col_inf.PyType == bool):
+            return Error.SELECT_CONDITION_ERR
+        return Error.NO_ERR
+    
+    def ToSQL(self) -> Tuple[str,List[Any]]:
+        """WHERE句(パラメータは?)とパラメータリストに変換する。
+
+        Returns:
+            Tuple[str,List[Any]]: WHERE句の条件式, パラメータリスト
+        """
+        if(self.Operator in (QueryOperator.AND, QueryOperator.OR)):
+            if(len(self.Items) < 1):
+                return ('1=1' if self.Operator == QueryOperator.AND else '1=0'), []
+            sql_list:List[str] = []
+            param_list:List[Any] = []
+            for item in self.Items:
+                item_sql, item_params = item.ToSQL()
+                sql_list.append(f'({item_sql})')
+                param_list.extend(item_params)
+            return (' AND ' if self.Operator == QueryOperator.AND else ' OR ').join(sql_list), param_list
+        if(self.Operator == QueryOperator.IN):
+            if(len(self.Value) < 1):
+                return '1=0', []
+            return f"{self.Column} IN ({', '.join(['?']*len(self.Value))})", list(self.Value)
+        if(self.Condition == SerchCondition.Exact):
+            return f'{self.Column} = ?', [self.Value]
+        if(self.Condition == SerchCondition.StartWith):
+            return f'{self.Column} LIKE ?', [f'{self.__LikeEscape(self.Value)}%']
+        if(self.Condition == SerchCondition.EndWith):
+            return f'{self.Column} LIKE ?', [f'%{self.__LikeEscape(self.Value)}']
+        if(self.Condition == SerchCondition.Contains):
+            return f'{self.Column} LIKE ?', [f'%{self.__LikeEscape(self.Value)}%']
+        operator_dict = {
+            SerchCondition.SmallerThan:'<',
+            SerchCondition.OrSmallerThan:'<=',
+            SerchCondition.LargerThan:'>',
+            SerchCondition.OrLargerThan:'>='}
+        return f'{self.Column} {operator_dict[self.Condition]} ?', [self.Value]
+    
+    def ToMask(self, df:pd.DataFrame) -> np.ndarray:
+        """データフレームの各行が条件を満たすかのbool配列に変換する。
+
+        Args:
+            df (pd.DataFrame): 検索するデータフレーム（インデックス名の列も検索できる）
+
+        Returns:
+            np.ndarray: bool配列、NULLは不一致
+        """
+        if(self.Operator in (QueryOperator.AND, QueryOperator.OR)):
+            mask = np.full(len(df), self.Operator == QueryOperator.AND, dtype=bool)
+            for item in self.Items:
+                if(self.Operator == QueryOperator.AND):
+                    mask &= item.ToMask(df)
+                else:
+                    mask |= item.ToMask(df)
+            return mask
+        if(self.Column in df.columns):
+            ser = df[self.Column]
+        elif(self.Column == df.index.name):
+            ser = df.index.to_series()
+        else:
+            return np.zeros(len(df), dtype=bool)
+        #Accessと同じ比較にする（文字列は大文字小文字を区別しない、dateは0時の日時）
+        if(self.Operator == QueryOperator.IN):
+            value:Any = [self.__MaskValue(val) for val in self.Value]
+            is_text = any(isinstance(val, str) for val in value)
+        else:
+            value = self.__MaskValue(self.Value)
+            is_text = isinstance(value, str)
+        if(is_text):
+            ser = ser.map(lambda val: val.casefold() if isinstance(val, str) else None)
+        if(self.Operator == QueryOperator.IN):
+            res = ser.isin(value)
+        elif(self.Condition == SerchCondition.Exact):
+            res = ser == value
+        elif(self.Condition == SerchCondition.StartWith):
+            res = ser.str.startswith(value)
+        elif(self.Condition == SerchCondition.EndWith):
+            res = ser.str.endswith(value)
+        elif(self.Condition == SerchCondition.Contains):
+            res = ser.str.contains(value, regex=False)
+        elif(self.Condition == SerchCondition.SmallerThan):
+            res = ser < value
+        elif(self.Condition == SerchCondition.OrSmallerThan):
+            res = ser <= value
+        elif(self.Condition == SerchCondition.LargerThan):
+            res = ser > value
+        else:
+            res = ser >= value
+        return (res == True).to_numpy(dtype=bool, na_value=False) #NULLは不一致
+    
+    def __MaskValue(self, val:Any) -> Any:
+        """検索値をデータフレームの値と比較できる形にする。（文字列は小文字化、dateはTimestamp）"""
+        if(isinstance(val, str)):
+            return val.casefold()
+        if(isinstance(val, date) and not(isinstance(val, datetime))):
+            return pd.Timestamp(val)
+        return val
+    
+    def __IsValueOfType(self, val:Any, py_type:Optional[type]) -> bool:
+        """検索値が列のデータ型と比較できるか"""
+        if(py_type in (int, float, Decimal)):
+            return type(val) in (int, float, Decimal)
+        if(py_type == datetime):
+            return isinstance(val, (datetime, date))
+        return type(val) == py_type
+    
+    def __LikeEscape(self, val:str) -> str:
+        """LIKEのワイルドカード文字をエスケープする。"""
+        return val.translate(str.maketrans({'[':'[[]', '%':'[%]', '_':'[_]'}))
+
+class ColumnIndex():
+    """内部データフレーム1列の検索インデックス
+    
+    Remarks:
+        値→IDのハッシュ(完全一致用)と、値でソートした配列(範囲・前方一致用)を持つ。
+        NULLの値はインデックスに含めない。値の大小比較ができない列はハッシュのみ。
+    """
+    HashIndex:Dict[Any,set]
+    """値→IDの集合"""
+    SortedKeys:Optional[List[Any]]
+    """ソートした値、Noneで範囲検索不可"""
+    SortedIDs:List[Any]
+    """SortedKeysと同じ順番のID"""
+    
+    def __init__(self, ser:pd.Series) -> None:
+        """内部データフレームの列からインデックスを作る。
+
+        Args:
+            ser (pd.Series): インデックスを作る列（インデックスがID）
+        """
+        self.HashIndex = {}
+        pair_list:List[Tuple[Any,Any]] = []
+        for ID,val in zip(ser.index.to_list(), ser.to_list()):
+            key = self.__Key(val)
+            if(key is None):
+                continue
+            self.HashIndex.setdefault(key,set()).add(ID)
+            pair_list.append((key,ID))
+        try:
+            pair_list.sort(key=lambda pair: pair[0])
+            self.SortedKeys = [pair[0] for pair in pair_list]
+            self.SortedIDs = [pair[1] for pair in pair_list]
+        except TypeError: #大小比較できない値が混在
+            self.SortedKeys = None
+            self.SortedIDs = []
+    
+    def Add(self, ID:Any, val:Any) -> None:
+        """行をインデックスに追加する。"""
+        key = self.__Key(val)
+        if(key is None):
+            return
+        self.HashIndex.setdefault(key,set()).add(ID)
+        if(self.SortedKeys != None):
+            try:
+                pos = bisect_right(self.SortedKeys, key)
+            except TypeError:
+                self.SortedKeys = None
+                self.SortedIDs = []
+                return
+            self.SortedKeys.insert(pos, key)
+            self.SortedIDs.insert(pos, ID)
+    
+    def Remove(self, ID:Any, val:Any) -> None:
+        """行をインデックスから取り除く。"""
+        key = self.__Key(val)
+        if(key is None):
+            return
+        id_set = self.HashIndex.get(key)
+        if(id_set != None):
+            id_set.discard(ID)
+            if(len(id_set) < 1):
+                del self.HashIndex[key]
+        if(self.SortedKeys != None):
+            for pos in range(bisect_left(self.SortedKeys, key), bisect_right(self.SortedKeys, key)):
+                if(self.SortedIDs[pos] == ID):
+                    del self.SortedKeys[pos]
+                    del self.SortedIDs[pos]
+                    break
+    
+    def Serch(self, val:Any, Serch_condition:SerchCondition) -> Optional[List[Any]]:
+        """インデックスで検索する。
+
+        Args:
+            val (Any): 検索する値
+            Serch_condition (SerchCondition): 検索条件
+
+        Returns:
+            Optional[List[Any]]: ヒットしたIDのリスト、インデックスで検索できない場合はNone
+        """
+        if(Serch_condition == SerchCondition.Exact):
+            try:
+                return list(self.HashIndex.get(val, ()))
+            except TypeError: #ハッシュ不可の値
+                return None
+        if(self.SortedKeys == None):
+            return None
+        try:
+            if(Serch_condition == SerchCondition.StartWith):
+                if(type(val) != str):
+                    return None
+                return self.SortedIDs[bisect_left(self.SortedKeys, val):bisect_left(self.SortedKeys, val + '\U0010ffff')]
+            if(Serch_condition == SerchCondition.SmallerThan):
+                return self.SortedIDs[:bisect_left(self.SortedKeys, val)]
+            if(Serch_condition == SerchCondition.OrSmallerThan):
+                return self.SortedIDs[:bisect_right(self.SortedKeys, val)]
+            if(Serch_condition == SerchCondition.LargerThan):
+                return self.SortedIDs[bisect_right(self.SortedKeys, val):]
+            if(Serch_condition == SerchCondition.OrLargerThan):
+                return self.SortedIDs[bisect_left(self.SortedKeys, val):]
+        except TypeError: #列の値と比較できない検索値
+            return None
+        return None
+    
+    def __Key(self, val:Any) -> Any:
+        """インデックスのキー、NULLはNone"""
+        if(val is None or val is pd.NaT or val is pd.NA):
+            return None
+        if(isinstance(val,np.generic)):
+            val = val.item()
+        if(isinstance(val,float) and np.isnan(val)):
+            return None
+        return val
+
+class DataBaseLock():
+    """データベースアクセスの排他制御
+    
+    Remarks:
+        通常は読み込み・書き込みとも排他。ReaderWriter=Trueで読み込み同士は同時に実行でき、書き込みは排他（書き込み待ちを優先）。
+        同じスレッドからの入れ子の取得は待たない。ただし読み込み中に同じスレッドから書き込みは取得できない。
+    """
+    ReaderWriter:bool
+    """読み込み共有／書き込み排他モード"""
+    Stats:Dict[str,Any]
+    """取得・待ちの統計(read_acquires, write_acquires, waits, wait_seconds, max_wait_seconds)"""
+    OnWait:Optional[Callable[[float],None]]
+    """待ちが終わる毎に待ち時間[s]で呼ばれる関数（計測用）、Noneで呼ばない"""
+    
+    def __init__(self, ReaderWriter:bool=False) -> None:
+        """データベースアクセスの排他制御（コンストラクター）
+
+        Args:
+            ReaderWriter (bool, optional): 読み込み共有／書き込み排他モード. Defaults to False.
+        """
+        self.ReaderWriter = ReaderWriter
+        self.Stats = {'read_acquires':0, 'write_acquires':0, 'waits':0, 'wait_seconds':0.0, 'max_wait_seconds':0.0}
+        self.OnWait = None
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers:int = 0
+        self.__writer:Optional[int] = None
+        self.__write_depth:int = 0
+        self.__writers_waiting:int = 0
+        self.__local = threading.local()
+    
+    @property
+    def busy(self) -> bool:
+        """データベース使用中"""
+        return self.__writer != None or self.__readers > 0
+    
+    @contextmanager
+    def Read(self) -> Iterator[None]:
+        """読み込みで取得する。（ReaderWriter=Falseの場合は排他）"""
+        if(not(self.ReaderWriter)):
+            with self.Write():
+                yield
+            return
+        me = threading.get_ident()
+        depth:int = getattr(self.__local, 'read_depth', 0)
+        with self.__cond:
+            if(self.__writer != me and depth == 0 and (self.__writer != None or self.__writers_waiting > 0)):
+                start = perf_counter()
+                while(self.__writer != None or self.__writers_waiting > 0):
+                    self.__cond.wait()
+                self.__AddWait(perf_counter() - start)
+            self.__readers += 1
+            self.Stats['read_acquires'] += 1
+        self.__local.read_depth = depth + 1
+        try:
+            yield
+        finally:
+            self.__local.read_depth = depth
+            with self.__cond:
+                self.__readers -= 1
+                if(self.__readers == 0):
+                    self.__cond.notify_all()
+    
+    @contextmanager
+    def Write(self) -> Iterator[None]:
+        """書き込み(排他)で取得する。"""
+        me = threading.get_ident()
+        with self.__cond:
+            if(self.__writer == me):
+                self.__write_depth += 1
+            else:
+                if(self.__writer != None or self.__readers > 0):
+                    start = perf_counter()
+                    self.__writers_waiting += 1
+                    try:
+                        while(self.__writer != None or self.__readers > 0):
+                            self.__cond.wait()
+                    finally:
+                        self.__writers_waiting -= 1
+                    self.__AddWait(perf_counter() - start)
+                self.__writer = me
+                self.__write_depth = 1
+            self.Stats['write_acquires'] += 1
+        try:
+            yield
+        finally:
+            with self.__cond:
+                self.__write_depth -= 1
+                if(self.__write_depth == 0):
+                    self.__writer = None
+                    self.__cond.notify_all()
+    
+    def __AddWait(self, wait:float) -> None:
+        """待ち時間を統計に加える。（__condを取得中に呼ぶ）"""
+        self.Stats['waits'] += 1
+        self.Stats['wait_seconds'] += wait
+        if(wait > self.Stats['max_wait_seconds']):
+            self.Stats['max_wait_seconds'] = wait
+        if(self.OnWait != None):
+            self.OnWait(wait)
+
+class Instrumentation():
+    """メソッド毎の計測（時間・SQL数・取得行数・SQLのバイト数・ロック待ち時間）
+    
+    Remarks:
+        DataBaseCtrl.SetInstrumentation()で有効にする。無効の場合はDataBaseCtrl.Instrument=Noneで、計測のコストは属性の確認1回だけ。
+        入れ子の呼び出し（UpdateRows→UpdateRowなど）は一番外側のメソッドの計測に含める。
+        時間の内訳はsql_seconds（SQL作成）, execute_seconds（execute/executemany）, fetch_seconds（fetch）,
+        decode_seconds（SQL結果→データフレーム変換）, busy_wait_seconds（排他制御の待ち）。
+    """
+    Callback:Optional[Callable[[str,Dict[str,Any]],None]]
+    """メソッドの呼び出し毎に(メソッド名, その呼び出しの計測)で呼ばれる関数、Noneで呼ばない"""
+    record_keys = ['calls', 'seconds', 'max_seconds', 'statements', 'rows_fetched', 'sql_bytes',
+                   'sql_seconds', 'execute_seconds', 'fetch_seconds', 'decode_seconds', 'busy_wait_seconds']
+    """計測の項目"""
+    
+    def __init__(self, Callback:Optional[Callable[[str,Dict[str,Any]],None]]=None) -> None:
+        """メソッド毎の計測（コンストラクター）
+
+        Args:
+            Callback (Optional[Callable[[str,Dict[str,Any]],None]], optional): 呼び出し毎に呼ぶ関数. Defaults to None.
+        """
+        self.Callback = Callback
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__methods:Dict[str,Dict[str,Any]] = {}
+        self.__callback_errors:int = 0
+    
+    @property
+    def Stats(self) -> Dict[str,Any]:
+        """計測のスナップショット{'methods':<メソッド名,計測>, 'total':計測, 'callback_errors':Callbackの例外数}"""
+        with self.__lock:
+            methods = {name:dict(rec) for name,rec in self.__methods.items()}
+            callback_errors = self.__callback_errors
+        total = self.__NewRecord()
+        for rec in methods.values():
+            for key in self.record_keys:
+                total[key] = max(total[key], rec[key]) if key == 'max_seconds' else total[key] + rec[key]
+        return {'methods':methods, 'total':total, 'callback_errors':callback_errors}
+    
+    def Reset(self) -> None:
+        """計測を0に戻す。"""
+        with self.__lock:
+            self.__methods = {}
+            self.__callback_errors = 0
+    
+    @contextmanager
+    def Measure(self, MethodName:str) -> Iterator[None]:
+        """メソッドの呼び出しを計測する。（入れ子の場合は外側の計測に含める）"""
+        if(getattr(self.__local, 'record', None) != None):
+            yield
+            return
+        rec = self.__NewRecord()
+        self.__local.record = rec
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            rec['seconds'] = perf_counter() - start
+            rec['calls'] = 1
+            rec['max_seconds'] = rec['seconds']
+            self.__local.record = None
+            with self.__lock:
+                total = self.__methods.setdefault(MethodName, self.__NewRecord())
+                for key in self.record_keys:
+                    total[key] = max(total[key], rec[key]) if key == 'max_seconds' else total[key] + rec[key]
+            if(self.Callback != None):
+                try:
+                    self.Callback(MethodName, rec)
+                except Exception:
+                    with self.__lock:
+                        self.__callback_errors += 1 #計測の失敗でデータベース操作を失敗させない
+    
+    @contextmanager
+    def Phase(self, key:str) -> Iterator[None]:
+        """呼び出し中の時間の内訳を計測する。（入れ子の場合は外側だけ）"""
+        if(getattr(self.__local, 'phase', False)):
+            yield
+            return
+        self.__local.phase = True
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.__local.phase = False
+            self.Add(key, perf_counter() - start)
+    
+    def Add(self, key:str, val:Union[int,float]) -> None:
+        """呼び出し中の計測に値を加える。（計測中のメソッドが無い場合は'Other'に加える）"""
+        rec:Optional[Dict[str,Any]] = getattr(self.__local, 'record', None)
+        if(rec != None):
+            rec[key] += val
+            return
+        with self.__lock:
+            self.__methods.setdefault('Other', self.__NewRecord())[key] += val
+    
+    def __NewRecord(self) -> Dict[str,Any]:
+        """0の計測"""
+        return {key:0.0 if key.endswith('seconds') else 0 for key in self.record_keys}
+
+class InstrumentedCursor():
+    """SQL数・取得行数・SQLのバイト数・実行/取得時間を計測するカーソル（計測が有効な場合のみ使う）"""
+    
+    def __init__(self, cursor:Cursor, Instrument:Instrumentation) -> None:
+        """計測するカーソル（コンストラクター）
+
+        Args:
+            cursor (Cursor): pyodbcのカーソル
+            Instrument (Instrumentation): 計測
+        """
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_instrument', Instrument)
+    
+    def __getattr__(self, name:str) -> Any:
+        return getattr(self._cursor, name)
+    
+    def __setattr__(self, name:str, val:Any) -> None:
+        setattr(self._cursor, name, val) #fast_executemanyなど
+    
+    def __iter__(self):
+        return iter(self.fetchall())
+    
+    def execute(self, sql:str, *params:Any) -> 'InstrumentedCursor':
+        """SQLを実行する。"""
+        self._instrument.Add('statements', 1)
+        self._instrument.Add('sql_bytes', len(sql.encode('utf-8')))
+        with self._instrument.Phase('execute_seconds'):
+            self._cursor.execute(sql, *params)
+        return self
+    
+    def executemany(self, sql:str, params:List[tuple]) -> None:
+        """パラメータ行毎にSQLを実行する。（パラメータ行数をSQL数として数える）"""
+        self._instrument.Add('statements', len(params))
+        self._instrument.Add('sql_bytes', len(sql.encode('utf-8')))
+        with self._instrument.Phase('execute_seconds'):
+            self._cursor.executemany(sql, params)
+    
+    def columns(self, *args:Any, **kwargs:Any) -> 'InstrumentedCursor':
+        """テーブルの列情報を結果にする。"""
+        self._instrument.Add('statements', 1)
+        with self._instrument.Phase('execute_seconds'):
+            self._cursor.columns(*args, **kwargs)
+        return self
+    
+    def fetchone(self) -> Any:
+        """結果を1行取得する。"""
+        with self._instrument.Phase('fetch_seconds'):
+            row = self._cursor.fetchone()
+        self._instrument.Add('rows_fetched', 0 if row == None else 1)
+        return row
+    
+    def fetchmany(self, size:int=1) -> List[Any]:
+        """結果を最大size行取得する。"""
+        with self._instrument.Phase('fetch_seconds'):
+            res = self._cursor.fetchmany(size)
+        self._instrument.Add('rows_fetched', len(res))
+        return res
+    
+    def fetchall(self) -> List[Any]:
+        """結果の残りの行を全て取得する。"""
+        with self._instrument.Phase('fetch_seconds'):
+            res = self._cursor.fetchall()
+        self._instrument.Add('rows_fetched', len(res))
+        return res
+
+def Instrumented(func:Callable) -> Callable:
+    """DataBaseCtrlのメソッドを計測対象にする。（Instrument=Noneの場合はそのまま呼ぶ、ジェネレーターは1回のyield毎に計測）"""
+    name = func.__name__
+    if(inspect.isgeneratorfunction(func)):
+        @wraps(func)
+        def gen_wrapper(self, *args, **kwargs):
+            gen = func(self, *args, **kwargs)
+            while True:
+                inst:Optional[Instrumentation] = self.Instrument
+                if(inst == None):
+                    try:
+                        item = next(gen)
+                    except StopIteration:
+                        return
+                else:
+                    with inst.Measure(name):
+                        try:
+                            item = next(gen)
+                        except StopIteration:
+                            return
+                yield item
+        return gen_wrapper
+    
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        inst:Optional[Instrumentation] = self.Instrument
+        if(inst == None):
+            return func(self, *args, **kwargs)
+        with inst.Measure(name):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+def InstrumentedPhase(key:str) -> Callable[[Callable],Callable]:
+    """DataBaseCtrlのメソッドの時間を内訳(key)として計測する。（Instrument=Noneの場合はそのまま呼ぶ）"""
+    def decorator(func:Callable) -> Callable:
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            inst:Optional[Instrumentation] = self.Instrument
+            if(inst == None):
+                return func(self, *args, **kwargs)
+            with inst.Phase(key):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+class ConnectionPool():
+    """プロセス内で共有するデータベース接続プール（データベースファイル毎）
+    
+    Remarks:
+        DataBaseCtrlは接続をプールから借りて、Close()（withブロックの終了）で返す。
+        返された接続はロールバックしてから保持し、貸し出し前にHealthCheckSQLで使えるか確認する。
+        保持している接続はデータベースファイルを開いたままになる。すぐに閉じる場合はClear()を呼ぶ。
+        MaxIdleは返された接続を保持する数の上限、MaxOpenは貸し出し中の接続数の上限。
+        MaxOpenに達するとAcquire()は接続が返されるまで待つ。DataBaseCtrlはインスタンス毎に1つ、読み込み共有モードでは読み込むスレッド毎にも1つ借りるので、
+        1つのスレッドで必要な数より小さくすると待ち続ける（AcquireTimeoutで打ち切る）。
+    """
+    MaxIdle:int
+    """データベースファイル毎に保持する使われていない接続の最大数、0でプールしない（毎回接続・切断）"""
+    MaxOpen:Optional[int]
+    """データベースファイル毎に貸し出す接続の最大数、Noneで制限なし"""
+    AcquireTimeout:Optional[float]
+    """MaxOpenに達した時に接続が返されるのを待つ時間[s]、Noneで待ち続ける"""
+    IdleTimeout:float
+    """使われない接続を閉じるまでの時間[s]"""
+    HealthCheckSQL:Optional[str]
+    """貸し出し前の接続確認SQL、Noneで確認しない"""
+    Stats:Dict[str,int]
+    """接続の統計(connects, reuses, health_failures, idle_closed, discarded, waits, wait_timeouts)"""
+    
+    def __init__(self, MaxIdle:int=default_pool_idle, IdleTimeout:float=default_pool_idle_timeout,
+                 HealthCheckSQL:Optional[str]='SELECT 1;', MaxOpen:Optional[int]=default_pool_max_open,
+                 AcquireTimeout:Optional[float]=None) -> None:
+        """データベース接続プール（コンストラクター）
+
+        Args:
+            MaxIdle (int, optional): データベースファイル毎に保持する使われていない接続の最大数、0でプールしない. Defaults to default_pool_idle.
+            IdleTimeout (float, optional): 使われない接続を閉じるまでの時間[s]. Defaults to default_pool_idle_timeout.
+            HealthCheckSQL (Optional[str], optional): 貸し出し前の接続確認SQL、Noneで確認しない. Defaults to 'SELECT 1;'.
+            MaxOpen (Optional[int], optional): データベースファイル毎に貸し出す接続の最大数、Noneで制限なし. Defaults to default_pool_max_open.
+            AcquireTimeout (Optional[float], optional): MaxOpenに達した時に待つ時間[s]、Noneで待ち続ける. Defaults to None.
+        """
+        self.MaxIdle = MaxIdle
+        self.MaxOpen = MaxOpen
+        self.AcquireTimeout = AcquireTimeout
+        self.IdleTimeout = IdleTimeout
+        self.HealthCheckSQL = HealthCheckSQL
+        self.Stats = {'connects':0, 'reuses':0, 'health_failures':0, 'idle_closed':0, 'discarded':0, 'waits':0, 'wait_timeouts':0}
+        self.__lock = threading.Condition()
+        self.__idle:Dict[str,List[Tuple[Connection,float]]] = {}
+        self.__in_use:Dict[str,int] = {}
+    
+    def Acquire(self, DataBase_Path:str, strCon:str) -> Connection:
+        """接続を借りる。保持している接続がなければ新しく接続する。
+
+        Args:
+            DataBase_Path (str): データベースファイルパス
+            strCon (str): 接続文字列
+
+        Returns:
+            Connection: 接続オブジェクト
+            
+        Raises:
+            TimeoutError: MaxOpenに達したままAcquireTimeoutを過ぎた
+        """
+        key = self.__Key(DataBase_Path)
+        with self.__lock:
+            if(self.__IsFull(key)):
+                self.Stats['waits'] += 1
+                if(not(self.__lock.wait_for(lambda: not(self.__IsFull(key)), self.AcquireTimeout))):
+                    self.Stats['wait_timeouts'] += 1
+                    raise TimeoutError(f'connection pool is full: MaxOpen={self.MaxOpen}, {DataBase_Path}')
+            self.__in_use[key] = self.__in_use.get(key, 0) + 1 #先に枠を確保する
+        try:
+            while True:
+                with self.__lock:
+                    expired_list = self.__PopExpired()
+                    idle_list = self.__idle.get(key)
+                    conn = idle_list.pop()[0] if idle_list else None #最後に返された接続から使う
+                for expired in expired_list: #ロックを放してから閉じる
+                    self.__CloseConnection(expired)
+                if(conn == None):
+                    break
+                if(self.__IsHealthy(conn)):
+                    with self.__lock:
+                        self.Stats['reuses'] += 1
+                    return conn
+                with self.__lock:
+                    self.Stats['health_failures'] += 1
+                self.__CloseConnection(conn)
+            conn = pyodbc.connect(strCon)
+        except BaseException:
+            self.__ReleaseSlot(key)
+            raise
+        with self.__lock:
+            self.Stats['connects'] += 1
+        return conn
+    
+    def Release(self, DataBase_Path:str, conn:Connection) -> None:
+        """接続を返す。保持数がMaxIdleに達している場合は閉じる。
+
+        Args:
+            DataBase_Path (str): データベースファイルパス
+            conn (Connection): 返す接続オブジェクト
+        """
+        key = self.__Key(DataBase_Path)
+        try:
+            conn.rollback() #未確定の変更を残さない
+        except pyodbc.Error:
+            self.__CloseConnection(conn)
+            self.__ReleaseSlot(key)
+            return
+        with self.__lock:
+            expired_list = self.__PopExpired()
+            idle_list = self.__idle.setdefault(key, [])
+            kept = len(idle_list) < self.MaxIdle
+            if(kept):
+                idle_list.append((conn, perf_counter()))
+            else:
+                self.Stats['discarded'] += 1
+        for expired in expired_list: #ロックを放してから閉じる
+            self.__CloseConnection(expired)
+        if(not(kept)):
+            self.__CloseConnection(conn)
+        self.__ReleaseSlot(key)
+    
+    def InUse(self, DataBase_Path:str) -> int:
+        """貸し出し中の接続数
+
+        Args:
+            DataBase_Path (str): データベースファイルパス
+
+        Returns:
+            int: 貸し出し中の接続数
+        """
+        with self.__lock:
+            return self.__in_use.get(self.__Key(DataBase_Path), 0)
+    
+    def Clear(self) -> None:
+        """保持している接続を全て閉じる。"""
+        with self.__lock:
+            idle_dict = self.__idle
+            self.__idle = {}
+        for idle_list in idle_dict.values():
+            for conn,_ in idle_list:
+                self.__CloseConnection(conn)
+    
+    def __Key(self, DataBase_Path:str) -> str:
+        """プールのキー（正規化したデータベースファイルパス）"""
+        return os.path.normcase(os.path.abspath(DataBase_Path))
+    
+    def __IsFull(self, key:str) -> bool:
+        """貸し出し中の接続数がMaxOpenに達しているか。（__lockを取得中に呼ぶ）"""
+        return self.MaxOpen != None and self.__in_use.get(key, 0) >= self.MaxOpen
+    
+    def __ReleaseSlot(self, key:str) -> None:
+        """貸し出し中の接続数を減らし、待っているAcquire()を起こす。"""
+        with self.__lock:
+            count = self.__in_use.get(key, 0) - 1
+            if(count > 0):
+                self.__in_use[key] = count
+            else:
+                self.__in_use.pop(key, None)
+            self.__lock.notify_all()
+    
+    def __PopExpired(self) -> List[Connection]:
+        """IdleTimeoutを過ぎた接続をプールから取り出す。（__lockを取得中に呼び、閉じるのはロックを放してから）
+
+        Returns:
+            List[Connection]: 閉じる接続のリスト
+        """
+        now = perf_counter()
+        expired_list:List[Connection] = []
+        for key in list(self.__idle):
+            keep_list:List[Tuple[Connection,float]] = []
+            for conn,released in self.__idle[key]:
+                if(now - released > self.IdleTimeout):
+                    expired_list.append(conn)
+                    self.Stats['idle_closed'] += 1
+                else:
+                    keep_list.append((conn, released))
+            if(len(keep_list) > 0):
+                self.__idle[key] = keep_list
+            else:
+                del self.__idle[key]
+        return expired_list
+    
+    def __IsHealthy(self, conn:Connection) -> bool:
+        """接続が使えるか確認する。"""
+        if(self.HealthCheckSQL == None):
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.HealthCheckSQL)
+            cursor.fetchall()
+            cursor.close()
+        except pyodbc.Error:
+            return False
+        return True
+    
+    def __CloseConnection(self, conn:Connection) -> None:
+        """接続を閉じる。（既に切れている場合のエラーは無視する）"""
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+connection_pool = ConnectionPool()
+"""プロセス内で共有する接続プール"""
+
+class SchemaCache():
+    """インスタンス間で共有するテーブルの列情報キャッシュ（データベースファイル, テーブル毎）
+    
+    Remarks:
+        DataBaseCtrlの生成時に列情報(cursor.columnsの結果)をキャッシュから取得し、カタログ問い合わせを省略する。
+        行の書き込みではファイルの更新日時が変わっても列情報は変わらないので、キャッシュは明示的に無効化するまで使う。
+        DataBaseCtrlでの列・テーブルの追加・削除では列情報を取り直して更新する。他のプログラムでテーブルの定義を変えた場合はRemove()またはClear()を呼ぶ。
+        PersistPathを設定するとJSONファイルに保存し、プロセスを再起動しても使う。
+    """
+    PersistPath:Optional[str]
+    """キャッシュを保存するJSONファイルパス、Noneで保存しない"""
+    Stats:Dict[str,int]
+    """キャッシュの統計(hits, misses)"""
+    
+    def __init__(self, PersistPath:Optional[str]=None) -> None:
+        """列情報キャッシュ（コンストラクター）
+
+        Args:
+            PersistPath (Optional[str], optional): キャッシュを保存するJSONファイルパス、Noneで保存しない. Defaults to None.
+        """
+        self.Stats = {'hits':0, 'misses':0}
+        self.__lock = threading.Lock()
+        self.__entries:Dict[Tuple[str,str],List[tuple]] = {}
+        self.PersistPath = None
+        if(PersistPath != None):
+            self.SetPersistPath(PersistPath)
+    
+    def SetPersistPath(self, PersistPath:Optional[str]) -> None:
+        """キャッシュを保存するJSONファイルを設定し、保存済みのキャッシュを読み込む。
+
+        Args:
+            PersistPath (Optional[str]): JSONファイルパス、Noneで保存しない
+        """
+        self.PersistPath = PersistPath
+        if(PersistPath == None or not(os.path.exists(PersistPath))):
+            return
+        try:
+            with open(PersistPath, 'r', encoding='utf-8') as f:
+                entry_list = json.load(f)
+        except (OSError, ValueError):
+            return #壊れたファイルは使わない(次の保存で上書き)
+        with self.__lock:
+            for entry in entry_list:
+                key = (entry['path'], entry['table'])
+                if(not(key in self.__entries)):
+                    self.__entries[key] = [tuple(row) for row in entry['rows']]
+    
+    def Get(self, DataBase_Path:str, TableName:str) -> Optional[List[tuple]]:
+        """列情報を取得する。
+
+        Args:
+            DataBase_Path (str): データベースファイルパス
+            TableName (str): テーブル名
+
+        Returns:
+            Optional[List[tuple]]: 列情報(cursor.columnsの結果の行)、キャッシュにない場合はNone
+        """
+        with self.__lock:
+            rows = self.__entries.get(self.__Key(DataBase_Path, TableName))
+            if(rows == None):
+                self.Stats['misses'] += 1
+                return None
+            self.Stats['hits'] += 1
+            return rows
+    
+    def Put(self, DataBase_Path:str, TableName:str, Rows:List[tuple]) -> None:
+        """列情報をキャッシュする。
+
+        Args:
+            DataBase_Path (str): データベースファイルパス
+            TableName (str): テーブル名
+            Rows (List[tuple]): 列情報(cursor.columnsの結果の行)
+        """
+        with self.__lock:
+            self.__entries[self.__Key(DataBase_Path, TableName)] = [tuple(row) for row in Rows]
+        self.__Save()
+    
+    def Remove(self, DataBase_Path:str, TableName:str) -> None:
+        """列情報をキャッシュから削除する。
+
+        Args:
+            DataBase_Path (str): データベースファイルパス
+            TableName (str): テーブル名
+        """
+        with self.__lock:
+            self.__entries.pop(self.__Key(DataBase_Path, TableName), None)
+        self.__Save()
+    
+    def Clear(self) -> None:
+        """キャッシュを全て削除する。"""
+        with self.__lock:
+            self.__entries = {}
+        self.__Save()
+    
+    def __Key(self, DataBase_Path:str, TableName:str) -> Tuple[str,str]:
+        """キャッシュのキー（正規化したデータベースファイルパス, テーブル名）"""
+        return (os.path.normcase(os.path.abspath(DataBase_Path)), TableName)
+    
+    def __Save(self) -> None:
+        """キャッシュをJSONファイルに保存する。"""
+        if(self.PersistPath == None):
+            return
+        with self.__lock:
+            entry_list = [{'path':key[0], 'table':key[1], 'rows':[list(row) for row in rows]}
+                          for key,rows in self.__entries.items()]
+        tmp_path = f'{self.PersistPath}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry_list, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.PersistPath)
+        except OSError:
+            pass #保存できなくてもメモリ上のキャッシュは使える
+
+schema_cache = SchemaCache()
+"""インスタンス間で共有する列情報キャッシュ"""
+
 class DataBaseCtrl():
     """データベース(.accdb)制御クラス
     """
-    Int_DF:pd.DataFrame = None
-    """クラス内部データフレーム"""
+    __int_df:Optional[pd.DataFrame] = None
+    """クラス内部データフレーム（追加バッファの行を含まない）"""
     Column_DF:pd.DataFrame = None
     """クラス内部列情報データフレーム"""
-    RowState_DF:pd.DataFrame = None
-    """クラス内部データフレームの行状態"""
+    ColumnCatalog:Dict[str,ColumnInfo] = {}
+    """列名から列情報を引く列カタログ（列の順番）"""
+    __row_state:Optional[np.ndarray] = None
+    """クラス内部データフレームの行状態(DataRowStateの値、int8)、__int_dfの行と同じ順番"""
+    __append_ids:Optional[List[Union[int,str]]] = None
+    """追加バッファの行IDリスト"""
+    __append_cols:Optional[Dict[str,List[Any]]] = None
+    """追加バッファの列毎の値リスト<列名,値リスト>"""
+    __next_id:Optional[int] = None
+    """ID自動取得の次のID、Noneで未計算"""
+    UpdatedIDs:set
+    """行状態が更新の行IDの集合"""
+    AddedIDs:set
+    """行状態が追加の行IDの集合"""
+    DeletedIDs:set
+    """行状態が削除の行IDの集合"""
+    Indexes:Dict[str,ColumnIndex]
+    """内部データフレームの検索インデックス<列名,インデックス>"""
     TableName:str
     """テーブル名"""
     DirectMode:bool
     """直接データベースアクセスモード"""
     strCon:str
     """接続文字列"""
-    conn:Connection = None
+    DataBase_Path:str
+    """データベースファイルパス"""
+    __conn:Optional[Connection] = None
     """接続オブジェクト"""
-    cursor:Cursor = None
+    __cursor:Optional[Cursor] = None
     """データベースカーソル"""
+    __connect_pending:bool = False
+    """遅延接続で未接続"""
+    __txn_owner:Optional[int] = None
+    """トランザクション中のスレッドID、Noneでトランザクション外"""
     err:Error
     """エラーコード"""
     col_inf_columns = [
@@ -184,26 +1255,82 @@ class DataBaseCtrl():
         'is_nullable',
         'ordinal']
     """Coulumns of Column DataFarme"""
-    busy:bool
-    """データベース使用中
+    SyncStats:Dict[str,Any]
+    """最後の一括書き込み(UpdateDataBase, UpdateRows, UpdateRowByDataFrame, DeleteRows)の書き込み統計"""
+    TransactionStats:Dict[str,Any]
+    """最後のTransaction()のコミット統計"""
+    IncrementalMode:bool
+    """UpdateInternalDataFrame()を差分更新で行う"""
+    WatermarkColumn:Optional[str]
+    """差分更新の基準列(最終更新日時など)、NoneでIDの最大値を基準とする"""
+    ReconcileInterval:int
+    """差分更新何回毎に削除行の照合を行うか、0で照合しない"""
+    ResultCacheSize:int
+    """ダイレクトモードの検索結果キャッシュの最大件数、0でキャッシュしない"""
+    ResultCacheTTL:float
+    """ダイレクトモードの検索結果キャッシュの有効時間[s]"""
+    CacheStats:Dict[str,int]
+    """検索結果キャッシュの統計(hits, misses, evictions, invalidations)"""
+    Lock:DataBaseLock
+    """データベースアクセスの排他制御
     
     Remarks:
-        マルチスレッド／マルチプロセスでの競合防止
+        マルチスレッドでの競合防止
     """ 
+    Instrument:Optional[Instrumentation] = None
+    """メソッド毎の計測、Noneで計測しない（SetInstrumentation()で設定）"""
+    __loaded_columns:Optional[List[str]] = None
+    """内部データフレームに読み込んだ列（IDの列を除く）、Noneで全列"""
     
-    def __init__(self, DataBase_Path:str, TableName:str, DirectMode:bool=False) -> None:
+    def __init__(self, DataBase_Path:str, TableName:str, DirectMode:bool=False, LazyConnect:bool=False) -> None:
         """データベース(.accdb)制御クラス(コンストラクター)
 
         Args:
             DataBase_Path (str): データベースファイルパス
             TableName (str): テーブル名
             DirectMode (bool, optional): 直接データベースアクセスモード=True. Defaults to False.
+            LazyConnect (bool, optional): 最初にデータベースを使うまで接続しない=True. Defaults to False.
+            
+        Remarks:
+            列情報はschema_cacheにあればデータベースに問い合わせない。LazyConnect=Trueで列情報がキャッシュにあれば生成時に接続しない。
         """
-        #データベースbusy初期化
-        self.busy = False
+        #排他制御の初期化
+        self.Lock = DataBaseLock()
+        self.Instrument = None
+        self.__thread_local = threading.local()
+        self.__read_conns:List[Tuple[Connection,Cursor]] = []
+        self.SyncStats = {}
+        #トランザクションの初期化
+        self.TransactionStats = {}
+        self.__txn_owner = None
+        self.__txn_batch:int = 0
+        self.__txn_pending:int = 0
+        #行状態の初期化
+        self.UpdatedIDs = set()
+        self.AddedIDs = set()
+        self.DeletedIDs = set()
+        self.Indexes = {}
+        #追加バッファの初期化
+        self.__append_ids = []
+        self.__append_cols = {}
+        #差分更新の初期化
+        self.IncrementalMode = False
+        self.WatermarkColumn = None
+        self.ReconcileInterval = 10
+        self.__watermark:Any = None
+        self.__refresh_count:int = 0
+        self.__data_mtime:Optional[float] = None
+        self.__loaded_columns = None
+        #検索結果キャッシュの初期化(無効)
+        self.ResultCacheSize = 0
+        self.ResultCacheTTL = default_cache_ttl
+        self.CacheStats = {'hits':0, 'misses':0, 'evictions':0, 'invalidations':0}
+        self.__result_cache:OrderedDict = OrderedDict()
+        self.__cache_lock = threading.Lock()
         
         self.TableName = TableName
         self.DirectMode = DirectMode
+        self.DataBase_Path = DataBase_Path
         #拡張子の判定
         file_name = os.path.basename(DataBase_Path)
         file_ext = os.path.splitext(file_name)[1]
@@ -213,16 +1340,13 @@ class DataBaseCtrl():
         #SQL接続文字列作成
         self.strCon = 'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
         self.strCon += f'DBQ={DataBase_Path};'        
-        #接続
-        self.conn = pyodbc.connect(self.strCon)
-        # ODBCドライバーに送信する属性を指定する
-        #attrs_before = {pyodbc.SQL_MAX_COLUMNS_IN_SELECT: 255}
-        #self.conn.set_attr(pyodbc.SQL_MAX_COLUMNS_IN_SELECT,255)
-        #self.conn = pyodbc.connect(self.strCon,attrs_before=attrs_before)
-        self.cursor = self.conn.cursor()                    
-        #列情報の取得
-        if(self.IsTableExist()):
-            self.__GetColumnNameFromDataBase()
+        #接続（接続プールから借りる）、遅延接続の場合は最初に使う時に接続する
+        self.__connect_lock = threading.Lock()
+        self.__connect_pending = True
+        if(not(LazyConnect)):
+            self.__Connect()
+        #列情報の取得（キャッシュになければデータベースから）
+        self.__GetColumnNameFromDataBase(use_cache=True)
         self.err = Error.NO_ERR
         
         
@@ -242,89 +1366,524 @@ class DataBaseCtrl():
         return False
 
     def Close(self) -> None:
-        """カーソルと接続を安全にクローズする。"""
-        if(self.cursor != None):
-            self.cursor.close()
-            self.cursor = None
-        if(self.conn != None):
-            self.conn.close()
-            self.conn = None
+        """カーソルを安全にクローズして接続を接続プールへ返す。"""
+        self.__connect_pending = False
+        if(self.__cursor != None):
+            self.__cursor.close()
+            self.__cursor = None
+        if(self.__conn != None):
+            for read_conn,read_cursor in self.__read_conns:
+                read_cursor.close()
+                connection_pool.Release(self.DataBase_Path, read_conn)
+            self.__read_conns = []
+            self.__thread_local = threading.local()
+            connection_pool.Release(self.DataBase_Path, self.__conn)
+            self.__conn = None
+    
+    @property
+    def conn(self) -> Optional[Connection]:
+        """接続オブジェクト（遅延接続の場合は最初に使う時に接続する）"""
+        if(self.__connect_pending):
+            self.__Connect()
+        return self.__conn
+    
+    @property
+    def cursor(self) -> Optional[Cursor]:
+        """データベースカーソル（遅延接続の場合は最初に使う時に接続する）"""
+        if(self.__connect_pending):
+            self.__Connect()
+        if(self.Instrument != None and self.__cursor != None):
+            return InstrumentedCursor(self.__cursor, self.Instrument)
+        return self.__cursor
             
-    def UpdateInternalDataFrame(self, set_index:Optional[str]='ID') -> bool:
+    @Instrumented
+    def UpdateInternalDataFrame(self, set_index:Optional[str]='ID', incremental:Optional[bool]=None, chunk_size:Optional[int]=None,
+                                columns:Optional[List[str]]=None, lazy_large_objects:bool=False) -> bool:
         """データベースから内部データフレームを更新する。
 
         Args:
             set_index (Optional[str], optional): インデクスにする行名, Noneとするとインデックス指定しない. Defaults to 'ID'.
+            incremental (Optional[bool], optional): 差分更新=True / 全件読み込み=False、NoneでIncrementalModeに従う. Defaults to None.
+            chunk_size (Optional[int], optional): 全件読み込みをchunk_size行ずつ行う、Noneで一括読み込み. Defaults to None.
+            columns (Optional[List[str]], optional): 読み込む列、Noneで全列（IDの列は常に読み込む）. Defaults to None.
+            lazy_large_objects (bool, optional): MEMO, OLEOBJECT, HYPERLINKの列を読み込まない. Defaults to False.
 
         Returns:
             bool: 成功=True / 失敗=False
+            
+        Remarks:
+            差分更新は基準列(WatermarkColumn)の値が前回より大きい行だけを読み込み、内部データフレームへマージする。
+            未同期の変更がある行はローカルの内容を優先する。削除行はReconcileInterval回毎の照合で取り除く。
+            差分更新は前回の全件読み込みと同じ列で行う（columns, lazy_large_objectsは使わない）。
+            chunk_sizeを指定すると読み込み中に保持するSQLの結果はchunk_size行分だけになり、
+            列毎の配列へ直接書き込むので読み込み中のメモリは最終のデータフレーム+1チャンク分になる。
+            読み込まなかった列(LazyColumns)はSelectRowByID(), SerchRows()のcolumnsに指定するとIDでデータベースから読み込む。
+            読み込まなかった列はUpdateRow(), AddRow()で変更できない。
         """        
         #直接データベースアクセスモードでは動作しない
         if(self.DirectMode):
             self.err = Error.NOT_WORK_THIS_MODE
             return False
-        #SQLでデータベースの読み取り
-        sql = self.__SelectSQL()        
-        self.__wait_busy()
-        self.busy=True
-        self.cursor.execute(sql)
-        res = self.cursor.fetchall()
-        self.busy=False
-        if(len(res)<1):
-            self.err = Error.NO_DATA_IN_TABLE
-            return False        
-        #データフレーム構築
-        df = self.__SqlResultToDataFrame(res,set_index)        
-        #データ行の状態データフレーム構築、イニシャライズ
-        data_dict:Dict[str,List[Any]]={}                
-        data_dict['ID'] = self.Int_DF.index.to_list()
-        data_dict['RowState'] = [DataRowState.NotChange for idx in self.Int_DF.index.to_list()] 
-        df = pd.DataFrame(data_dict,)
-        if(type(set_index) == str):
-            self.RowState_DF = df.set_index(set_index)       
+        if(incremental == None):
+            incremental = self.IncrementalMode
+        if(incremental and type(set_index) == str and type(self.Int_DF) == pd.DataFrame and self.__watermark != None):
+            return self.__IncrementalUpdate()
+        select_columns = self.__SelectColumns(columns, lazy_large_objects)
+        if(select_columns == []):
+            return False
+        if(select_columns != None and self.WatermarkColumn != None and not(self.WatermarkColumn in select_columns)):
+            select_columns.append(self.WatermarkColumn) #差分更新の基準列は常に読み込む
+        data_mtime = self.__FileMTime()
+        if(type(chunk_size) == int):
+            #分割読み込み、チャンク毎に列の配列へ書き込んで最後に1回だけデータフレームにする
+            if(chunk_size < 1):
+                self.err = Error.INVALID_INPUT
+                return False
+            chunk_df = self.__ChunksToDataFrame(chunk_size, set_index, select_columns)
+            if(type(chunk_df) != pd.DataFrame):
+                return False
+            self.Int_DF = chunk_df
+        else:
+            #SQLでデータベースの読み取り
+            sql = self.__SelectSQL(columns=select_columns)
+            with self.Lock.Read():
+                cursor = self.__ReadCursor()
+                cursor.execute(sql)
+                res = cursor.fetchall()
+            if(len(res)<1):
+                self.err = Error.NO_DATA_IN_TABLE
+                return False        
+            #データフレーム構築
+            self.Int_DF = self.__SqlResultToDataFrame(res,set_index,select_columns)
+        #データ行の状態イニシャライズ
+        self.RowState = np.full(len(self.Int_DF), DataRowState.NotChange.value, dtype=np.int8)
+        self.UpdatedIDs = set()
+        self.AddedIDs = set()
+        self.DeletedIDs = set()
+        self.__RebuildIndexes()
+        #差分更新の基準値
+        self.__watermark = self.__GetWatermark(self.Int_DF)
+        self.__refresh_count = 0
+        self.__data_mtime = data_mtime
+        self.__loaded_columns = None if select_columns == None else select_columns[1:]
             
         self.err = Error.NO_ERR
         return True        
     
-    def GetCopyInternalDataFrame(self) -> pd.DataFrame:
-        """内部データフレームのコピーを取得する。
+    @Instrumented
+    def ReadByChunks(self, chunk_size:int=default_chunk_rows,
+                     SerchDict:Optional[Dict[str,Any]]=None,
+                     Serch_condition:SerchCondition=SerchCondition.Exact,
+                     set_index:Optional[str]='ID',
+                     columns:Optional[List[str]]=None) -> Iterator[pd.DataFrame]:
+        """データベースの行をchunk_size行ずつ読み込み、データフレームで返す。（両モード）
+
+        Args:
+            chunk_size (int, optional): 1回に読み込む行数. Defaults to default_chunk_rows.
+            SerchDict (Optional[Dict[str,Any]], optional): 検索内容<列名,値>、Noneで全行. Defaults to None.
+            Serch_condition (SerchCondition, optional): 検索条件. Defaults to SerchCondition.Exact.
+            set_index (Optional[str], optional): インデクスにする行名. Defaults to 'ID'.
+            columns (Optional[List[str]], optional): 読み込む列、Noneで全列（IDの列は常に読み込む）. Defaults to None.
+
+        Yields:
+            Iterator[pd.DataFrame]: 最大chunk_size行のデータフレーム
+            
+        Remarks:
+            専用のカーソルでfetchmanyするので、テーブルの大きさに関わらず保持する結果はchunk_size行分だけになる。
+        """
+        if(type(chunk_size) != int or chunk_size < 1):
+            self.err = Error.INVALID_INPUT
+            return
+        select_columns = self.__SelectColumns(columns)
+        if(select_columns == []):
+            return
+        sql = self.__SelectSQL(SerchDict, Serch_condition, select_columns)
+        if(sql == ''):
+            return
+        self.err = Error.NO_ERR
+        cursor = self.__ReadChunkCursor()
+        try:
+            with self.Lock.Read():
+                cursor.execute(sql)
+            while True:
+                with self.Lock.Read():
+                    res = cursor.fetchmany(chunk_size)
+                if(len(res)<1):
+                    break
+                yield self.__SqlResultToDataFrame(res, set_index, select_columns)
+        finally:
+            cursor.close()
+
+    @Instrumented
+    def SaveSnapshot(self, SnapshotDir:str) -> bool:
+        """内部データフレームをスナップショット(列毎の.npyファイルと情報のJSON)として保存する。（データフレームモードのみ）
+
+        Args:
+            SnapshotDir (str): スナップショットを保存するディレクトリ
 
         Returns:
-            pd.DataFrame: 内部データフレームのコピー
-        
+            bool: 成功=True / 失敗=False
+
         Remarks:
-            行状態が削除のものはコピーされない
+            データベースファイル・テーブル毎のサブディレクトリに保存し、読み込んだ時のファイル更新日時・列情報・行状態も記録する。
+            文字列などobjectの列はpickleで保存する。
         """
-        #直接データベースアクセスモードでは動作しない
         if(self.DirectMode):
             self.err = Error.NOT_WORK_THIS_MODE
-            return pd.DataFrame()
-        #行StateがDeleted以外を返す。
-        serch_ser = self.RowState_DF['RowState'] != DataRowState.Deleted        
-        return self.Int_DF[serch_ser]
-    
-    def SelectRowByID(self, ID:Union[int,str,None], Ext_DF:pd.DataFrame=None) -> pd.DataFrame:
-        """IDでデータフレームの行を検索（IDがKEYインデクスになっている場合）
+            return False
+        if(type(self.Int_DF) != pd.DataFrame):
+            self.err = Error.NO_DATA_IN_TABLE
+            return False
+        snap_path = self.__SnapshotPath(SnapshotDir)
+        meta_path = os.path.join(snap_path, 'meta.json')
+        try:
+            os.makedirs(snap_path, exist_ok=True)
+            #書き込み中のスナップショットを読まないように情報ファイルを先に消し、最後に置き換える
+            if(os.path.exists(meta_path)):
+                os.remove(meta_path)
+            column_list = []
+            for i,col in enumerate(self.Int_DF.columns):
+                column_list.append([col, self.__SaveSnapshotArray(snap_path, f'c{i}', self.Int_DF[col])])
+            index_kind = self.__SaveSnapshotArray(snap_path, 'index', self.Int_DF.index.to_series())
+            np.save(os.path.join(snap_path, 'row_state.npy'), self.RowState)
+            meta = {
+                'version':snapshot_version,
+                'path':os.path.normcase(os.path.abspath(self.DataBase_Path)),
+                'table':self.TableName,
+                'mtime':self.__data_mtime,
+                'schema':self.__SnapshotSchema(),
+                'index':[self.Int_DF.index.name, index_kind],
+                'columns':column_list,
+            }
+            tmp_path = f'{meta_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_path, meta_path)
+        except OSError:
+            self.err = Error.INVALID_INPUT
+            return False
+        self.err = Error.NO_ERR
+        return True
+
+    @Instrumented
+    def LoadSnapshot(self, SnapshotDir:str, catch_up:bool=True) -> bool:
+        """スナップショットから内部データフレームを読み込み、データベースの変更を差分で反映する。（データフレームモードのみ）
 
         Args:
-            ID (int, str, None): ID, "*" or Noneで全検索
-            Ext_DF (pd.DataFrame, optional): 検索する外部データフレーム、Noneで内部データフレーム. Defaults to None.
+            SnapshotDir (str): SaveSnapshot()で保存したディレクトリ
+            catch_up (bool, optional): スナップショット保存後のデータベースの変更を反映する. Defaults to True.
 
         Returns:
-            pd.DataFrame: 検索結果
-        """
+            bool: 成功=True / 失敗=False（スナップショットが使えない場合はSNAPSHOT_MISMATCH）
+
+        Remarks:
+            数値・日時・Yes/Noの列はメモリマップ(コピーオンライト)で読み込むので、全件SELECTせずにすぐ使える。
+            データベースファイルの更新日時が保存時と同じ場合はデータベースに問い合わせない。
+            違う場合は削除行の照合と基準値より新しい行の読み込み(差分更新)を行う。既存行の変更も反映するにはSetIncrementalMode()で最終更新日時の列を指定する。
+            objectの列はpickleで読み込むので、自分で保存したスナップショットのみ読み込むこと。
+        """
+        if(self.DirectMode):
+            self.err = Error.NOT_WORK_THIS_MODE
+            return False
+        snap_path = self.__SnapshotPath(SnapshotDir)
+        try:
+            with open(os.path.join(snap_path, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if(meta.get('version') != snapshot_version
+               or meta.get('path') != os.path.normcase(os.path.abspath(self.DataBase_Path))
+               or meta.get('table') != self.TableName
+               or meta.get('schema') != self.__SnapshotSchema()):
+                self.err = Error.SNAPSHOT_MISMATCH
+                return False
+            data_dict:Dict[str,Any] = {}
+            for i,(col,kind) in enumerate(meta['columns']):
+                data_dict[col] = self.__LoadSnapshotArray(snap_path, f'c{i}', kind)
+            index_name, index_kind = meta['index']
+            index = pd.Index(self.__LoadSnapshotArray(snap_path, 'index', index_kind), name=index_name, copy=False)
+            row_state = np.load(os.path.join(snap_path, 'row_state.npy'))
+        except (OSError, ValueError, KeyError, TypeError):
+            self.err = Error.SNAPSHOT_MISMATCH
+            return False
+        if(len(index) != len(row_state) or any(len(values) != len(index) for values in data_dict.values())):
+            self.err = Error.SNAPSHOT_MISMATCH
+            return False
+        #メモリマップの配列をコピーせずにデータフレームにする
+        self.Int_DF = pd.DataFrame(data_dict, index=index, columns=[col for col,_ in meta['columns']], copy=False)
+        self.RowState = row_state.astype(np.int8, copy=False)
+        self.UpdatedIDs = set(index[row_state == DataRowState.Updated.value])
+        self.AddedIDs = set(index[row_state == DataRowState.Added.value])
+        self.DeletedIDs = set(index[row_state == DataRowState.Deleted.value])
+        self.__RebuildIndexes()
+        self.__watermark = self.__GetWatermark(self.Int_DF)
+        self.__refresh_count = 0
+        self.__data_mtime = meta['mtime']
+        snap_columns = [col for col,_ in meta['columns']]
+        self.__loaded_columns = None if snap_columns == [col for col in self.ColumnCatalog if col != index_name] else snap_columns
+        self.err = Error.NO_ERR
+        if(not(catch_up) or (meta['mtime'] != None and meta['mtime'] == self.__FileMTime())):
+            return True
+        #スナップショット保存後の変更を反映する
+        if(type(index_name) != str or self.__watermark == None):
+            return self.UpdateInternalDataFrame(set_index=index_name, incremental=False, columns=self.__loaded_columns)
+        self.__ReconcileDeletedRows(index_name)
+        return self.__IncrementalUpdate()
+
+    @Instrumented
+    def CreateIndex(self, ColumnName:str) -> bool:
+        """内部データフレームの列に検索インデックスを作る。（データフレームモードのみ）
+
+        Args:
+            ColumnName (str): インデックスを作る列名
+
+        Returns:
+            bool: 成功=True / 失敗=False
+            
+        Remarks:
+            SerchRows()のExactはハッシュ、StartWithと大小比較はソート済み配列の二分探索で検索する。
+            UpdateRow(), AddRow()、内部データフレームの更新に合わせてインデックスも更新される。
+        """
+        if(self.DirectMode):
+            self.err = Error.NOT_WORK_THIS_MODE
+            return False
+        if(not(ColumnName in self.ColumnCatalog)):
+            self.err = Error.INVALID_COLUMN_NAME
+            return False
+        if(type(self.Int_DF) == pd.DataFrame and ColumnName in self.Int_DF.columns):
+            self.Indexes[ColumnName] = ColumnIndex(self.Int_DF[ColumnName])
+        else:
+            self.Indexes[ColumnName] = ColumnIndex(pd.Series(dtype=object)) #内部データフレームの読み込み時に作り直す
+        self.err = Error.NO_ERR
+        return True
+    
+    def DropIndex(self, ColumnName:str) -> bool:
+        """列の検索インデックスを削除する。
+
+        Args:
+            ColumnName (str): インデックスを削除する列名
+
+        Returns:
+            bool: 成功=True / 失敗=False
+        """
+        if(not(ColumnName in self.Indexes)):
+            self.err = Error.INVALID_COLUMN_NAME
+            return False
+        del self.Indexes[ColumnName]
+        self.err = Error.NO_ERR
+        return True
+    
+    def SetIncrementalMode(self, Enable:bool=True, WatermarkColumn:Optional[str]=None, ReconcileInterval:int=10) -> bool:
+        """UpdateInternalDataFrame()の差分更新モードを設定する。（データフレームモードのみ）
+
+        Args:
+            Enable (bool, optional): 差分更新を有効=True / 無効=False. Defaults to True.
+            WatermarkColumn (Optional[str], optional): 基準列(数値または日時の列)、NoneでIDの最大値を基準とする. Defaults to None.
+            ReconcileInterval (int, optional): 差分更新何回毎に削除行の照合を行うか、0で照合しない. Defaults to 10.
+
+        Returns:
+            bool: 成功=True / 失敗=False
+            
+        Remarks:
+            IDを基準とする場合は追加された行のみ読み込む。既存行の変更も読み込む場合は最終更新日時の列を指定する。
+        """
+        if(self.DirectMode):
+            self.err = Error.NOT_WORK_THIS_MODE
+            return False
+        if(WatermarkColumn != None):
+            col_inf = self.ColumnCatalog.get(WatermarkColumn)
+            if(col_inf == None):
+                self.err = Error.INVALID_COLUMN_NAME
+                return False
+            if(not(col_inf.PyType in (int, float, Decimal, datetime))):
+                self.err = Error.DATA_TYPE_MISMATCH
+                return False
+        if(ReconcileInterval < 0):
+            self.err = Error.INVALID_INPUT
+            return False
+        self.IncrementalMode = Enable
+        if(WatermarkColumn != self.WatermarkColumn):
+            self.WatermarkColumn = WatermarkColumn
+            self.__watermark = self.__GetWatermark(self.Int_DF) if type(self.Int_DF) == pd.DataFrame else None
+        self.ReconcileInterval = ReconcileInterval
+        self.err = Error.NO_ERR
+        return True
+    
+    def SetResultCache(self, MaxEntries:int=default_cache_entries, TTL:float=default_cache_ttl) -> bool:
+        """検索結果キャッシュを設定する。（ダイレクトモードのみ）
+
+        Args:
+            MaxEntries (int, optional): キャッシュする最大件数(LRU)、0でキャッシュしない. Defaults to default_cache_entries.
+            TTL (float, optional): キャッシュの有効時間[s]. Defaults to default_cache_ttl.
+
+        Returns:
+            bool: 成功=True / 失敗=False
+            
+        Remarks:
+            SelectRowByID(), SerchRows(), SerchRowsByQuery()の結果をSELECT文をキーとしてキャッシュする。
+            このインスタンスからの書き込み(UpdateRow, AddRow, DeleteRowなど)で全て破棄する。
+            他のインスタンス・プロセスからの書き込みはTTLが過ぎるまで反映されない。
+        """
+        if(not(self.DirectMode)):
+            self.err = Error.NOT_WORK_THIS_MODE
+            return False
+        if(MaxEntries < 0 or TTL <= 0):
+            self.err = Error.INVALID_INPUT
+            return False
+        self.ResultCacheSize = MaxEntries
+        self.ResultCacheTTL = TTL
+        self.__ClearResultCache()
+        self.err = Error.NO_ERR
+        return True
+    
+    def SetReaderWriterMode(self, Enable:bool=True) -> bool:
+        """読み込み共有／書き込み排他モードを設定する。
+
+        Args:
+            Enable (bool, optional): 有効=True / 無効(読み込みも排他)=False. Defaults to True.
+
+        Returns:
+            bool: 成功=True / 失敗=False
+            
+        Remarks:
+            有効にすると複数スレッドからのSELECTはスレッド毎の接続・カーソルで同時に実行し、書き込みは排他で実行する。
+            待ち時間などの統計はLockStatsで確認できる。
+        """
+        if(self.Lock.busy):
+            self.err = Error.INVALID_INPUT #使用中は切り替えない
+            return False
+        self.Lock.ReaderWriter = Enable
+        self.err = Error.NO_ERR
+        return True
+    
+    @property
+    def LockStats(self) -> Dict[str,Any]:
+        """排他制御の取得・待ちの統計(read_acquires, write_acquires, waits, wait_seconds, max_wait_seconds)"""
+        return dict(self.Lock.Stats)
+    
+    def SetInstrumentation(self, Enable:bool=True, Callback:Optional[Callable[[str,Dict[str,Any]],None]]=None,
+                           Instrument:Optional[Instrumentation]=None) -> bool:
+        """メソッド毎の計測を設定する。
+
+        Args:
+            Enable (bool, optional): 計測する=True / 計測しない=False. Defaults to True.
+            Callback (Optional[Callable[[str,Dict[str,Any]],None]], optional): メソッドの呼び出し毎に(メソッド名, 計測)で呼ぶ関数. Defaults to None.
+            Instrument (Optional[Instrumentation], optional): 他のインスタンスと共有する計測、Noneで新しく作る. Defaults to None.
+
+        Returns:
+            bool: 成功=True / 失敗=False
+            
+        Remarks:
+            計測はInstrumentStatsで確認できる。無効にすると計測のコストは呼び出し毎に属性の確認1回だけになる。
+        """
+        if(self.Lock.busy):
+            self.err = Error.INVALID_INPUT #使用中は切り替えない
+            return False
+        if(not(Enable)):
+            self.Instrument = None
+            self.Lock.OnWait = None
+            self.err = Error.NO_ERR
+            return True
+        if(Instrument == None):
+            Instrument = Instrumentation(Callback)
+        elif(Callback != None):
+            Instrument.Callback = Callback
+        self.Instrument = Instrument
+        self.Lock.OnWait = lambda wait: Instrument.Add('busy_wait_seconds', wait)
+        self.err = Error.NO_ERR
+        return True
+    
+    @property
+    def InstrumentStats(self) -> Dict[str,Any]:
+        """メソッド毎の計測のスナップショット{'methods':<メソッド名,計測>, 'total':計測, 'callback_errors':..}、計測しない場合は{}"""
+        if(self.Instrument == None):
+            return {}
+        return self.Instrument.Stats
+    
+    @property
+    def LazyColumns(self) -> List[str]:
+        """内部データフレームに読み込んでいない列（UpdateInternalDataFrame()のcolumns, lazy_large_objectsで除いた列）"""
+        if(self.__loaded_columns == None):
+            return []
+        id_name = next(iter(self.ColumnCatalog))
+        return [col for col in self.ColumnCatalog if col != id_name and not(col in self.__loaded_columns)]
+    
+    @property
+    def busy(self) -> bool:
+        """データベース使用中（互換用）"""
+        return self.Lock.busy
+    
+    @property
+    def Int_DF(self) -> Optional[pd.DataFrame]:
+        """クラス内部データフレーム（追加バッファの行を反映してから返す）"""
+        self.__FlushAppendBuffer()
+        return self.__int_df
+    
+    @Int_DF.setter
+    def Int_DF(self, df:Optional[pd.DataFrame]) -> None:
+        self.__int_df = df
+        self.__append_ids = []
+        self.__append_cols = {}
+        self.__next_id = None
+    
+    @property
+    def RowState(self) -> Optional[np.ndarray]:
+        """クラス内部データフレームの行状態(DataRowStateの値、int8)、Int_DFの行と同じ順番"""
+        self.__FlushAppendBuffer()
+        return self.__row_state
+    
+    @RowState.setter
+    def RowState(self, state:Optional[np.ndarray]) -> None:
+        self.__row_state = state
+    
+    @property
+    def RowState_DF(self) -> pd.DataFrame:
+        """クラス内部データフレームの行状態（DataRowStateのデータフレーム、互換用）"""
+        if(type(self.RowState) != np.ndarray or type(self.Int_DF) != pd.DataFrame):
+            return None
+        return pd.DataFrame({'RowState':[DataRowState(v) for v in self.RowState]}, index=self.Int_DF.index)
+    
+    @Instrumented
+    def GetCopyInternalDataFrame(self) -> pd.DataFrame:
+        """内部データフレームのコピーを取得する。
+
+        Returns:
+            pd.DataFrame: 内部データフレームのコピー
+        
+        Remarks:
+            行状態が削除のものはコピーされない
+        """
+        #直接データベースアクセスモードでは動作しない
+        if(self.DirectMode):
+            self.err = Error.NOT_WORK_THIS_MODE
+            return pd.DataFrame()
+        #行StateがDeleted以外を返す。
+        return self.Int_DF[self.RowState != DataRowState.Deleted.value]
+    
+    @Instrumented
+    def SelectRowByID(self, ID:Union[int,str,None], Ext_DF:pd.DataFrame=None, columns:Optional[List[str]]=None) -> pd.DataFrame:
+        """IDでデータフレームの行を検索（IDがKEYインデクスになっている場合）
+
+        Args:
+            ID (int, str, None): ID, "*" or Noneで全検索
+            Ext_DF (pd.DataFrame, optional): 検索する外部データフレーム、Noneで内部データフレーム. Defaults to None.
+            columns (Optional[List[str]], optional): 結果の列、Noneで全列. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 検索結果
+            
+        Remarks:
+            ダイレクトモードはcolumnsの列だけSELECTする。
+            データフレームモードで内部データフレームに読み込んでいない列(LazyColumns)はIDでデータベースから読み込む。
+        """
         out_df = pd.DataFrame()        
+        select_columns = self.__SelectColumns(columns)
+        if(select_columns == []):
+            return out_df
         if(self.DirectMode and type(Ext_DF) == type(None)):    #ダイレクトアクセスモードの場合
             if ID =="*":
-                sql = self.__SelectSQL()
+                sql = self.__SelectSQL(columns=select_columns)
             else:
-                sql = self.__SelectSQL({"ID":ID})
-            self.__wait_busy()
-            self.busy=True
-            self.cursor.execute(sql)
-            res = self.cursor.fetchall()
-            self.busy=False
-            out_df = self.__SqlResultToDataFrame(res)
+                sql = self.__SelectSQL({"ID":ID}, columns=select_columns)
+            out_df = self.__CachedSelect(sql, columns=select_columns)
             out_df = out_df.replace([None],[float("nan")]).replace(["None"],[float("nan")])
         else: #クラス内データフレームモード            
             if(type(Ext_DF) == type(None)):
@@ -333,12 +1892,16 @@ class DataBaseCtrl():
                 Selected_DB = Ext_DF
             sel_ser = Selected_DB.index == ID
             out_df = Selected_DB[sel_ser]        
+            if(select_columns != None):
+                out_df = self.__ProjectRows(out_df, select_columns, type(Ext_DF) == type(None))
         return out_df
     
+    @Instrumented
     def SerchRows(self, SerchDict:Dict[str,Union[str,int,float,Decimal,bool]],
                   Serch_condition:SerchCondition=SerchCondition.Exact,
                   MultiSerch_Type:bool=True,
-                  Ext_DF:pd.DataFrame=None) -> pd.DataFrame:
+                  Ext_DF:pd.DataFrame=None,
+                  columns:Optional[List[str]]=None) -> pd.DataFrame:
         """検索条件で行を検索する。
 
         Args:
@@ -346,47 +1909,64 @@ class DataBaseCtrl():
             Serch_condition (SerchCondition, optional):検索条件. Defaults to SerchCondition.Exact.
             MultiSerch_Type (bool, optional): 検索Dictが複数の場合、AND検索=>True / OR検索=>False. Defaults to True.
             Ext_DF (pd.DataFrame, optional): 検索する外部データフレーム、Noneで内部データフレーム. Defaults to None.
+            columns (Optional[List[str]], optional): 結果の列、Noneで全列. Defaults to None.
 
         Returns:
             pd.DataFrame: 検索結果
             
         Remarks:
             検索内容は同じ列名(Key)で複数条件はできません。絞り込み検索は、一度出た結果を外部データフレームとして検索してください。        
+            データフレームモードでCreateIndex()した列は検索インデックスを使う。(Exact, StartWith, 大小比較)
+            ダイレクトモードはcolumnsの列だけSELECTする。
+            データフレームモードで内部データフレームに読み込んでいない列(LazyColumns)は、検索には使えず、columnsに指定するとIDでデータベースから読み込む。
         """      
         out_df = pd.DataFrame()
+        select_columns = self.__SelectColumns(columns)
+        if(select_columns == []):
+            return out_df
         if(self.DirectMode and type(Ext_DF) == type(None)): #直接アクセスモード
-            sql = self.__SelectSQL(SerchDict, Serch_condition)
-            self.__wait_busy()
-            self.busy=True
-            self.cursor.execute(sql)
-            res = self.cursor.fetchall()
-            self.busy=False
-            out_df = self.__SqlResultToDataFrame(res)
+            sql = self.__SelectSQL(SerchDict, Serch_condition, select_columns)
+            out_df = self.__CachedSelect(sql, columns=select_columns)
         else: #クラス内データフレームモード       
             #検索するデータフレーム       
             if(type(Ext_DF) == type(None)):
                 df = self.Int_DF
+                if(any(not(self.__IsLoadedColumn(key)) for key in SerchDict)):
+                    self.err = Error.INVALID_COLUMN_NAME #読み込んでいない列では検索できない
+                    return out_df
             elif(type(Ext_DF) == type(pd.DataFrame()) and not(Ext_DF.empty)):
                 df = Ext_DF
             else:
                 self.err = Error.INVALID_INPUT
                 return pd.DataFrame() # Empty DataFrame
         
-            #検索
+            #検索、検索インデックスがある列はインデックスでヒットした行の位置を求める
+            use_index = type(Ext_DF) == type(None) and len(self.Indexes) > 0 and df.index.is_unique
+            index_pos:Optional[np.ndarray] = None
             SerchSeries:pd.Series[bool] = pd.Series()       
             for key in SerchDict:            
                 serch:pd.Series[bool] = pd.Series()
-                if(Serch_condition == SerchCondition.Exact): #完全一致
+                id_list = self.__SerchByIndex(key, SerchDict[key], Serch_condition) if use_index else None
+                if(id_list != None):
+                    pos = df.index.get_indexer(id_list)
+                    pos = pos[pos >= 0]
+                    if(index_pos is None):
+                        index_pos = np.unique(pos)
+                    elif(MultiSerch_Type):
+                        index_pos = np.intersect1d(index_pos, pos)
+                    else:
+                        index_pos = np.union1d(index_pos, pos)
+                elif(Serch_condition == SerchCondition.Exact): #完全一致
                     serch = df[key] == SerchDict[key]
                 elif(Serch_condition == SerchCondition.StartWith): #～で始まる
                     if(type(SerchDict[key]) == str):
-                        serch = df[key].str.startswith(SerchDict[key])
+                        serch = df[key].str.startswith(SerchDict[key], na=False) #NULLは不一致（インデックスと同じ）
                 elif(Serch_condition == SerchCondition.EndWith): #～で終わる
                     if(type(SerchDict[key]) == str):
-                        serch = df[key].str.endswith(SerchDict[key])
+                        serch = df[key].str.endswith(SerchDict[key], na=False)
                 elif(Serch_condition == SerchCondition.Contains): #～を含む
                     if(type(SerchDict[key]) == str):
-                        serch = df[key].str.contains(SerchDict[key])
+                        serch = df[key].str.contains(SerchDict[key], na=False)
                 elif(Serch_condition == SerchCondition.SmallerThan): #~より小さい
                     if(type(SerchDict[key]) == int or type(SerchDict[key]) == float or type(SerchDict[key]) == Decimal):
                         serch = df[key] < SerchDict[key]
@@ -408,10 +1988,68 @@ class DataBaseCtrl():
                         SerchSeries = SerchSeries & serch
                     else:
                         SerchSeries = SerchSeries | serch
-            out_df = df[SerchSeries]
+            if(index_pos is None):
+                out_df = df[SerchSeries]
+            elif(SerchSeries.empty):
+                out_df = df.iloc[index_pos]
+            else: #インデックスの結果と全行比較の結果を合成
+                index_mask = np.zeros(len(df), dtype=bool)
+                index_mask[index_pos] = True
+                serch_mask = (SerchSeries == True).to_numpy() #NaNは不一致
+                if(MultiSerch_Type):
+                    out_df = df[serch_mask & index_mask]
+                else:
+                    out_df = df[serch_mask | index_mask]
+            if(select_columns != None):
+                out_df = self.__ProjectRows(out_df, select_columns, type(Ext_DF) == type(None))
                     
         return out_df   
     
+    @Instrumented
+    def SerchRowsByQuery(self, Query:SerchQuery, Ext_DF:pd.DataFrame=None, columns:Optional[List[str]]=None) -> pd.DataFrame:
+        """検索クエリで行を検索する。
+
+        Args:
+            Query (SerchQuery): 検索クエリ（列毎の条件、範囲、INリスト、AND/ORの入れ子）
+            Ext_DF (pd.DataFrame, optional): 検索する外部データフレーム、Noneで内部データフレーム. Defaults to None.
+            columns (Optional[List[str]], optional): 結果の列、Noneで全列. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 検索結果
+            
+        Remarks:
+            ダイレクトモード: 1つのWHERE句(パラメータ化)にして1回のSELECTで検索する。columnsの列だけSELECTする。
+            データフレームモード: 1つのbool配列にして検索する。
+            データフレームモードで内部データフレームに読み込んでいない列(LazyColumns)は、検索には使えず(INVALID_COLUMN_NAME)、columnsに指定するとIDでデータベースから読み込む。
+        """
+        err = Query.Validate(self.ColumnCatalog)
+        if(err != Error.NO_ERR):
+            self.err = err
+            return pd.DataFrame()
+        select_columns = self.__SelectColumns(columns)
+        if(select_columns == []):
+            return pd.DataFrame()
+        if(self.DirectMode and type(Ext_DF) == type(None)): #直接アクセスモード
+            where_sql, params = Query.ToSQL()
+            select_list = '*' if select_columns == None else ', '.join(select_columns)
+            sql = f'SELECT {select_list} FROM [{self.TableName}] WHERE {where_sql};'
+            self.err = Error.NO_ERR
+            return self.__CachedSelect(sql, params, columns=select_columns)
+        #クラス内データフレームモード
+        if(type(Ext_DF) == type(None)):
+            df = self.Int_DF
+            if(any(not(self.__IsLoadedColumn(col)) for col in Query.Columns())):
+                self.err = Error.INVALID_COLUMN_NAME #読み込んでいない列では検索できない
+                return pd.DataFrame()
+        else:
+            df = Ext_DF
+        self.err = Error.NO_ERR
+        out_df = df[Query.ToMask(df)]
+        if(select_columns != None):
+            out_df = self.__ProjectRows(out_df, select_columns, type(Ext_DF) == type(None))
+        return out_df
+    
+    @Instrumented
     def UpdateRow(self, ID:Union[int,str], UpdateDict:Dict[str,Any]) -> bool:
         """内部データフレームまたはデータベースの行を更新（変更）する。
 
@@ -428,7 +2066,9 @@ class DataBaseCtrl():
         """
         ret_bool:bool
         if(self.DirectMode):     #ダイレクトモード 
-            selected_df = self.SelectRowByID(ID)
+            self.__ClearResultCache() #キャッシュでない最新の行を確認する
+            update_columns = [key for key in UpdateDict if key in self.ColumnCatalog]
+            selected_df = self.SelectRowByID(ID, columns=update_columns if len(update_columns) > 0 else None) #変更する列だけ読み込む
             #IDがIndexとなる行が存在するか確認、また固有かどうか
             if(selected_df.empty):
                 self.err = Error.NO_ROW_EXIST
@@ -438,89 +2078,209 @@ class DataBaseCtrl():
                 return False
             #行の更新           
             for key in UpdateDict:
-                ValueType = self.Column_DF[self.Column_DF[self.col_inf_columns[3]] == key][self.col_inf_columns[5]]
-                if(ValueType.empty):
+                col_inf = self.ColumnCatalog.get(key)
+                if(col_inf == None):
                     self.err = Error.INVALID_COLUMN_NAME
                     return False
-                if(type(UpdateDict[key]) != Access_dtype_py[ValueType.values[0]]):
+                if(type(UpdateDict[key]) != col_inf.PyType):
                     self.err = Error.DATA_TYPE_MISMATCH
                     return False
                 selected_df.at[ID,key] = UpdateDict[key]
             sql = self.__UpdateSQL(selected_df)
-            self.__wait_busy()
-            self.busy=True
-            self.cursor.execute(sql[0])
-            self.conn.commit()
-            self.busy=False
+            with self.Lock.Write():
+                self.cursor.execute(sql[0])
+                self.__Commit()
+            self.__ClearResultCache()
             ret_bool = True                    
             
         else:   #内部データフレームモード
             #IDがIndexとなる行が存在するか確認        
-            if(self.Int_DF[self.Int_DF.index == ID].empty):
+            if(not(ID in self.Int_DF.index)):
                 self.err = Error.NO_ROW_EXIST
                 return False
             #行の更新        
             for key in UpdateDict:             
-                ValueType = self.Column_DF[self.Column_DF[self.col_inf_columns[3]] == key][self.col_inf_columns[5]]
-                if(ValueType.empty):
+                col_inf = self.ColumnCatalog.get(key)
+                if(col_inf == None or not(self.__IsLoadedColumn(key))):
                     self.err = Error.INVALID_COLUMN_NAME
                     return False
-                if(type(UpdateDict[key]) != ValueType.values[0]):
+                if(type(UpdateDict[key]) != col_inf.PyType):
                     self.err = Error.DATA_TYPE_MISMATCH
                     return False
                 #行の状態更新
-                if(self.RowState_DF.at[ID,'RowState'] == DataRowState.NotChange):
-                    self.Int_DF.at[ID,key] = UpdateDict[key]
-                    self.RowState_DF.at[ID,'RowState'] = DataRowState.Updated
-                elif(self.RowState_DF.at[ID,'RowState'] == DataRowState.Updated):
-                    self.Int_DF.at[ID,key] = UpdateDict[key]
-                    self.RowState_DF.at[ID,'RowState'] = DataRowState.Updated
-                elif(self.RowState_DF.at[ID,'RowState'] == DataRowState.Added):
-                    self.Int_DF.at[ID,key] = UpdateDict[key]
-                elif(self.RowState_DF.at[ID,'RowState'] == DataRowState.Deleted):
-                    pass
+                row_state = self.__GetRowState(ID)
+                if(row_state == DataRowState.Deleted):
+                    continue
+                self.__IndexSetValue(ID, key, UpdateDict[key])
+                self.Int_DF.at[ID,key] = UpdateDict[key]
+                if(row_state == DataRowState.NotChange):
+                    self.__SetRowState(ID, DataRowState.Updated)
             ret_bool =True
             
         return ret_bool
     
-    def UpdateRowByDataFrame(self, df:pd.DataFrame) -> bool:
-        """データベースにDataFaremeで行を更新する。（今のところDirectモードのみ）
+    @Instrumented
+    def UpdateRows(self, Rows:Dict[Union[int,str],Dict[str,Any]], CheckExist:bool=False,
+                   batch_size:int=max_batch_rows, fast_executemany:bool=True) -> bool:
+        """複数の行の指定した列だけを更新（変更）する。
 
         Args:
-            df (pd.DataFrame): 更新する行のデータフレーム（1行のみ）
+            Rows (Dict[Union[int,str],Dict[str,Any]]): 変更する内容<ID,<列名,変更後の値>>
+            CheckExist (bool, optional): 書き込み前に行が存在するか確認する. Defaults to False.
+            batch_size (int, optional): executemanyで1回に送る最大行数. Defaults to max_batch_rows.
+            fast_executemany (bool, optional): ドライバーが対応していればfast_executemanyを使う. Defaults to True.
 
         Returns:
             bool: 成功=True / 失敗=False
+            
+        Remarks:
+            ダイレクトモード: 行を読まずに、列の組み合わせ毎のパラメータ化バッチを1つのトランザクションで書き込む。失敗した場合は全てロールバックする。Transaction()中はTransaction()のコミットにまとめる。
+                CheckExist=TrueでIN検索で行の存在を一括確認し、存在しない行があれば書き込まない。(SyncStatsのmissing_ids)
+            データフレームモード: 内部データフレームが更新、データベースを更新（同期）させるまで変更されない。UpdateDataBase()
         """
-        ret_bool:bool = False
-        df = df.replace([None],[float("nan")]).replace(["None"],[float("nan")]) #NoneをNaNに統一
-        df = df.dropna(axis=1) #空白列削除
-        if(self.DirectMode):    #ダイレクトモード
-            if len(df) == 1:
-                chk_id = df.index[0]
-                chk_df = self.SelectRowByID(chk_id) #データベースのレコード確認
-                if len(chk_df) > 0:                    
-                    chk_df = chk_df.replace([None],[float("nan")]).replace(["None"],[float("nan")]) #NoneをNaNに統一
-                    chk_df = chk_df.dropna(axis=1) #空白列削除
-                    drop_columns = list(set(chk_df.columns) - set(df.columns)) #既存データ列のうち変更データにない列
-                    chk_df = chk_df.drop(columns=drop_columns) #不要な列を落とす
-                    add_columns = list(set(df.columns) - set(chk_df.columns)) #変更データ列にあり既存データ列にない列
-                    if len(add_columns) > 0:
-                        add_df = pd.DataFrame(columns=add_columns, index=df.index) #追加するDF
-                        chk_df = pd.concat([chk_df,add_df],axis=1) #DF追加
-                        chk_df = chk_df[df.columns] #列の順番をそろえる
-                    update_df = df.T[df.T!=chk_df.T].T.dropna(axis=1).dropna(how="all") #変更するべきデータのみを抽出
-                    if not(update_df.empty):                  
-                        sql_list = self.__UpdateSQL(update_df)
-                        self.__wait_busy()
-                        self.busy=True
-                        for sql in sql_list:                        
-                            self.cursor.execute(sql)                            
-                            ret_bool = True
-                        self.conn.commit()
-                        self.busy=False
-        return ret_bool
+        #列名・データ型の確認（書き込む前に全て）
+        for update_dict in Rows.values():
+            for key in update_dict:
+                col_inf = self.ColumnCatalog.get(key)
+                if(col_inf == None or not(self.__IsLoadedColumn(key))):
+                    self.err = Error.INVALID_COLUMN_NAME
+                    return False
+                if(type(update_dict[key]) != col_inf.PyType):
+                    self.err = Error.DATA_TYPE_MISMATCH
+                    return False
+        if(not(self.DirectMode)):   #内部データフレームモード
+            missing_ids = [ID for ID in Rows if not(ID in self.Int_DF.index)]
+            if(len(missing_ids) > 0):
+                self.err = Error.NO_ROW_EXIST
+                return False
+            failed_err:Optional[Error] = None
+            for ID,update_dict in Rows.items():
+                if(not(self.UpdateRow(ID, update_dict))):
+                    failed_err = self.err
+            if(failed_err != None):
+                self.err = failed_err
+                return False
+            self.err = Error.NO_ERR
+            return True
+        #ダイレクトモード
+        start_time = perf_counter()
+        stats:Dict[str,Any] = {'rows':len(Rows), 'batches':0, 'missing_ids':[]}
+        if(CheckExist):
+            exist_set = self.__SelectExistIDs(list(Rows))
+            stats['missing_ids'] = [ID for ID in Rows if not(ID in exist_set)]
+            if(len(stats['missing_ids']) > 0):
+                stats['seconds'] = perf_counter() - start_time
+                self.SyncStats = stats
+                self.err = Error.NO_ROW_EXIST
+                return False
+        #列の組み合わせ毎にまとめる
+        id_name = next(iter(self.ColumnCatalog))
+        groups:Dict[Tuple[str,...],List[Union[int,str]]] = {}
+        for ID,update_dict in Rows.items():
+            columns = tuple(sorted(update_dict, key=lambda col: self.ColumnCatalog[col].Ordinal))
+            groups.setdefault(columns, []).append(ID)
+        batch_list:List[Tuple[str,List[tuple]]] = []
+        for columns,id_list in groups.items():
+            for i in range(0,len(columns),max_colmun_length): #列が長い場合SQLコマンドを分割する
+                s_columns = columns[i:i+max_colmun_length]
+                sql = f'UPDATE [{self.TableName}] SET ' + ', '.join([f'{col} = ?' for col in s_columns]) + f' WHERE {id_name} = ?;'
+                dtype_list = [self.ColumnCatalog[col].DataType for col in s_columns]
+                params = [tuple(self.__ToSqlParam(dtype,Rows[ID][col]) for dtype,col in zip(dtype_list,s_columns)) + (self.__ToSqlParam(None,ID),)
+                          for ID in id_list]
+                for j in range(0,len(params),batch_size):
+                    batch_list.append((sql, params[j:j+batch_size]))
+        with self.Lock.Write():
+            affected = self.__ExecuteTransaction(batch_list, fast_executemany)
+        self.__ClearResultCache()
+        stats['batches'] = len(batch_list)
+        stats['seconds'] = perf_counter() - start_time
+        self.SyncStats = stats
+        if(affected == None):
+            self.err = Error.SQL_EXECUTE_ERR
+            return False
+        self.err = Error.NO_ERR
+        return True
+    
+    @Instrumented
+    def UpdateRowByDataFrame(self, df:pd.DataFrame, batch_size:int=max_batch_rows, fast_executemany:bool=True) -> bool:
+        """データベースにDataFaremeで行を更新する。（今のところDirectモードのみ）
+
+        Args:
+            df (pd.DataFrame): 更新する行のデータフレーム（インデックスがID、複数行可）
+            batch_size (int, optional): executemanyで1回に送る最大行数. Defaults to max_batch_rows.
+            fast_executemany (bool, optional): ドライバーが対応していればfast_executemanyを使う. Defaults to True.
+
+        Returns:
+            bool: 成功=True / 失敗=False（変更するデータが無い場合もFalse）
+            
+        Remarks:
+            失敗時のエラー: データフレームモード=NOT_WORK_THIS_MODE、空のdf=INVALID_INPUT、カタログに無い列=INVALID_COLUMN_NAME、列のデータ型が違う=DATA_TYPE_MISMATCH、
+            IDが1つもデータベースに無い=NO_ROW_EXIST、変更するセルが無い=NO_DATA_IN_TABLE、書き込み失敗=SQL_EXECUTE_ERR。
+            現在の行をIN検索で一括取得し、値が変わったセルだけを更新する。NaN/Noneのセルは変更しない。
+            データベースに存在しないIDの行は無視する。書き込みは1つのトランザクションで行い、失敗した場合は全てロールバックする。Transaction()中はTransaction()のコミットにまとめる。
+            書き込み統計はSyncStatsに保存される。
+        """
+        if(not(self.DirectMode)):
+            self.err = Error.NOT_WORK_THIS_MODE
+            return False
+        if(len(df) < 1):
+            self.err = Error.INVALID_INPUT
+            return False
+        start_time = perf_counter()
+        id_name = next(iter(self.ColumnCatalog))
+        columns = [col for col in df.columns if col != id_name]
+        for col in columns:
+            if(not(col in self.ColumnCatalog)):
+                self.err = Error.INVALID_COLUMN_NAME
+                return False
+        new_df = df[columns].replace(["None"],[float("nan")]) #NoneをNaNに統一
+        for col in columns:
+            if(not(self.__IsColumnOfType(new_df[col], self.ColumnCatalog[col].PyType))):
+                self.err = Error.DATA_TYPE_MISMATCH
+                return False
+        #データベースの現在の行を一括取得
+        cur_list:List[pd.DataFrame] = []
+        with self.Lock.Read():
+            cursor = self.__ReadCursor()
+            for sql,params in self.__InBatches(f'SELECT * FROM [{self.TableName}] WHERE {id_name}', df.index.to_list()):
+                cursor.execute(sql, params[0])
+                res = cursor.fetchall()
+                if(len(res) > 0):
+                    cur_list.append(self.__SqlResultToDataFrame(res, id_name))
+        if(len(cur_list) < 1):
+            self.err = Error.NO_ROW_EXIST
+            return False
+        cur_df = pd.concat(cur_list) if len(cur_list) > 1 else cur_list[0]
+        new_df = new_df[new_df.index.isin(cur_df.index)]
+        cur_df = cur_df.reindex(index=new_df.index, columns=columns)
+        #変更されたセルのマスク（新しい値がNaNのセルは変更しない、現在の値がNULLのセルは変更）
+        changed = np.zeros(new_df.shape, dtype=bool)
+        for j,col in enumerate(columns):
+            try:
+                equal = (new_df[col] == cur_df[col]).to_numpy(dtype=bool, na_value=False)
+            except TypeError: #比較できない型は変更とする
+                equal = np.zeros(len(new_df), dtype=bool)
+            changed[:,j] = new_df[col].notna().to_numpy() & ~equal
+        update_df = new_df.astype(object).where(changed)
+        update_df.index.name = id_name
+        batch_list = [(sql, params) for sql,params,_,_ in self.__UpdateBatches(update_df, batch_size)]
+        self.SyncStats = {'rows':len(df), 'changed_rows':int(changed.any(axis=1).sum()), 'changed_cells':int(changed.sum()),
+                          'batches':len(batch_list)}
+        if(len(batch_list) < 1):
+            self.SyncStats['seconds'] = perf_counter() - start_time
+            self.err = Error.NO_DATA_IN_TABLE #変更するデータが無い
+            return False
+        with self.Lock.Write():
+            affected = self.__ExecuteTransaction(batch_list, fast_executemany)
+        self.__ClearResultCache()
+        self.SyncStats['seconds'] = perf_counter() - start_time
+        if(affected == None):
+            self.err = Error.SQL_EXECUTE_ERR
+            return False
+        self.err = Error.NO_ERR
+        return True
             
+    @Instrumented
     def AddRow(self, AddDict:Dict[str,Any],ID:Union[int,str]=None) -> bool:
         """内部データフレームまたはデータベースに行を追加する。
 
@@ -537,67 +2297,89 @@ class DataBaseCtrl():
         """
         ret_bool:bool        
         #データ型の確認
-        column_names = self.Column_DF[self.col_inf_columns[3]]
-        column_type_tag = self.col_inf_columns[5]
+        column_names = list(self.ColumnCatalog)
         for key in AddDict:
-            ValueType = self.Column_DF[column_names == key][column_type_tag]
-            if(ValueType.empty):
+            col_inf = self.ColumnCatalog.get(key)
+            if(col_inf == None or not(self.__IsLoadedColumn(key))):
                 self.err = Error.INVALID_COLUMN_NAME
                 return False
-            if(type(AddDict[key]) != Access_dtype_py[ValueType.values[0]]):
+            if(type(AddDict[key]) != col_inf.PyType):
                 self.err = Error.DATA_TYPE_MISMATCH
                 return False
         
             
         if(self.DirectMode):    #ダイレクトモード
             if type(ID) == int or type(ID) == str:
-                AddDict[column_names.iloc[0]] = ID
+                AddDict[column_names[0]] = ID
                 new_row = pd.DataFrame([AddDict],columns=column_names)
-                new_row = new_row.set_index(column_names.iloc[0])
+                new_row = new_row.set_index(column_names[0])
             else:
                 new_row = pd.DataFrame([AddDict], columns=column_names)
             
             sql = self.__InsertSQL(new_row)
-            self.__wait_busy()
-            self.busy=True
-            self.cursor.execute(sql[0])
-            self.conn.commit()
-            self.busy=False
+            with self.Lock.Write():
+                self.cursor.execute(sql[0])
+                self.__Commit()
+            self.__ClearResultCache()
             ret_bool = True
         else:   #内部データフレームモード
-            #行の追加
+            #行の追加（追加バッファに貯めて、次に内部データフレームを使う時にまとめて反映する）
             if(type(ID) == type(None)):
-                new_id:Union[int,str] = self.Int_DF.index.max() + 1
+                new_id:Union[int,str] = self.__NextID()
             else:
                 new_id = ID
-            new_row = pd.DataFrame([AddDict],index=[new_id])
-            self.Int_DF = pd.concat([self.Int_DF,new_row])
-            self.RowState_DF.at[new_id,'RowState'] = DataRowState.Added
+            self.__AppendRows([new_id], {key:[val] for key,val in AddDict.items()})
             ret_bool = True
         
         return ret_bool
     
+    @Instrumented
     def AddRowByDataFrame(self, df:pd.DataFrame) -> bool:
-        """データベースにDataFaremeで行を追加する。（今のところDirectモードのみ）
+        """内部データフレームまたはデータベースにDataFaremeで行を追加する。
 
         Args:
-            df (pd.DataFrame): 追加する行のデータフレーム
+            df (pd.DataFrame): 追加する行のデータフレーム（インデックスがID）
 
         Returns:
             bool: 成功=True / 失敗=False
+            
+        Remarks:
+            データフレームモード: 追加バッファへ追加、データベースを更新（同期）させるまで変更されない。UpdateDataBase()
+            ダイレクトモード: データベースが直接追加される。
+            データフレームモードでは列の値のデータ型(DATA_TYPE_MISMATCH)と、IDの重複(df内・既存行・追加バッファ、DATA_NOT_UNIQUE_BY_ID)を確認し、問題があれば何も追加しない。
         """
         ret_bool:bool = False
+        if(not(self.DirectMode)):   #データフレームモード
+            id_name = next(iter(self.ColumnCatalog))
+            for col in df.columns:
+                if(not(col in self.ColumnCatalog) or col == id_name or not(self.__IsLoadedColumn(col))):
+                    self.err = Error.INVALID_COLUMN_NAME
+                    return False
+                if(not(self.__IsColumnOfType(df[col], self.ColumnCatalog[col].PyType))):
+                    self.err = Error.DATA_TYPE_MISMATCH
+                    return False
+            exist_mask = df.index.isin(self.AddedIDs) #追加バッファの行は全てAddedIDsにある
+            if(type(self.__int_df) == pd.DataFrame):
+                exist_mask |= df.index.isin(self.__int_df.index)
+            if(df.index.has_duplicates or exist_mask.any()):
+                self.err = Error.DATA_NOT_UNIQUE_BY_ID
+                return False
+            if(len(df) > 0):
+                self.__AppendRows(df.index.to_list(), {col:df[col].to_list() for col in df.columns})
+                self.err = Error.NO_ERR
+                ret_bool = True
+            return ret_bool
         if(self.DirectMode):    #ダイレクトモード            
             sql_list = self.__InsertSQL(df)
-            self.__wait_busy()
-            self.busy=True
-            for sql in sql_list:
-                self.cursor.execute(sql)
-                ret_bool = True
-            self.conn.commit()
-            self.busy=False        
+            with self.Lock.Write():
+                for sql in sql_list:
+                    self.cursor.execute(sql)
+                    ret_bool = True
+                self.__Commit(len(sql_list))
+            self.__ClearResultCache()
         return ret_bool
     
+    @Instrumented
     def DeleteRow(self, ID:Union[int,str], Del:bool=True) -> bool:
         """内部データフレームまたはデータベースの行を削除する(RowStateのみ変更)。
 
@@ -614,76 +2396,184 @@ class DataBaseCtrl():
         """
         ret_bool:bool                
         if(self.DirectMode):    #ダイレクトモード 
+            self.__ClearResultCache() #キャッシュでない最新の行を確認する
             del_df = self.SelectRowByID(ID)
             if(del_df.empty):
                 self.err = Error.NO_ROW_EXIST
                 return False
             sql = self.__DeleteSQL(del_df)
-            self.__wait_busy()
-            self.busy=True
-            self.cursor.execute(sql[0])
-            self.conn.commit()
-            self.busy=False
+            with self.Lock.Write():
+                self.cursor.execute(sql[0])
+                self.__Commit()
+            self.__ClearResultCache()
             ret_bool = True
             
         else:   #データフレームモード
             #IDがIndexとなる行が存在するか確認        
-            if(self.Int_DF.loc[ID].empty):
+            if(not(ID in self.Int_DF.index)):
                 self.err = Error.NO_ROW_EXIST
                 return False
             #行状態の変更
+            row_state = self.__GetRowState(ID)
             if(Del):
-                if(self.RowState_DF.at[ID,'RowState'] == DataRowState.NotChange):
-                    self.RowState_DF.at[ID,'RowState'] = DataRowState.Deleted
-                elif(self.RowState_DF.at[ID,'RowState'] == DataRowState.Updated):
+                if(row_state == DataRowState.NotChange):
+                    self.__SetRowState(ID, DataRowState.Deleted)
+                elif(row_state == DataRowState.Updated):
                     pass #アップデートした行は削除できない。一度データベースと同期をとってから削除してください
-                elif(self.RowState_DF.at[ID,'RowState'] == DataRowState.Added):
+                elif(row_state == DataRowState.Added):
                     pass #追加した行は削除できない。一度データベースと同期をとってから削除してください
-                elif(self.RowState_DF.at[ID,'RowState'] == DataRowState.Deleted):
+                elif(row_state == DataRowState.Deleted):
                     pass
             else:
-                if(self.RowState_DF.at[ID,'RowState'] == DataRowState.Deleted):
-                    self.RowState_DF.at[ID,'RowState'] = DataRowState.NotChange
+                if(row_state == DataRowState.Deleted):
+                    self.__SetRowState(ID, DataRowState.NotChange)
             ret_bool = True
         
         return ret_bool
     
-    def UpdateDataBase(self) -> bool:
+    @Instrumented
+    def DeleteRows(self, IDs:List[Union[int,str]], Del:bool=True) -> bool:
+        """内部データフレームまたはデータベースの複数の行を削除する。
+
+        Args:
+            IDs (List[Union[int,str]]): 削除する行IDリスト
+            Del (bool, optional): 削除=True / 削除を解除=False、ダイレクトモードでは解除できない. Defaults to True.
+
+        Returns:
+            bool: 成功=True / 失敗=False
+            
+        Remarks:
+            ダイレクトモード: DELETE ... WHERE ID IN (...)をSQL文の長さの制限内に分割し、1つのトランザクションで削除する。失敗した場合は全てロールバックする。Transaction()中はTransaction()のコミットにまとめる。
+                削除した行数はSyncStatsのdeleted_rowsに保存される。(存在しないIDは数えない)
+            データフレームモード: 各行をDeleteRow()で削除(行状態のみ変更)する。存在しないIDがある場合は何も変更しない。
+        """
+        if(not(self.DirectMode)):   #データフレームモード
+            if(not(all(ID in self.Int_DF.index for ID in IDs))):
+                self.err = Error.NO_ROW_EXIST
+                return False
+            for ID in IDs:
+                self.DeleteRow(ID, Del)
+            return True
+        #ダイレクトモード
+        if(not(Del)):
+            self.err = Error.NOT_WORK_THIS_MODE
+            return False
+        start_time = perf_counter()
+        id_name = next(iter(self.ColumnCatalog))
+        batch_list = self.__InBatches(f'DELETE FROM [{self.TableName}] WHERE {id_name}', list(IDs))
+        with self.Lock.Write():
+            affected = self.__ExecuteTransaction(batch_list)
+        self.__ClearResultCache()
+        self.SyncStats = {'rows':len(IDs), 'batches':len(batch_list), 'deleted_rows':affected if affected != None else 0,
+                          'seconds':perf_counter() - start_time}
+        if(affected == None):
+            self.err = Error.SQL_EXECUTE_ERR
+            return False
+        self.err = Error.NO_ERR
+        return True
+    
+    @Instrumented
+    def UpdateDataBase(self, batch_size:int=max_batch_rows, fast_executemany:bool=True, reload:bool=True) -> bool:
         """データベースを内部DataFrameで更新する（同期）。ダイレクトモードでは動作しない。
 
+        Args:
+            batch_size (int, optional): executemanyで1回に送る最大行数. Defaults to max_batch_rows.
+            fast_executemany (bool, optional): ドライバーが対応していればfast_executemanyを使う. Defaults to True.
+            reload (bool, optional): 同期後にデータベースから全件読み込む=True / 内部データフレームの行状態だけを更新する=False. Defaults to True.
+
         Returns:
             bool: 成功=True / 失敗=False
+            
+        Remarks:
+            変更行は値のある列の組み合わせ毎にまとめ、パラメータ化したexecutemanyで書き込み、最後に1回だけコミットする。
+            失敗したバッチだけを2分割しながら書き込み直し、失敗した行を特定する。書き込み統計はSyncStatsに保存される。
+            書き込めた行だけをコミットし、書き込めなかった行(SyncStatsのfailed_ids)は書き込まない。
+            reload=Falseまたは書き込めなかった行がある場合は読み直さず、書き込めた更新・追加行は変化なしにし、削除行は内部データフレームから取り除く（SELECTしない）。
+            書き込めなかった行は内容と行状態を残すので、再度UpdateDataBase()で書き込める。
         """
         #ダイレクトモードでは動作しない
         if(self.DirectMode): 
             self.err = Error.NOT_WORK_THIS_MODE
             return False        
-        sql_list:List[str] =[]
-        #UpdateのSQL
-        update_rows_ser = self.RowState_DF['RowState'] == DataRowState.Updated        
-        updated_df = self.Int_DF[update_rows_ser]
+        start_time = perf_counter()
+        batch_list:List[Tuple[str,List[tuple],pd.DataFrame,Callable[[pd.DataFrame],List[str]]]] = []
+        #Updateのバッチ
+        updated_df = self.Int_DF.loc[list(self.UpdatedIDs)]
         if(not(updated_df.empty)):
-            sql_list.extend(self.__UpdateSQL(updated_df))        
-        #InsertのSQL
-        insert_rows_ser = self.RowState_DF['RowState'] == DataRowState.Added
-        insert_df = self.Int_DF[insert_rows_ser]
+            batch_list.extend(self.__UpdateBatches(updated_df, batch_size))        
+        #Insertのバッチ
+        insert_df = self.Int_DF.loc[list(self.AddedIDs)]
         if(not(insert_df.empty)):
-            sql_list.extend(self.__InsertSQL(insert_df))
-        #DeleteのSQL
-        delete_rows_ser = self.RowState_DF['RowState'] == DataRowState.Deleted
-        delete_df = self.Int_DF[delete_rows_ser]
+            batch_list.extend(self.__InsertBatches(insert_df, batch_size))
+        #Deleteのバッチ
+        delete_df = self.Int_DF.loc[list(self.DeletedIDs)]
         if(not(delete_df.empty)):
-            sql_list.extend(self.__DeleteSQL(delete_df))            
+            batch_list.extend(self.__DeleteBatches(delete_df, batch_size))            
         #SQLの実行
-        self.__wait_busy()
-        self.busy=True
-        for sql in sql_list:
-            self.cursor.execute(sql)
-        self.conn.commit()
-        self.busy=False
-        self.UpdateInternalDataFrame()
+        with self.Lock.Write():
+            stats = self.__ExecuteBatches(batch_list, fast_executemany)
+        #書き込み統計
+        elapsed = perf_counter() - start_time
+        stats['rows'] = len(updated_df) + len(insert_df) + len(delete_df)
+        stats['seconds'] = elapsed
+        stats['rows_per_sec'] = (stats['rows'] - len(stats['failed_ids'])) / elapsed if elapsed > 0 else 0.0
+        self.SyncStats = stats
+        stats['reloaded'] = reload and len(stats['failed_ids']) < 1
+        if(stats['reloaded']):
+            self.UpdateInternalDataFrame(incremental=False, columns=self.__loaded_columns) #読み込んだ列のまま読み直す
+        else:
+            self.__ApplySyncedRowState(stats['failed_ids']) #読み直すと書き込めなかった行の変更が消えるので行状態だけ更新する
+        if(len(stats['failed_ids']) > 0):
+            self.err = Error.SQL_EXECUTE_ERR
+            return False
         return True
 
+    @contextmanager
+    def Transaction(self, batch_size:int=max_batch_rows) -> Iterator[Dict[str,Any]]:
+        """ダイレクトモードの書き込みのコミットをまとめるトランザクション（with文で使う）
+
+        Args:
+            batch_size (int, optional): 何文毎にコミットするか. Defaults to max_batch_rows.
+
+        Yields:
+            Iterator[Dict[str,Any]]: コミット統計(TransactionStatsと同じ)
+            
+        Remarks:
+            UpdateRow, AddRow, DeleteRow, AddRowByDataFrameは文毎にコミットせず、batch_size文毎とwithを抜ける時にコミットする。
+            with内で例外が発生した場合は未コミットの文をロールバックして例外をそのまま伝える。
+            トランザクション中は書き込みで排他制御を取得するので、他のスレッドからの読み込み・書き込みは終了まで待つ。
+            UpdateRows, UpdateRowByDataFrame, DeleteRowsもコミットせずパラメータ行数を文数として数える。これらが失敗した場合はpyodbc.Errorを伝えてロールバックする。
+            列の追加などは保留中の文をコミットしてから独自にコミットする。
+            同じスレッドからの入れ子のTransaction()は外側のトランザクションにまとめる。
+        """
+        if(type(batch_size) != int or batch_size < 1):
+            raise ValueError(f'batch_size must be a positive int: {batch_size}')
+        me = threading.get_ident()
+        if(self.__txn_owner == me): #入れ子は外側にまとめる
+            yield self.TransactionStats
+            return
+        with self.Lock.Write():
+            self.TransactionStats = {'batch_size':batch_size, 'statements':0, 'commits':0, 'statements_per_commit':[],
+                                     'rolled_back_statements':0, 'seconds':0.0}
+            self.__txn_owner = me
+            self.__txn_batch = batch_size
+            self.__txn_pending = 0
+            start_time = perf_counter()
+            try:
+                yield self.TransactionStats
+                self.__CommitPending()
+            except BaseException:
+                self.TransactionStats['rolled_back_statements'] = self.__txn_pending
+                self.__txn_pending = 0
+                if(not(self.__connect_pending) and self.__conn != None):
+                    self.__conn.rollback()
+                self.__ClearResultCache() #未コミットの行を読んだ結果を残さない
+                raise
+            finally:
+                self.__txn_owner = None
+                self.TransactionStats['seconds'] = perf_counter() - start_time
+
+    @Instrumented
     def AddColumn_DataBase(self, ColmunName:str, DataType:AccessDataType, param_list:list=[]) -> bool:
         """データベースへ列を追加する。
 
@@ -757,14 +2647,16 @@ class DataBaseCtrl():
             self.err = Error.INVALID_INPUT
             return False
         
-        self.__wait_busy()
-        self.busy=True        
-        self.cursor.execute(sql)
-        self.conn.commit()
-        self.busy=False
+        with self.Lock.Write():
+            self.__CommitPending()
+            self.cursor.execute(sql)
+            self.conn.commit()
+        self.__ClearResultCache()
+        schema_cache.Remove(self.DataBase_Path, self.TableName) #列情報を取り直せなくても古い列情報を使わない
         self.__GetColumnNameFromDataBase()
         return True    
     
+    @Instrumented
     def DeleteColumn_DataBase(self, ColumnName:str) -> bool:
         """データベースから列を削除する。
 
@@ -775,14 +2667,16 @@ class DataBaseCtrl():
             bool: 成功=True / 失敗=False
         """
         sql = f"ALTER TABLE {self.TableName} DROP COLUMN {ColumnName};"
-        self.__wait_busy()
-        self.busy=True
-        self.cursor.execute(sql)
-        self.conn.commit()
-        self.busy=False
+        with self.Lock.Write():
+            self.__CommitPending()
+            self.cursor.execute(sql)
+            self.conn.commit()
+        self.__ClearResultCache()
+        schema_cache.Remove(self.DataBase_Path, self.TableName) #列情報を取り直せなくても古い列情報を使わない
         self.__GetColumnNameFromDataBase()
         return True
     
+    @Instrumented
     def AddTable_DataBase(self, PriKeyInf:tuple[str,AccessDataType], param:Optional[int]=None) -> bool:
         """データベースにテーブルを追加する
 
@@ -805,37 +2699,113 @@ class DataBaseCtrl():
             else:
                 sql=""
             if len(sql) > 0:
-                self.__wait_busy()
-                self.busy=True
-                self.cursor.execute(sql)
-                self.conn.commit()
-                self.busy=False
+                with self.Lock.Write():
+                    self.__CommitPending()
+                    self.cursor.execute(sql)
+                    self.conn.commit()
+                schema_cache.Remove(self.DataBase_Path, self.TableName)
                 self.__GetColumnNameFromDataBase()
                 ret_bool = True
         return ret_bool
     
-    def __SelectSQL(self, Data:Dict[str,Any]=None,
-                    Serch_condition:SerchCondition=SerchCondition.Exact
-                    ) -> str:
-        """SELECTのSQL
+    def __SelectColumns(self, columns:Optional[List[str]], lazy_large_objects:bool=False) -> Optional[List[str]]:
+        """SELECTする列のリスト（IDの列が先頭）
 
         Args:
-            Data (Dict[str,Any], optional): 検索データ / Noneで全データ. Defaults to None.
-            Serch_condition (SerchCondition, optional):検索条件. Defaults to SerchCondition.Exact.
+            columns (Optional[List[str]]): 列名リスト、Noneで全列
+            lazy_large_objects (bool, optional): 大きなデータの型(large_object_types)の列を除く. Defaults to False.
 
         Returns:
-            str: SQLコマンド文字列
-            
+            Optional[List[str]]: SELECTする列のリスト、全列の場合はNone、列名が不正な場合は[]（INVALID_COLUMN_NAME）
+        """
+        if(columns == None and not(lazy_large_objects)):
+            return None
+        if(columns == None):
+            columns = list(self.ColumnCatalog)
+        elif(type(columns) == str or any(not(col in self.ColumnCatalog) for col in columns)):
+            self.err = Error.INVALID_COLUMN_NAME
+            return []
+        id_name = next(iter(self.ColumnCatalog))
+        out_list = [id_name]
+        for col in dict.fromkeys(columns):
+            if(col == id_name or (lazy_large_objects and self.ColumnCatalog[col].DataType in large_object_types)):
+                continue
+            out_list.append(col)
+        return out_list
+    
+    def __IsLoadedColumn(self, ColumnName:str) -> bool:
+        """内部データフレームに読み込んだ列か（ダイレクトモード・全列読み込みは常にTrue）"""
+        if(self.DirectMode or self.__loaded_columns == None):
+            return True
+        return ColumnName in self.__loaded_columns or ColumnName == next(iter(self.ColumnCatalog))
+    
+    def __ProjectRows(self, Data:pd.DataFrame, columns:List[str], fetch_lazy:bool) -> pd.DataFrame:
+        """検索結果の行を指定の列にする。内部データフレームに無い列はIDでデータベースから読み込む。
+
+        Args:
+            Data (pd.DataFrame): 検索結果（インデックスがID）
+            columns (List[str]): 結果の列(__SelectColumns()の結果)
+            fetch_lazy (bool): 無い列をデータベースから読み込む=True / 不正な列名とする=False
+
+        Returns:
+            pd.DataFrame: 指定の列の検索結果、無い列を読み込まない場合は空のデータフレーム（INVALID_COLUMN_NAME）
+        """
+        out_columns = [col for col in columns if col != Data.index.name]
+        lazy_columns = [col for col in out_columns if not(col in Data.columns)]
+        if(len(lazy_columns) < 1):
+            return Data[out_columns]
+        if(not(fetch_lazy)):
+            self.err = Error.INVALID_COLUMN_NAME
+            return pd.DataFrame()
+        lazy_df = self.__SelectColumnsByID(lazy_columns, Data.index.unique().to_list()).reindex(Data.index)
+        return pd.concat([Data[[col for col in out_columns if col in Data.columns]], lazy_df], axis=1)[out_columns]
+    
+    def __SelectColumnsByID(self, columns:List[str], ids:List[Union[int,str]]) -> pd.DataFrame:
+        """IDの行の指定の列をデータベースから読み込む。（WHERE ID IN (...)）
+
+        Args:
+            columns (List[str]): 列名リスト（IDの列を除く）
+            ids (List[Union[int,str]]): IDリスト
+
+        Returns:
+            pd.DataFrame: 読み込んだ列（インデックスがID）、データベースに無いIDの行は含まない
+        """
+        id_name = next(iter(self.ColumnCatalog))
+        select_columns = [id_name] + columns
+        res:List[pyodbc.Row] = []
+        if(len(ids) > 0):
+            with self.Lock.Read():
+                cursor = self.__ReadCursor()
+                for sql,params in self.__InBatches(f"SELECT {', '.join(select_columns)} FROM [{self.TableName}] WHERE {id_name}", ids):
+                    cursor.execute(sql, params[0])
+                    res.extend(cursor.fetchall())
+        if(len(res) < 1):
+            return pd.DataFrame(columns=columns, index=pd.Index([], name=id_name))
+        return self.__SqlResultToDataFrame(res, id_name, select_columns)
+    
+    @InstrumentedPhase('sql_seconds')
+    def __SelectSQL(self, Data:Dict[str,Any]=None,
+                    Serch_condition:SerchCondition=SerchCondition.Exact,
+                    columns:Optional[List[str]]=None
+                    ) -> str:
+        """SELECTのSQL
+
+        Args:
+            Data (Dict[str,Any], optional): 検索データ / Noneで全データ. Defaults to None.
+            Serch_condition (SerchCondition, optional):検索条件. Defaults to SerchCondition.Exact.
+            columns (Optional[List[str]], optional): SELECTする列(__SelectColumns()の結果)、Noneで全列(*). Defaults to None.
+
+        Returns:
+            str: SQLコマンド文字列
+            
         Remarks:
             Data:検索データが文字列で*を含む場合は曖昧検索になる
             
         Todo:
             OR検索の対応。現状はAND検索のみ対応
         """        
-        col_name_tag = self.col_inf_columns[3]
-        column_names = self.Column_DF[col_name_tag]
-        col_type_tag = self.col_inf_columns[5]
-        sql_str = f'SELECT * FROM [{self.TableName}]'
+        select_list = '*' if columns == None else ', '.join(columns)
+        sql_str = f'SELECT {select_list} FROM [{self.TableName}]'
         if(type(Data) == type(None)):
             return sql_str
         elif(type(Data) != dict):
@@ -844,10 +2814,11 @@ class DataBaseCtrl():
                
         sql_str += ' WHERE'
         for i,key in enumerate(Data):             
-            py_dtype = Access_dtype_py[self.Column_DF[column_names==key][col_type_tag][0]]
-            if(not(key in column_names.to_list())):
+            col_inf = self.ColumnCatalog.get(key)
+            if(col_inf == None):
                 self.err = Error.INVALID_COLUMN_NAME
                 return ''
+            py_dtype = col_inf.PyType
             if i > 0:
                 sql_str += " AND "                                
             if type(Data[key]) == int and py_dtype == int:
@@ -893,17 +2864,18 @@ class DataBaseCtrl():
                     self.err = Error.SELECT_CONDITION_ERR
                     return ""
             elif type(Data[key]) == str and py_dtype == str:
-                if(str(Data[key]).find('*')>=0):                        
-                    sql_str += f' {key} LIKE \'{str(Data[key]).translate(wild_card)}\''
+                str_val = Data[key].translate(quote_escape)
+                if(str_val.find('*')>=0):                        
+                    sql_str += f' {key} LIKE \'{str_val.translate(wild_card)}\''
                 else:
                     if(Serch_condition == SerchCondition.Exact):
-                        sql_str += f' {key} = \'{Data[key]}\''
+                        sql_str += f' {key} = \'{str_val}\''
                     elif(Serch_condition == SerchCondition.StartWith):
-                        sql_str += f" {key} LIKE \'{Data[key]}%\'"
+                        sql_str += f" {key} LIKE \'{str_val}%\'"
                     elif(Serch_condition == SerchCondition.EndWith):
-                        sql_str += f" {key} LIKE \'%{Data[key]}\'"
+                        sql_str += f" {key} LIKE \'%{str_val}\'"
                     elif(Serch_condition == SerchCondition.Contains):
-                        sql_str += f" {key} LIKE \'%{Data[key]}%\'"
+                        sql_str += f" {key} LIKE \'%{str_val}%\'"
                     else:
                         self.err = Error.SELECT_CONDITION_ERR
                         return ""
@@ -920,6 +2892,7 @@ class DataBaseCtrl():
         sql_str = sql_str + ';'
         return sql_str
         
+    @InstrumentedPhase('sql_seconds')
     def __UpdateSQL(self, Data:pd.DataFrame) -> List[str]:
         """SELECTのSQL
 
@@ -930,7 +2903,6 @@ class DataBaseCtrl():
             List[str]: SQLコマンド文字列リスト
         """        
         out_str_list:List[str] = []      
-        col_name_ser = self.Column_DF[self.col_inf_columns[3]]
         sql_Data = Data.replace([None],float("nan")).replace(["None"],float("nan"))
         sql_Data = sql_Data.dropna(axis=1)
         if(sql_Data.empty):
@@ -946,62 +2918,22 @@ class DataBaseCtrl():
             end_idx = max_colmun_length*(i+1)
             Sql_data_list.append(sql_Data.iloc[:,str_idx:end_idx])
         # Spl command 作成    
+        id_lit_ser = self.__RenderIDLiterals(sql_Data.index)
         for s_sql_data in Sql_data_list: #列分割でのIter、中身はDataFrameで回す
-            for row in s_sql_data.iterrows(): #DataFrame行毎Iter
-                sql_str = f'UPDATE [{self.TableName}] SET'
-                idx = row[0]
-                content_ser = row[1]
-                for col,val in content_ser.items(): #DataFrame列毎Iter                
-                    AccCol_dtype = self.Column_DF[col_name_ser == col][self.col_inf_columns[5]].values[0]
-                    if(AccCol_dtype == AccessDataType.CHAR or
-                    AccCol_dtype == AccessDataType.VARCHAR or
-                    AccCol_dtype == AccessDataType.MEMO or
-                    AccCol_dtype == AccessDataType.GUID):                        
-                        sql_str += f' {col} = \'{val}\','
-                    elif(AccCol_dtype == AccessDataType.BYTE or
-                        AccCol_dtype == AccessDataType.INTEGER or
-                        AccCol_dtype == AccessDataType.LONG or
-                        AccCol_dtype == AccessDataType.AUTOINCREMENT):
-                        sql_str += f' {col} = {val},'
-                    elif(AccCol_dtype == AccessDataType.SINGLE or 
-                        AccCol_dtype == AccessDataType.DOUBLE or
-                        AccCol_dtype == AccessDataType.REAL):
-                        sql_str += f' {col} = {val},'
-                    elif(AccCol_dtype == AccessDataType.CURRENCY):
-                        sql_str += f' {col} = {val},'
-                    elif(AccCol_dtype == AccessDataType.DATE):
-                        datetime_py:date = val
-                        sql_str += f' {col} = \'{datetime_py.strftime("%Y/%m/%d")}\','
-                    elif(AccCol_dtype == AccessDataType.TIME):                    
-                        datetime_py:time = val
-                        sql_str += f' {col} = \'{datetime_py.strftime("%H:%M:%S")}\','
-                    elif(AccCol_dtype == AccessDataType.DATETIME):                    
-                        datetime_py:datetime = val
-                        sql_str += f' {col} = \'{datetime_py.strftime("%Y/%m/%d %H:%M:%S")}\','
-                    elif(AccCol_dtype == AccessDataType.TIMESTAMP):
-                        sql_str += f' {col} = \'{val}\','                
-                    elif(AccCol_dtype == AccessDataType.YESNO or
-                        AccCol_dtype == AccessDataType.BIT):
-                        if(val):
-                            sql_str += f' {col} = 1,'
-                        else:
-                            sql_str += f' {col} = 0,'
-                    elif(AccCol_dtype == AccessDataType.OLEOBJECT):
-                        sql_str += f' {col} = {val},'
-                    elif(AccCol_dtype == AccessDataType.VARBINARY):
-                        datetime_py:time = val
-                        sql_str += f' {col} = \'{datetime_py.strftime("%H:%M:%S.%f")}\','                                                  
-                    else:
-                        self.err = Error.UNDEFINED_DATA_TYPE
-                        return [""]
-                if(type(idx) == int):
-                    sql_str = sql_str[0:-1] + f' WHERE {sql_Data.index.name} = {idx};'
-                elif(type(idx) == str):
-                    sql_str = sql_str[0:-1] + f' WHERE {sql_Data.index.name} = \'{idx}\';'
-                
-                out_str_list.append(sql_str)
+            for col in s_sql_data.columns:
+                col_inf = self.ColumnCatalog.get(col)
+                if(col_inf == None or col_inf.Literal == None):
+                    self.err = Error.UNDEFINED_DATA_TYPE
+                    return [""]
+            lit_df = self.__RenderLiteralFrame(s_sql_data)
+            sql_ser = pd.Series(f'UPDATE [{self.TableName}] SET', index=lit_df.index, dtype=object)
+            for i,col in enumerate(lit_df.columns): #列毎に連結
+                sql_ser = sql_ser + (f' {col} = ' if i < 1 else f', {col} = ') + lit_df[col]
+            sql_ser = sql_ser + f' WHERE {self.__IDColumnName(sql_Data)} = ' + id_lit_ser + ';'
+            out_str_list.extend(sql_ser[id_lit_ser.notna().to_numpy()].to_list())
         return out_str_list
             
+    @InstrumentedPhase('sql_seconds')
     def __InsertSQL(self, Data:pd.DataFrame) -> List[str]:
         """INSERTのSQL
 
@@ -1011,10 +2943,7 @@ class DataBaseCtrl():
         Returns:
             List[str]: SQLコマンド文字列リスト
         """
-        max_colmun_len_ins:int = 255 #Insertの場合分割不可能、Accessが扱える最大値255で固定       
         out_str_list:List[str] = []
-        col_name_ser = self.Column_DF[self.col_inf_columns[3]]
-        col_dtype_tag = self.col_inf_columns[5]
         sql_Data = Data.replace([None],float("nan")).replace(["None"],float("nan"))
         sql_Data = sql_Data.dropna(axis=1)      
         if(sql_Data.shape[0] < 1):
@@ -1028,83 +2957,80 @@ class DataBaseCtrl():
             end_idx = max_colmun_len_ins*(i+1)
             Sql_data_list.append(sql_Data.iloc[:,str_idx:end_idx])
         # SQLコマンド作成
+        id_lit_ser = self.__RenderIDLiterals(sql_Data.index)
         for s_sql_data in Sql_data_list:     #列分割でのIter、中身はDataFrameで回す        
-            for row in s_sql_data.iterrows():   # DataFrame行でのIter
-                idx = row[0]
-                content_ser = row[1]
-                sql_str = f'INSERT INTO [{self.TableName}]'
-                sql_col = '('
-                sql_val = 'VALUES ('
-                if type(idx) == int:
-                    sql_col += f"{sql_Data.index.name},"
-                    sql_val += f"{idx}"
-                elif type(idx) == str:
-                    sql_col += f"{sql_Data.index.name},"
-                    sql_val += f"\'{idx}\',"                            
-                for col,val in content_ser.items(): # DataFrame列でのIter
-                    if not(self.Column_DF[col_name_ser == col][col_dtype_tag].empty):                                     
-                        AccCol_dtype = self.Column_DF[col_name_ser == col][col_dtype_tag].values[0]
-                        if(AccCol_dtype == AccessDataType.CHAR or
-                        AccCol_dtype == AccessDataType.VARCHAR or
-                        AccCol_dtype == AccessDataType.MEMO or
-                        AccCol_dtype == AccessDataType.GUID):
-                            sql_col += f'{col}, '
-                            val_str:str = val
-                            sql_val += f'\'{val_str.translate(str.maketrans({"'":"`"}))}\', '
-                        elif(AccCol_dtype == AccessDataType.BYTE or
-                            AccCol_dtype == AccessDataType.INTEGER or
-                            AccCol_dtype == AccessDataType.LONG or
-                            AccCol_dtype == AccessDataType.AUTOINCREMENT):
-                            sql_col += f'{col}, '
-                            sql_val += f'{val}, '                    
-                        elif(AccCol_dtype == AccessDataType.SINGLE or 
-                            AccCol_dtype == AccessDataType.DOUBLE or
-                            AccCol_dtype == AccessDataType.REAL):
-                            sql_col += f'{col}, '
-                            sql_val += f'{val}, '                    
-                        elif(AccCol_dtype == AccessDataType.CURRENCY):
-                            sql_col += f'{col}, '
-                            sql_val += f'{val}, '
-                        elif(AccCol_dtype == AccessDataType.DATE):
-                            datetime_py:date = val
-                            sql_col += f'{col}, '
-                            sql_val += f' \'{datetime_py.strftime("%Y/%m/%d")}\', '
-                        elif(AccCol_dtype == AccessDataType.TIME):                    
-                            datetime_py:time = val
-                            sql_col += f'{col}, '
-                            sql_val += f'\'{datetime_py.strftime("%H:%M:%S")}\', '
-                        elif(AccCol_dtype == AccessDataType.DATETIME):                    
-                            datetime_py:datetime = val
-                            sql_col += f'{col}, '
-                            sql_val += f'\'{datetime_py.strftime("%Y/%m/%d %H:%M:%S")}\', '
-                        elif(AccCol_dtype == AccessDataType.TIMESTAMP):
-                            sql_col += f'{col}, '
-                            sql_val += f'\'{val}\', ' 
-                        elif(AccCol_dtype == AccessDataType.YESNO or AccCol_dtype == AccessDataType.BIT):                    
-                            if(val):
-                                sql_col += f'{col}, '
-                                sql_val += '1, '
-                            elif(not(val)):
-                                sql_col += f'{col}, '
-                                sql_val += '0, '
-                        elif(AccCol_dtype == AccessDataType.OLEOBJECT):
-                            sql_col += f'{col}, '
-                            sql_val += f'{val}, '
-                        elif(AccCol_dtype == AccessDataType.VARBINARY):
-                            sql_col += f'{col}, '
-                            sql_val += f'\'{datetime_py.strftime("%H:%M:%S.%f")}\', '                        
-                        else:
-                            self.err = Error.UNDEFINED_DATA_TYPE
-                if sql_Data.shape[1] < 1:
-                    sql_col = sql_col[0:-1] + ')'
-                    sql_val = sql_val[0:-1] + ')'
-                else:
-                    sql_col = sql_col[0:-2] + ')'
-                    sql_val = sql_val[0:-2] + ')' 
-                sql_str = f'{sql_str} {sql_col} {sql_val};'
-                out_str_list.append(sql_str)
+            columns:List[str] = []
+            for col in s_sql_data.columns:
+                col_inf = self.ColumnCatalog.get(col)
+                if(col_inf == None):
+                    continue
+                if(col_inf.Literal == None):
+                    self.err = Error.UNDEFINED_DATA_TYPE
+                    continue
+                columns.append(col)
+            lit_df = self.__RenderLiteralFrame(s_sql_data[columns])
+            #IDがint/strの行はIDを含める
+            sql_col_ser = pd.Series(', '.join(columns), index=lit_df.index, dtype=object)
+            sql_col_ser[id_lit_ser.notna().to_numpy()] = ', '.join([self.__IDColumnName(sql_Data)] + columns)
+            sql_val_ser = id_lit_ser.fillna('')
+            for col in columns: #列毎に連結
+                sql_val_ser = sql_val_ser + np.where((sql_val_ser == '').to_numpy(), '', ', ') + lit_df[col]
+            sql_ser = f'INSERT INTO [{self.TableName}] (' + sql_col_ser + ') VALUES (' + sql_val_ser + ');'
+            out_str_list.extend(sql_ser.to_list())
         return out_str_list
     
+    def __RenderLiteralFrame(self, Data:pd.DataFrame) -> pd.DataFrame:
+        """データフレームを列毎にまとめてSQLリテラル文字列へ変換する。
+
+        Args:
+            Data (pd.DataFrame): 変換するデータ（空白値なし、列は列カタログに定義済みであること）
+
+        Returns:
+            pd.DataFrame: SQLリテラル文字列のデータフレーム
+        """
+        lit_dict:Dict[str,pd.Series] = {}
+        for col in Data.columns:
+            col_inf = self.ColumnCatalog[col]
+            ser = Data[col]
+            AccCol_dtype = col_inf.DataType
+            if(AccCol_dtype in (AccessDataType.CHAR, AccessDataType.VARCHAR, AccessDataType.MEMO, AccessDataType.GUID)):
+                lit_ser = "'" + ser.astype(str).str.replace("'","''",regex=False) + "'"
+            elif(AccCol_dtype in (AccessDataType.YESNO, AccessDataType.BIT)):
+                lit_ser = pd.Series(np.where(ser.astype(bool).to_numpy(),"1","0"), index=ser.index, dtype=object)
+            elif(AccCol_dtype in (AccessDataType.DATE, AccessDataType.TIME, AccessDataType.DATETIME, AccessDataType.VARBINARY)):
+                lit_ser = self.__RenderDatetimeLiterals(ser, col_inf)
+            elif(AccCol_dtype == AccessDataType.TIMESTAMP):
+                lit_ser = "'" + ser.astype(str) + "'"
+            else: #数値、OLEOBJECT
+                lit_ser = ser.astype(str)
+            lit_dict[col] = lit_ser.astype(object)
+        return pd.DataFrame(lit_dict, index=Data.index, columns=Data.columns)
+
+    def __RenderDatetimeLiterals(self, ser:pd.Series, col_inf:ColumnInfo) -> pd.Series:
+        """日付/時刻列をまとめてSQLリテラル文字列へ変換する。datetimeに変換できない場合は1値ずつ変換する。"""
+        try:
+            dt_arr = pd.to_datetime(ser).to_numpy()
+        except (ValueError, TypeError):
+            return ser.map(col_inf.Literal) #datetime.timeなど
+        #ISO形式(YYYY-MM-DDThh:mm:ss.ffffff)で一括変換してAccessの形式に合わせる
+        if(col_inf.DataType == AccessDataType.DATE):
+            txt_arr = np.char.replace(np.datetime_as_string(dt_arr, unit='D'), '-', '/')
+        elif(col_inf.DataType == AccessDataType.TIME):
+            txt_arr = np.datetime_as_string(dt_arr, unit='s')
+            txt_arr = np.array([t[11:19] for t in txt_arr]) if len(txt_arr) > 0 else txt_arr
+        elif(col_inf.DataType == AccessDataType.DATETIME):
+            txt_arr = np.char.replace(np.char.replace(np.datetime_as_string(dt_arr, unit='s'), '-', '/'), 'T', ' ')
+        else: #VARBINARY
+            txt_arr = np.datetime_as_string(dt_arr, unit='us')
+            txt_arr = np.array([t[11:26] for t in txt_arr]) if len(txt_arr) > 0 else txt_arr
+        return "'" + pd.Series(txt_arr, index=ser.index, dtype=object) + "'"
+
+    def __RenderIDLiterals(self, Index:pd.Index) -> pd.Series:
+        """IDのSQLリテラル文字列、int/str以外のIDはNone"""
+        id_list = [f'{idx}' if type(idx) == int else (f"'{idx.translate(quote_escape)}'" if type(idx) == str else None) for idx in Index.to_list()]
+        return pd.Series(id_list, index=Index, dtype=object)
+
+    @InstrumentedPhase('sql_seconds')
     def __DeleteSQL(self, Data:pd.DataFrame) -> List[str]:
         """DeleteのSQL
 
@@ -1127,46 +3053,945 @@ class DataBaseCtrl():
             if(type(idx)==int):
                 sql_str += f'{idx};'
             elif(type(idx)==str):
-                sql_str += f'\'{idx}\';'
+                sql_str += f'\'{idx.translate(quote_escape)}\';'
             out_str_list.append(sql_str)
         
         return out_str_list                       
 
-    def __SqlResultToDataFrame(self, Res:List[pyodbc.Row], set_index:Optional[str]='ID') -> pd.DataFrame:
+    def __GetWatermark(self, Data:pd.DataFrame) -> Any:
+        """差分更新の基準値(基準列の最大値)を取得する。値が無い場合はNone"""
+        if(Data.empty):
+            return None
+        if(self.WatermarkColumn == None):
+            wm_ser = Data.index.to_series()
+        elif(self.WatermarkColumn in Data.columns):
+            wm_ser = Data[self.WatermarkColumn].dropna()
+        else:
+            return None
+        if(wm_ser.empty):
+            return None
+        return self.__ToSqlParam(None, wm_ser.max())
+
+    def __IncrementalUpdate(self) -> bool:
+        """基準値より新しい行だけを読み込み内部データフレームへマージする。
+
+        Returns:
+            bool: 成功=True / 失敗=False
+        """
+        id_name = self.__IDColumnName(self.Int_DF)
+        self.__data_mtime = self.__FileMTime()
+        #削除行の照合
+        self.__refresh_count += 1
+        if(self.ReconcileInterval > 0 and self.__refresh_count >= self.ReconcileInterval):
+            self.__ReconcileDeletedRows(id_name)
+            self.__refresh_count = 0
+        #基準値より新しい行の読み取り（前回と同じ列）、最終更新日時は同時刻の更新を取りこぼさないように以上で比較する
+        select_columns = None if self.__loaded_columns == None else [id_name] + self.__loaded_columns
+        select_list = '*' if select_columns == None else ', '.join(select_columns)
+        if(self.WatermarkColumn == None):
+            sql = f'SELECT {select_list} FROM [{self.TableName}] WHERE {id_name} > ?;'
+        else:
+            sql = f'SELECT {select_list} FROM [{self.TableName}] WHERE {self.WatermarkColumn} >= ?;'
+        with self.Lock.Read():
+            cursor = self.__ReadCursor()
+            cursor.execute(sql, self.__watermark)
+            res = cursor.fetchall()
+        self.err = Error.NO_ERR
+        if(len(res)<1):
+            return True
+        new_df = self.__SqlResultToDataFrame(res, id_name, select_columns)
+        #未同期の変更がある行はローカルの内容を優先する
+        dirty_id_set = self.UpdatedIDs | self.AddedIDs | self.DeletedIDs
+        keep_mask = ~new_df.index.isin(dirty_id_set)
+        merge_df = new_df[keep_mask]
+        exist_mask = merge_df.index.isin(self.Int_DF.index)
+        update_df = merge_df[exist_mask]
+        if(not(update_df.empty)):
+            self.__IndexRemoveRows(update_df.index.to_list())
+            self.Int_DF.loc[update_df.index, update_df.columns] = update_df
+            self.__IndexAddRows(update_df.index.to_list())
+        add_df = merge_df[~exist_mask]
+        if(not(add_df.empty)):
+            self.Int_DF = pd.concat([self.Int_DF, add_df])
+            self.RowState = np.concatenate([self.RowState, np.full(len(add_df), DataRowState.NotChange.value, dtype=np.int8)])
+            self.__IndexAddRows(add_df.index.to_list())
+        new_watermark = self.__GetWatermark(new_df)
+        if(new_watermark != None and new_watermark > self.__watermark):
+            self.__watermark = new_watermark
+        return True
+
+    def __FileMTime(self) -> Optional[float]:
+        """データベースファイルの更新日時、ファイルがない場合はNone"""
+        try:
+            return os.path.getmtime(self.DataBase_Path)
+        except OSError:
+            return None
+
+    def __SnapshotPath(self, SnapshotDir:str) -> str:
+        """スナップショットのサブディレクトリ（テーブル名_データベースファイルパスのハッシュ）"""
+        path_key = os.path.normcase(os.path.abspath(self.DataBase_Path))
+        return os.path.join(SnapshotDir, f'{self.TableName}_{hashlib.sha1(path_key.encode("utf-8")).hexdigest()[:12]}')
+
+    def __SnapshotSchema(self) -> List[List[str]]:
+        """スナップショットと照合する列情報[列名, 型名]のリスト"""
+        return [[col, col_inf.DataType.name if type(col_inf.DataType) == AccessDataType else str(col_inf.DataType)]
+                for col,col_inf in self.ColumnCatalog.items()]
+
+    def __SaveSnapshotArray(self, snap_path:str, name:str, ser:pd.Series) -> str:
+        """スナップショットへ1列を保存する。
+
+        Args:
+            snap_path (str): スナップショットのディレクトリ
+            name (str): ファイル名(拡張子なし)
+            ser (pd.Series): 保存する列
+
+        Returns:
+            str: 保存形式(numpy=numpyの型名, Int64/boolean=値とNULLのマスク, object=pickle)
+        """
+        if(ser.dtype.name in ('Int64', 'boolean')):
+            np_dtype = np.int64 if ser.dtype.name == 'Int64' else np.bool_
+            np.save(os.path.join(snap_path, f'{name}.npy'), ser.to_numpy(dtype=np_dtype, na_value=0))
+            np.save(os.path.join(snap_path, f'{name}_mask.npy'), ser.isna().to_numpy())
+            return ser.dtype.name
+        values = ser.to_numpy()
+        if(values.dtype.kind in 'iufbM'):
+            np.save(os.path.join(snap_path, f'{name}.npy'), values)
+            return 'numpy'
+        np.save(os.path.join(snap_path, f'{name}.npy'), values.astype(object), allow_pickle=True)
+        return 'object'
+
+    def __LoadSnapshotArray(self, snap_path:str, name:str, kind:str) -> Any:
+        """スナップショットから1列を読み込む。（numpy・Int64・booleanはメモリマップ）
+
+        Args:
+            snap_path (str): スナップショットのディレクトリ
+            name (str): ファイル名(拡張子なし)
+            kind (str): 保存形式
+
+        Returns:
+            Any: numpy配列またはpandasの拡張配列
+        """
+        file_path = os.path.join(snap_path, f'{name}.npy')
+        if(kind == 'object'):
+            return np.load(file_path, allow_pickle=True)
+        values = np.load(file_path, mmap_mode='c') #コピーオンライト、内部データフレームの変更はファイルに書かない
+        if(kind == 'numpy'):
+            return values
+        mask = np.load(os.path.join(snap_path, f'{name}_mask.npy'), mmap_mode='c')
+        if(kind == 'Int64'):
+            return pd.arrays.IntegerArray(values, mask)
+        if(kind == 'boolean'):
+            return pd.arrays.BooleanArray(values, mask)
+        raise ValueError(kind)
+
+    def __ReconcileDeletedRows(self, id_name:str) -> None:
+        """データベースのID一覧と照合し、データベースから削除された行を内部データフレームから取り除く。
+
+        Args:
+            id_name (str): IDの列名
+            
+        Remarks:
+            未同期の変更がある行は取り除かない。
+        """
+        with self.Lock.Read():
+            cursor = self.__ReadCursor()
+            cursor.execute(f'SELECT {id_name} FROM [{self.TableName}];')
+            res = cursor.fetchall()
+        db_id_set = {row[0] for row in res}
+        drop_mask = ~self.Int_DF.index.isin(db_id_set) & (self.RowState == DataRowState.NotChange.value)
+        if(drop_mask.any()):
+            self.__IndexRemoveRows(self.Int_DF.index[drop_mask].to_list())
+            self.Int_DF = self.Int_DF[~drop_mask]
+            self.RowState = self.RowState[~drop_mask]
+
+    def __ApplySyncedRowState(self, failed_ids:List[Union[int,str]]) -> None:
+        """同期済みの行状態を内部データフレームへ反映する。
+
+        Args:
+            failed_ids (List[Union[int,str]]): 書き込めなかった行のID、行状態をそのまま残す
+        """
+        failed_id_set = set(failed_ids)
+        for ID in (self.UpdatedIDs | self.AddedIDs) - failed_id_set:
+            self.__SetRowState(ID, DataRowState.NotChange)
+        synced_deleted_ids = self.DeletedIDs - failed_id_set
+        if(len(synced_deleted_ids) > 0):
+            self.__IndexRemoveRows(list(synced_deleted_ids))
+            keep_mask = ~self.Int_DF.index.isin(synced_deleted_ids)
+            self.Int_DF = self.Int_DF[keep_mask]
+            self.RowState = self.RowState[keep_mask]
+            self.DeletedIDs -= synced_deleted_ids
+        self.Int_DF.index.name = self.__IDColumnName(self.Int_DF) #行追加で消えたインデックス名を戻す
+
+    def __SerchByIndex(self, key:str, val:Any, Serch_condition:SerchCondition) -> Optional[List[Any]]:
+        """検索インデックスで検索する。インデックスが無い、または使えない条件の場合はNone"""
+        col_index = self.Indexes.get(key)
+        if(col_index == None):
+            return None
+        #全行比較と同じく、条件に合わない型の検索値は比較しない
+        if(Serch_condition == SerchCondition.StartWith and type(val) != str):
+            return None
+        if(Serch_condition in (SerchCondition.SmallerThan, SerchCondition.OrSmallerThan,
+                               SerchCondition.LargerThan, SerchCondition.OrLargerThan)
+           and not(type(val) in (int, float, Decimal))):
+            return None
+        return col_index.Serch(val, Serch_condition)
+
+    def __RebuildIndexes(self) -> None:
+        """内部データフレームから検索インデックスを作り直す。"""
+        for col in list(self.Indexes):
+            if(col in self.Int_DF.columns):
+                self.Indexes[col] = ColumnIndex(self.Int_DF[col])
+            else:
+                del self.Indexes[col]
+
+    def __IndexAddRows(self, ids:List[Any]) -> None:
+        """内部データフレームの行を検索インデックスに追加する。"""
+        for col,col_index in self.Indexes.items():
+            for ID,val in zip(ids, self.Int_DF.loc[ids, col].to_list()):
+                col_index.Add(ID, val)
+
+    def __IndexRemoveRows(self, ids:List[Any]) -> None:
+        """内部データフレームの行を検索インデックスから取り除く。"""
+        for col,col_index in self.Indexes.items():
+            for ID,val in zip(ids, self.Int_DF.loc[ids, col].to_list()):
+                col_index.Remove(ID, val)
+
+    def __IndexSetValue(self, ID:Any, col:str, val:Any) -> None:
+        """内部データフレームの値の変更を検索インデックスに反映する。（値の変更前に呼ぶ）"""
+        col_index = self.Indexes.get(col)
+        if(col_index == None):
+            return
+        col_index.Remove(ID, self.Int_DF.at[ID,col])
+        col_index.Add(ID, val)
+
+    def __NextID(self) -> int:
+        """ID自動取得の次のID（内部データフレームと追加バッファのIDの最大値+1、計算後はキャッシュ）"""
+        if(self.__next_id == None):
+            id_max = 0
+            if(type(self.__int_df) == pd.DataFrame and len(self.__int_df) > 0):
+                id_max = self.__int_df.index.max()
+            int_ids = [ID for ID in self.__append_ids if type(ID) == int]
+            if(len(int_ids) > 0):
+                id_max = max(id_max, max(int_ids))
+            self.__next_id = int(id_max) + 1
+        new_id = self.__next_id
+        self.__next_id += 1
+        return new_id
+    
+    def __AppendRows(self, ids:List[Union[int,str]], columns:Dict[str,List[Any]]) -> None:
+        """追加バッファに行を追加する。（行状態は追加）
+
+        Args:
+            ids (List[Union[int,str]]): 追加する行IDリスト
+            columns (Dict[str,List[Any]]): 列毎の値リスト<列名,値リスト>、値が無い列はNaN
+        """
+        buffered = len(self.__append_ids)
+        for col,values in columns.items():
+            col_list = self.__append_cols.get(col)
+            if(col_list == None):
+                col_list = [np.nan] * buffered
+                self.__append_cols[col] = col_list
+            col_list.extend(values)
+        for col_list in self.__append_cols.values():
+            if(len(col_list) == buffered):
+                col_list.extend([np.nan] * len(ids))
+        self.__append_ids.extend(ids)
+        self.AddedIDs.update(ids)
+        if(self.__next_id != None):
+            int_ids = [ID for ID in ids if type(ID) == int]
+            if(len(int_ids) > 0 and max(int_ids) >= self.__next_id):
+                self.__next_id = max(int_ids) + 1
+    
+    def __FlushAppendBuffer(self) -> None:
+        """追加バッファの行を内部データフレームへまとめて反映する。"""
+        if(not(self.__append_ids)):
+            return
+        ids = self.__append_ids
+        new_df = pd.DataFrame(self.__append_cols, index=ids)
+        self.__append_ids = []
+        self.__append_cols = {}
+        if(type(self.__int_df) == pd.DataFrame):
+            new_df.index.name = self.__int_df.index.name
+            new_df = self.__MatchAppendDtypes(new_df)
+        self.__int_df = pd.concat([self.__int_df, new_df])
+        added_state = np.full(len(ids), DataRowState.Added.value, dtype=np.int8)
+        self.__row_state = added_state if type(self.__row_state) != np.ndarray else np.concatenate([self.__row_state, added_state])
+        self.__IndexAddRows(ids)
+    
+    def __MatchAppendDtypes(self, new_df:pd.DataFrame) -> pd.DataFrame:
+        """追加する行のデータフレームを内部データフレームの列とデータ型に合わせる。
+
+        Args:
+            new_df (pd.DataFrame): 追加する行のデータフレーム
+
+        Returns:
+            pd.DataFrame: 内部データフレームと同じ列順・データ型のデータフレーム
+            
+        Remarks:
+            整数・Boolの列に値の無いセルがある場合は、内部データフレームの列もNULL可能なInt64/booleanにする。
+            データ型に変換できない列はそのまま（pd.concatの型に任せる）。
+        """
+        columns = list(self.__int_df.columns) + [col for col in new_df.columns if not(col in self.__int_df.columns)]
+        new_df = new_df.reindex(columns=columns)
+        for col in self.__int_df.columns:
+            dtype = self.__int_df[col].dtype
+            if(dtype.kind in 'iub' and new_df[col].isna().any()):
+                dtype = 'boolean' if dtype.kind == 'b' else 'Int64'
+                self.__int_df[col] = self.__int_df[col].astype(dtype)
+            try:
+                new_df[col] = new_df[col].astype(dtype)
+            except (TypeError, ValueError):
+                pass
+        return new_df
+
+    def __GetRowState(self, ID:Union[int,str]) -> DataRowState:
+        """行状態を取得する。"""
+        if(ID in self.UpdatedIDs):
+            return DataRowState.Updated
+        if(ID in self.AddedIDs):
+            return DataRowState.Added
+        if(ID in self.DeletedIDs):
+            return DataRowState.Deleted
+        return DataRowState.NotChange
+
+    def __SetRowState(self, ID:Union[int,str], State:DataRowState) -> None:
+        """行状態を変更し、行状態毎のID集合を更新する。"""
+        self.RowState[self.Int_DF.index.get_loc(ID)] = State.value
+        self.UpdatedIDs.discard(ID)
+        self.AddedIDs.discard(ID)
+        self.DeletedIDs.discard(ID)
+        if(State == DataRowState.Updated):
+            self.UpdatedIDs.add(ID)
+        elif(State == DataRowState.Added):
+            self.AddedIDs.add(ID)
+        elif(State == DataRowState.Deleted):
+            self.DeletedIDs.add(ID)
+
+    def __IDColumnName(self, Data:pd.DataFrame) -> str:
+        """データフレームのIDの列名（インデックス名が無い場合はデータベースの第1列名）"""
+        if(type(Data.index.name) == str):
+            return Data.index.name
+        return next(iter(self.ColumnCatalog))
+
+    def __IsColumnOfType(self, ser:pd.Series, py_type:Optional[type]) -> bool:
+        """列の値が全て列カタログのデータ型か（NULL(None/NaN)は可）
+
+        Args:
+            ser (pd.Series): 列の値
+            py_type (Optional[type]): pythonデータ型、Noneは使用不能な型（NULLのみ可）
+
+        Returns:
+            bool: データ型が合う=True / 合わない=False
+            
+        Remarks:
+            NULLを含む整数の列はpandasで実数になるので、整数の列には整数値の実数も可とする。
+        """
+        kind = ser.dtype.kind
+        if(py_type == int and kind in 'iu'):
+            return True
+        if(py_type == int and kind == 'f'):
+            values = ser.dropna().to_numpy()
+            return bool(np.all(values == np.floor(values)))
+        if(py_type == float and kind == 'f'):
+            return True
+        if(py_type == bool and kind == 'b'):
+            return True
+        if(py_type == datetime and kind == 'M'):
+            return True
+        values = ser[ser.notna()]
+        if(py_type == None or len(values) < 1):
+            return len(values) < 1
+        if(py_type == int):
+            accept:tuple = (int, np.integer)
+        elif(py_type == float):
+            accept = (float, np.floating)
+        elif(py_type == bool):
+            accept = (bool, np.bool_)
+        elif(py_type == datetime):
+            accept = (datetime, np.datetime64)
+        elif(py_type == bytearray):
+            accept = (bytes, bytearray)
+        else:
+            accept = (py_type,)
+        return all(isinstance(val, accept) and not(py_type == int and isinstance(val, (bool, np.bool_))) for val in values)
+
+    def __GroupByColumnSet(self, Data:pd.DataFrame) -> List[Tuple[List[str],pd.DataFrame]]:
+        """値のある列の組み合わせ毎に行をまとめる。
+
+        Args:
+            Data (pd.DataFrame): まとめるデータ
+
+        Returns:
+            List[Tuple[List[str],pd.DataFrame]]: (値のある列名リスト, その列だけの行データフレーム)のリスト
+        """
+        mask = (Data.notna() & (Data != "None")).to_numpy()
+        groups:Dict[bytes,List[int]] = {}
+        for pos,key in enumerate(row.tobytes() for row in mask):
+            groups.setdefault(key,[]).append(pos)
+        out_list:List[Tuple[List[str],pd.DataFrame]] = []
+        for pos_list in groups.values():
+            columns = [col for col,has_val in zip(Data.columns,mask[pos_list[0]]) if has_val]
+            out_list.append((columns, Data.iloc[pos_list][columns]))
+        return out_list
+
+    def __ParamRows(self, Data:pd.DataFrame, columns:List[str]) -> List[tuple]:
+        """executemanyのパラメータ行リストを作成する（IDは最後）"""
+        dtype_list = [self.ColumnCatalog[col].DataType if col in self.ColumnCatalog else None for col in columns]
+        out_list:List[tuple] = []
+        for idx,values in zip(Data.index, Data[columns].to_numpy(dtype=object)): #列が無い(IDだけの)行も1行にする
+            out_list.append(tuple(self.__ToSqlParam(dtype,val) for dtype,val in zip(dtype_list,values)) + (self.__ToSqlParam(None,idx),))
+        return out_list
+
+    def __ToSqlParam(self, AccCol_dtype:Optional[AccessDataType], val:Any) -> Any:
+        """値をpyodbcのパラメータに変換する。
+
+        Args:
+            AccCol_dtype (Optional[AccessDataType]): 列のデータ型
+            val (Any): 値
+
+        Returns:
+            Any: パラメータ値
+        """
+        if(val is None or val is pd.NaT or val is pd.NA):
+            return None
+        if(isinstance(val,np.datetime64)):
+            val = pd.Timestamp(val)
+        if(isinstance(val,pd.Timestamp)):
+            val = val.to_pydatetime()
+        elif(isinstance(val,np.generic)):
+            val = val.item()
+        if(isinstance(val,float) and np.isnan(val)):
+            return None
+        if(AccCol_dtype == AccessDataType.YESNO or AccCol_dtype == AccessDataType.BIT):
+            return bool(val)
+        if(AccCol_dtype == AccessDataType.VARBINARY):
+            return val.strftime("%H:%M:%S.%f")
+        return val
+
+    @InstrumentedPhase('sql_seconds')
+    def __UpdateBatches(self, Data:pd.DataFrame, batch_size:int) -> List[Tuple[str,List[tuple],pd.DataFrame,Callable[[pd.DataFrame],List[str]]]]:
+        """UPDATEのパラメータ化バッチ
+
+        Args:
+            Data (pd.DataFrame): UPDATEするデータ
+            batch_size (int): 1バッチの最大行数
+
+        Returns:
+            List[Tuple[str,List[tuple],pd.DataFrame,Callable]]: (SQL, パラメータ行リスト, 対象行, 1行ずつのSQL作成関数)のリスト
+        """
+        out_list = []
+        id_name = self.__IDColumnName(Data)
+        for columns,group_df in self.__GroupByColumnSet(Data):
+            if(len(columns) < 1):
+                continue
+            for i in range(0,len(columns),max_colmun_length): #列が長い場合SQLコマンドを分割する
+                s_columns = columns[i:i+max_colmun_length]
+                sql = f'UPDATE [{self.TableName}] SET ' + ', '.join([f'{col} = ?' for col in s_columns]) + f' WHERE {id_name} = ?;'
+                for j in range(0,len(group_df),batch_size):
+                    s_df = group_df.iloc[j:j+batch_size]
+                    out_list.append((sql, self.__ParamRows(s_df,s_columns), s_df, self.__UpdateSQL))
+        return out_list
+
+    @InstrumentedPhase('sql_seconds')
+    def __InsertBatches(self, Data:pd.DataFrame, batch_size:int) -> List[Tuple[str,List[tuple],pd.DataFrame,Callable[[pd.DataFrame],List[str]]]]:
+        """INSERTのパラメータ化バッチ
+
+        Args:
+            Data (pd.DataFrame): Insertするデータ
+            batch_size (int): 1バッチの最大行数
+
+        Returns:
+            List[Tuple[str,List[tuple],pd.DataFrame,Callable]]: (SQL, パラメータ行リスト, 対象行, 1行ずつのSQL作成関数)のリスト
+            
+        Remarks:
+            列数がAccessの最大値を超える場合、初回はINSERT、残りの列はUPDATEで書き込む。
+        """
+        out_list = []
+        id_name = self.__IDColumnName(Data)
+        for columns,group_df in self.__GroupByColumnSet(Data):
+            for i in range(0,max(len(columns),1),max_colmun_len_ins-1):
+                s_columns = columns[i:i+max_colmun_len_ins-1]
+                if(i < 1): #初回のSQLはINSERT
+                    sql = f'INSERT INTO [{self.TableName}] (' + ', '.join(s_columns + [id_name]) + ') VALUES (' + ', '.join(['?']*(len(s_columns)+1)) + ');'
+                else:   #2回目以降はUPDATE
+                    sql = f'UPDATE [{self.TableName}] SET ' + ', '.join([f'{col} = ?' for col in s_columns]) + f' WHERE {id_name} = ?;'
+                for j in range(0,len(group_df),batch_size):
+                    s_df = group_df.iloc[j:j+batch_size]
+                    out_list.append((sql, self.__ParamRows(s_df,s_columns), s_df, self.__InsertSQL))
+        return out_list
+
+    @InstrumentedPhase('sql_seconds')
+    def __DeleteBatches(self, Data:pd.DataFrame, batch_size:int) -> List[Tuple[str,List[tuple],pd.DataFrame,Callable[[pd.DataFrame],List[str]]]]:
+        """DELETEのパラメータ化バッチ（DELETE ... WHERE ID IN (?, ...)）
+
+        Args:
+            Data (pd.DataFrame): 削除するデータ
+            batch_size (int): 1バッチの最大行数
+
+        Returns:
+            List[Tuple[str,List[tuple],pd.DataFrame,Callable]]: (SQL, パラメータ行リスト, 対象行, 1行ずつのSQL作成関数)のリスト
+        """
+        out_list = []
+        base_sql = f'DELETE FROM [{self.TableName}] WHERE {self.__IDColumnName(Data)}'
+        for j in range(0,len(Data),batch_size):
+            s_df = Data.iloc[j:j+batch_size]
+            pos = 0
+            for sql,params in self.__InBatches(base_sql, s_df.index.to_list()):
+                out_list.append((sql, params, s_df.iloc[pos:pos+len(params[0])], self.__DeleteSQL))
+                pos += len(params[0])
+        return out_list
+
+    def __ExecuteBatches(self, batch_list:List[Tuple[str,List[tuple],pd.DataFrame,Callable[[pd.DataFrame],List[str]]]],
+                         fast_executemany:bool=True) -> Dict[str,Any]:
+        """パラメータ化バッチを実行し、最後に1回だけコミットする。失敗したバッチは2分割して失敗した行を特定する。
+
+        Args:
+            batch_list (List[Tuple[str,List[tuple],pd.DataFrame,Callable]]): 実行するバッチ
+            fast_executemany (bool, optional): ドライバーが対応していればfast_executemanyを使う. Defaults to True.
+
+        Returns:
+            Dict[str,Any]: 実行統計 batches / batch_rows / fallback_rows / deleted_rows / failed_ids / retries
+            
+        Remarks:
+            失敗したバッチだけをfast_executemany無しでやり直し、それでも失敗した場合は2分割して実行し直す。（retriesに回数を数える）
+            成功したバッチはやり直さない。1行にしても失敗した行は書き込まず(failed_ids)、書き込めた行だけをコミットする。
+            INSERTは先に既存のIDを確認して書き込まず(failed_ids)、失敗したバッチで途中まで追加された行は削除してから分割する。
+            コミットに失敗した場合は全ての行をfailed_idsとする。
+        """
+        self.__CommitPending() #以下のロールバックでトランザクションの保留中の変更を取り消さない
+        use_fast = fast_executemany and hasattr(self.cursor,'fast_executemany')
+        stats:Dict[str,Any] = {'batches':0, 'batch_rows':0, 'fallback_rows':0, 'deleted_rows':0, 'failed_ids':[], 'retries':0}
+        failed_ids:set = self.__ExistingInsertIDs(batch_list)
+        for sql,params,rows_df,row_sql_func in batch_list:
+            is_delete = row_sql_func == self.__DeleteSQL
+            is_insert = row_sql_func == self.__InsertSQL
+            if(is_insert):  #追加できなかった行は残りの列のUPDATEも実行しない
+                keep = ~rows_df.index.isin(list(failed_ids))
+                params = [row for row,ok in zip(params,keep) if ok]
+                rows_df = rows_df[keep]
+                if(len(rows_df) < 1):
+                    continue
+            if(self.__ExecuteRange(sql, params, is_delete, 0, len(rows_df), use_fast)):
+                stats['batches'] += 1
+                stats['batch_rows'] += len(rows_df)
+                if(is_delete):
+                    stats['deleted_rows'] += self.cursor.rowcount if self.cursor.rowcount >= 0 else len(rows_df)
+                continue
+            #失敗したバッチだけを実行し直す（範囲はrows_dfの行位置）
+            failed_ranges:List[Tuple[int,int]] = [(0, len(rows_df))]
+            retry_whole = use_fast #ドライバーが未対応の可能性、まずこのバッチ全体を通常のexecutemanyでやり直す
+            while(len(failed_ranges) > 0):
+                lo,hi = failed_ranges.pop()
+                ids = rows_df.index[lo:hi].to_list()
+                if(is_insert):  #途中まで書き込まれた行を消して、1行ずつ全体が書き込まれるか書き込まれないかにする
+                    self.__DeleteIDs(self.__IDColumnName(rows_df), ids)
+                if(retry_whole):
+                    retry_whole = False
+                    sub_ranges = [(lo, hi)]
+                elif(hi - lo <= 1):
+                    failed_ids.update(ids)
+                    continue
+                else:   #2分割して失敗した範囲だけをさらに分割する
+                    mid = (lo + hi) // 2
+                    sub_ranges = [(lo, mid), (mid, hi)]
+                for s_lo,s_hi in sub_ranges:
+                    stats['retries'] += 1
+                    if(self.__ExecuteRange(sql, params, is_delete, s_lo, s_hi, False)):
+                        stats['fallback_rows'] += s_hi - s_lo
+                        if(is_delete):
+                            stats['deleted_rows'] += self.cursor.rowcount if self.cursor.rowcount >= 0 else s_hi - s_lo
+                    else:
+                        failed_ranges.append((s_lo, s_hi))
+        stats['failed_ids'] = [idx for idx in dict.fromkeys(idx for _,_,rows_df,_ in batch_list for idx in rows_df.index) if idx in failed_ids]
+        try:
+            self.conn.commit()
+        except pyodbc.Error:
+            self.conn.rollback()
+            stats['failed_ids'] = list(dict.fromkeys(idx for _,_,rows_df,_ in batch_list for idx in rows_df.index))
+        return stats
+
+    def __ExecuteRange(self, sql:str, params:List[tuple], is_delete:bool, lo:int, hi:int, use_fast:bool) -> bool:
+        """バッチの行位置lo～hiの行だけを実行する。（DELETEのIN (...)はパラメータを切り出してSQLを作り直す）"""
+        if(not(is_delete)):
+            return self.__ExecuteMany(sql, params[lo:hi], use_fast)
+        base_sql = sql[:sql.rindex(' IN (')]
+        return self.__ExecuteMany(f"{base_sql} IN ({', '.join(['?']*(hi-lo))});", [params[0][lo:hi]], use_fast)
+
+    def __ExistingInsertIDs(self, batch_list:List[Tuple[str,List[tuple],pd.DataFrame,Callable[[pd.DataFrame],List[str]]]]) -> set:
+        """INSERTのバッチの行のうち、データベースに既に存在するIDの集合（書き込み用の接続で確認する）"""
+        exist_ids:set = set()
+        for sql,_,rows_df,row_sql_func in batch_list:
+            if(row_sql_func != self.__InsertSQL or not(sql.startswith('INSERT'))):
+                continue
+            id_name = self.__IDColumnName(rows_df)
+            for s_sql,s_params in self.__InBatches(f'SELECT {id_name} FROM [{self.TableName}] WHERE {id_name}', rows_df.index.to_list()):
+                self.cursor.execute(s_sql, s_params[0])
+                exist_ids.update(row[0] for row in self.cursor.fetchall())
+        return exist_ids
+
+    def __DeleteIDs(self, id_name:str, ids:List[Union[int,str]]) -> None:
+        """IDの行を削除する。（コミットしない）"""
+        for sql,params in self.__InBatches(f'DELETE FROM [{self.TableName}] WHERE {id_name}', ids):
+            self.cursor.execute(sql, params[0])
+
+    def __Commit(self, statements:int=1) -> None:
+        """書き込みをコミットする。Transaction()中はbatch_size文になるまでコミットしない。
+
+        Args:
+            statements (int, optional): コミットする書き込みの文数. Defaults to 1.
+        """
+        if(self.__txn_owner != threading.get_ident()):
+            self.conn.commit()
+            return
+        self.__txn_pending += statements
+        self.TransactionStats['statements'] += statements
+        if(self.__txn_pending >= self.__txn_batch):
+            self.__CommitPending()
+
+    def __CommitPending(self) -> None:
+        """Transaction()中の保留中の文をコミットする。（トランザクション外・保留なしの場合は何もしない）"""
+        if(self.__txn_owner != threading.get_ident() or self.__txn_pending < 1):
+            return
+        self.conn.commit()
+        self.TransactionStats['commits'] += 1
+        self.TransactionStats['statements_per_commit'].append(self.__txn_pending)
+        self.__txn_pending = 0
+
+    @InstrumentedPhase('sql_seconds')
+    def __InBatches(self, base_sql:str, ids:List[Any]) -> List[Tuple[str,List[tuple]]]:
+        """IDリストをAccessのSQL文の長さとmax_in_listの制限内に分割し、IN (?, ...)のSQLを作る。
+
+        Args:
+            base_sql (str): IN (...)の前までのSQL文
+            ids (List[Any]): IDリスト
+
+        Returns:
+            List[Tuple[str,List[tuple]]]: (SQL, パラメータ行リスト(1行))のリスト
+        """
+        chunk_len = max(1, min(max_in_list, (max_sql_length - len(base_sql) - len(' IN ();')) // len('?, ')))
+        out_list:List[Tuple[str,List[tuple]]] = []
+        for i in range(0,len(ids),chunk_len):
+            chunk = ids[i:i+chunk_len]
+            sql = f"{base_sql} IN ({', '.join(['?']*len(chunk))});"
+            out_list.append((sql, [tuple(self.__ToSqlParam(None,ID) for ID in chunk)]))
+        return out_list
+
+    def __ExecuteTransaction(self, batch_list:List[Tuple[str,List[tuple]]], fast_executemany:bool=True) -> Optional[int]:
+        """パラメータ化バッチを1つのトランザクションで実行する。失敗した場合は全てロールバックする。
+
+        Args:
+            batch_list (List[Tuple[str,List[tuple]]]): (SQL, パラメータ行リスト)のリスト、パラメータ行が1行の場合はexecuteで実行する
+            fast_executemany (bool, optional): ドライバーが対応していればfast_executemanyを使う. Defaults to True.
+
+        Returns:
+            Optional[int]: 影響した行数（ドライバーが返さない場合はパラメータ行数で数える）、失敗した場合はNone
+            
+        Remarks:
+            fast_executemanyで失敗した場合は通常のexecutemanyでやり直す。
+            Transaction()中はコミットせずパラメータ行数を__Commit()で数え、withを抜けるまでロールバックできるようにする。
+            Transaction()中に失敗した場合はこのバッチだけを取り消せないので、pyodbc.Errorをそのまま伝えてTransaction()全体をロールバックさせる。
+        """
+        if(self.__txn_owner == threading.get_ident()):
+            if(hasattr(self.cursor,'fast_executemany')):
+                self.cursor.fast_executemany = False #途中まで書き込んだバッチをやり直さない
+            affected = 0
+            statements = 0
+            for sql,params in batch_list:
+                if(len(params) == 1):
+                    self.cursor.execute(sql, params[0])
+                else:
+                    self.cursor.executemany(sql, params)
+                affected += self.cursor.rowcount if self.cursor.rowcount >= 0 else len(params)
+                statements += len(params)
+            if(statements > 0):
+                self.__Commit(statements)
+            return affected
+        use_fast = fast_executemany and hasattr(self.cursor,'fast_executemany')
+        for use_fast_try in ([True, False] if use_fast else [False]):
+            try:
+                if(hasattr(self.cursor,'fast_executemany')):
+                    self.cursor.fast_executemany = use_fast_try
+                affected = 0
+                for sql,params in batch_list:
+                    if(len(params) == 1):
+                        self.cursor.execute(sql, params[0])
+                    else:
+                        self.cursor.executemany(sql, params)
+                    affected += self.cursor.rowcount if self.cursor.rowcount >= 0 else len(params)
+                self.conn.commit()
+                return affected
+            except pyodbc.Error:
+                self.conn.rollback()
+        return None
+    
+    def __SelectExistIDs(self, ids:List[Union[int,str]]) -> set:
+        """データベースに存在するIDをIN検索で一括確認する。
+
+        Args:
+            ids (List[Union[int,str]]): 確認するIDリスト
+
+        Returns:
+            set: 存在するIDの集合
+        """
+        id_name = next(iter(self.ColumnCatalog))
+        exist_set = set()
+        with self.Lock.Read():
+            cursor = self.__ReadCursor()
+            for sql,params in self.__InBatches(f'SELECT {id_name} FROM [{self.TableName}] WHERE {id_name}', ids):
+                cursor.execute(sql, params[0])
+                exist_set.update(row[0] for row in cursor.fetchall())
+        return exist_set
+    
+    def __ExecuteMany(self, sql:str, params:List[tuple], use_fast:bool) -> bool:
+        """executemanyを1バッチ実行する。（パラメータ行が1行の場合はexecute、コミット・ロールバックは呼び出し元で行う）"""
+        try:
+            if(hasattr(self.cursor,'fast_executemany')):
+                self.cursor.fast_executemany = use_fast
+            if(len(params) == 1):
+                self.cursor.execute(sql, params[0])
+            else:
+                self.cursor.executemany(sql, params)
+            return True
+        except pyodbc.Error:
+            return False
+
+    def __CachedSelect(self, sql:str, params:Optional[List[Any]]=None, columns:Optional[List[str]]=None) -> pd.DataFrame:
+        """SELECT文を実行して結果をデータフレームで返す。検索結果キャッシュが有効ならキャッシュを使う。
+
+        Args:
+            sql (str): SELECT文
+            params (Optional[List[Any]], optional): パラメータ(?)のリスト. Defaults to None.
+            columns (Optional[List[str]], optional): SELECTした列、Noneで全列. Defaults to None.
+
+        Returns:
+            pd.DataFrame: 検索結果(キャッシュのコピー)
+        """
+        key = sql if params is None else (sql, tuple(params))
+        if(self.ResultCacheSize > 0):
+            with self.__cache_lock:
+                entry = self.__result_cache.get(key)
+                if(entry != None and perf_counter() - entry[0] <= self.ResultCacheTTL):
+                    self.__result_cache.move_to_end(key)
+                    self.CacheStats['hits'] += 1
+                elif(entry != None): #有効時間切れ
+                    del self.__result_cache[key]
+                    entry = None
+                if(entry == None):
+                    self.CacheStats['misses'] += 1
+            if(entry != None):
+                if(entry[1].empty):
+                    self.err = Error.NO_DATA_IN_TABLE
+                return entry[1].copy()
+        with self.Lock.Read():
+            cursor = self.__ReadCursor()
+            if(params is None):
+                cursor.execute(sql)
+            else:
+                cursor.execute(sql, params)
+            res = cursor.fetchall()
+        out_df = self.__SqlResultToDataFrame(res, columns=columns)
+        if(self.ResultCacheSize > 0):
+            with self.__cache_lock:
+                self.__result_cache[key] = (perf_counter(), out_df.copy())
+                while(len(self.__result_cache) > self.ResultCacheSize):
+                    self.__result_cache.popitem(last=False)
+                    self.CacheStats['evictions'] += 1
+        return out_df
+    
+    def __ClearResultCache(self) -> None:
+        """検索結果キャッシュを全て破棄する。"""
+        with self.__cache_lock:
+            if(len(self.__result_cache) > 0):
+                self.__result_cache.clear()
+                self.CacheStats['invalidations'] += 1
+    
+    @InstrumentedPhase('decode_seconds')
+    def __SqlResultToDataFrame(self, Res:List[pyodbc.Row], set_index:Optional[str]='ID', columns:Optional[List[str]]=None) -> pd.DataFrame:
         """SQLの結果をデータフレームへ変換する
 
         Args:
             Res (List[pyodbc.Row]): SQLの結果
             set_index (Optional[str], optional): インデックスにする行名. Defaults to 'ID'.
+            columns (Optional[List[str]], optional): 結果の列(SELECTした列)、Noneで全列. Defaults to None.
 
         Returns:
             pd.DataFrame: 変換後のデータフレーム
+            
+        Remarks:
+            列カタログのデータ型で列毎にnumpy配列へ変換する。(整数=int64, 実数=float64, 日時=datetime64, Yes/No=bool)
+            NULLを含む整数/Yes/No列はpandasのNullable型(Int64/boolean)、文字列・通貨などはobjectのまま。
         """
         out_df = pd.DataFrame()
         if(len(Res)<1):
             self.err = Error.NO_DATA_IN_TABLE
             return out_df        
         #データフレーム構築
-        out_df = pd.DataFrame(np.array(Res,dtype=object), columns=[c for c in self.Column_DF[self.col_inf_columns[3]]])
+        if(columns == None):
+            columns = list(self.ColumnCatalog)
+        data_dict:Dict[str,Any] = {}
+        for col,values in zip(columns, zip(*Res)):
+            data_dict[col] = self.__DecodeColumn(self.ColumnCatalog[col], values)
+        out_df = pd.DataFrame(data_dict, columns=columns)
         if(type(set_index) == str):
             out_df = out_df.set_index(set_index)
         return out_df
+
+    def __DecodeColumn(self, col_inf:ColumnInfo, values:tuple) -> Any:
+        """SQLの結果の1列をデータ型に合わせた配列へ変換する。変換できない場合はobjectのまま。
+
+        Args:
+            col_inf (ColumnInfo): 列情報
+            values (tuple): 列の値
+
+        Returns:
+            Any: numpy配列またはpandasの拡張配列
+        """
+        has_null = None in values
+        try:
+            if(col_inf.PyType == int):
+                return pd.array(values, dtype='Int64') if has_null else np.array(values, dtype=np.int64)
+            if(col_inf.PyType == float):
+                return np.array(values, dtype=np.float64) #NULLはNaN
+            if(col_inf.PyType == bool):
+                return pd.array(values, dtype='boolean') if has_null else np.array(values, dtype=np.bool_)
+            if(col_inf.PyType == datetime):
+                return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy() #NULLはNaT
+        except (ValueError, TypeError, OverflowError):
+            pass
+        return np.array(values, dtype=object)
     
-    def __GetColumnNameFromDataBase(self):
-        """データベースの列情報を取得してクラス内のDataFrameをアップデートする。
-        """        
-        self.__wait_busy()
-        self.busy=True
-        cols_inf = self.cursor.columns(table=self.TableName)
-        cols_inf_res = cols_inf.fetchall()
-        self.busy=False           
-        self.Column_DF = pd.DataFrame(np.array(cols_inf_res),columns=self.col_inf_columns)
-        for row in self.Column_DF.iterrows():
-            for access_dtype in AccessDataType:
-                if self.Column_DF.loc[row[0],self.col_inf_columns[5]] == access_dtype.name:
-                    self.Column_DF.loc[row[0],self.col_inf_columns[5]] = access_dtype
+    def __ChunksToDataFrame(self, chunk_size:int, set_index:Optional[str]='ID', columns:Optional[List[str]]=None) -> Optional[pd.DataFrame]:
+        """全行をchunk_size行ずつ読み込み、列毎の配列へ書き込んでデータフレームにする。
+
+        Args:
+            chunk_size (int): 1回に読み込む行数
+            set_index (Optional[str], optional): インデックスにする行名. Defaults to 'ID'.
+            columns (Optional[List[str]], optional): 読み込む列(__SelectColumns()の結果)、Noneで全列. Defaults to None.
+
+        Returns:
+            Optional[pd.DataFrame]: 読み込んだデータフレーム、行が無い場合はNone(NO_DATA_IN_TABLE)
+            
+        Remarks:
+            列毎の配列はCOUNT(*)の行数で確保し、足りなければ2倍ずつ拡張する。読み込んだチャンクは配列へ書き込んだら捨てる。
+            データ型は__SqlResultToDataFrame()と同じ。（チャンク毎に型が違う列はnumpyの共通の型、無ければobject）
+        """
+        sql = self.__SelectSQL(columns=columns)
+        if(columns == None):
+            columns = list(self.ColumnCatalog)
+        values_dict:Dict[str,np.ndarray] = {}
+        null_dict:Dict[str,np.ndarray] = {} #NULLを含む整数/Yes/No列のマスク
+        size = 0
+        cursor = self.__ReadChunkCursor()
+        try:
+            with self.Lock.Read():
+                cursor.execute(f'SELECT COUNT(*) FROM [{self.TableName}];')
+                capacity = max(int(cursor.fetchone()[0]), 1)
+                cursor.execute(sql)
+            while True:
+                with self.Lock.Read():
+                    res = cursor.fetchmany(chunk_size)
+                if(len(res)<1):
                     break
+                end = size + len(res)
+                if(end > capacity):
+                    #COUNT(*)の後に追加された行
+                    capacity = max(end, capacity * 2)
+                    for col in values_dict:
+                        values_dict[col] = self.__GrowArray(values_dict[col], size, capacity)
+                    for col in null_dict:
+                        null_dict[col] = self.__GrowArray(null_dict[col], size, capacity)
+                for col,col_values in zip(columns, zip(*res)):
+                    values = self.__DecodeColumn(self.ColumnCatalog[col], col_values)
+                    nulls = None
+                    if(values.dtype.name in ('Int64', 'boolean')):
+                        nulls = values.isna()
+                        values = values.to_numpy(dtype=np.int64 if values.dtype.name == 'Int64' else np.bool_, na_value=0)
+                    buf = values_dict.get(col)
+                    if(type(buf) != np.ndarray):
+                        buf = np.empty(capacity, dtype=values.dtype)
+                    elif(buf.dtype != values.dtype):
+                        try:
+                            new_dtype = np.result_type(buf.dtype, values.dtype)
+                        except TypeError:
+                            new_dtype = np.dtype(object)
+                        buf = buf.astype(new_dtype)
+                        if(new_dtype == object and col in null_dict):
+                            buf[:size][null_dict.pop(col)[:size]] = None
+                    buf[size:end] = values
+                    values_dict[col] = buf
+                    if(type(nulls) == np.ndarray and nulls.any()):
+                        if(buf.dtype == object):
+                            buf[size:end][nulls] = None
+                        else:
+                            if(not(col in null_dict)):
+                                null_dict[col] = np.zeros(capacity, dtype=np.bool_)
+                            null_dict[col][size:end] = nulls
+                    elif(col in null_dict):
+                        null_dict[col][size:end] = False
+                size = end
+                del res
+        finally:
+            cursor.close()
+        if(size < 1):
+            self.err = Error.NO_DATA_IN_TABLE
+            return None
+        #確保した配列をそのまま使ってデータフレームを構築（行数が減った場合だけ切り詰めてコピー）
+        data_dict:Dict[str,Any] = {}
+        for col in columns:
+            values = values_dict.pop(col)
+            values = values if size == capacity else values[:size].copy()
+            nulls = null_dict.pop(col, None)
+            if(type(nulls) == np.ndarray):
+                nulls = nulls if size == capacity else nulls[:size].copy()
+                values = pd.arrays.BooleanArray(values, nulls) if values.dtype == np.bool_ else pd.arrays.IntegerArray(values, nulls)
+            data_dict[col] = values
+        index = None
+        if(type(set_index) == str and set_index in data_dict):
+            index = pd.Index(data_dict.pop(set_index), name=set_index, copy=False)
+        return pd.DataFrame(data_dict, index=index, columns=[col for col in columns if col in data_dict], copy=False)
+
+    def __GrowArray(self, values:np.ndarray, size:int, capacity:int) -> np.ndarray:
+        """配列をcapacityの大きさへ拡張する。（先頭size個をコピー）"""
+        new_values = np.zeros(capacity, dtype=values.dtype) if values.dtype == np.bool_ else np.empty(capacity, dtype=values.dtype)
+        new_values[:size] = values[:size]
+        return new_values
+
+    def __GetColumnNameFromDataBase(self, use_cache:bool=False) -> bool:
+        """データベースの列情報を取得してクラス内のDataFrameをアップデートする。
+
+        Args:
+            use_cache (bool, optional): 列情報キャッシュを使う. Defaults to False.
+
+        Returns:
+            bool: テーブルが存在する=True / 存在しない=False
+        """
+        cols_inf_res = schema_cache.Get(self.DataBase_Path, self.TableName) if use_cache else None
+        if(cols_inf_res == None):
+            try:
+                with self.Lock.Read():
+                    cursor = self.__ReadCursor()
+                    cols_inf = cursor.columns(table=self.TableName)
+                    cols_inf_res = [tuple(row) for row in cols_inf.fetchall()]
+            except pyodbc.ProgrammingError:
+                cols_inf_res = []
+            if(len(cols_inf_res) < 1):
+                return False
+            schema_cache.Put(self.DataBase_Path, self.TableName, cols_inf_res)
+        self.Column_DF = pd.DataFrame(np.array(cols_inf_res, dtype=object),columns=self.col_inf_columns)
+        #型名をAccessDataTypeへ変換（未定義の型名は文字列のまま）
+        type_name_dict = {access_dtype.name:access_dtype for access_dtype in AccessDataType}
+        self.Column_DF[self.col_inf_columns[5]] = [type_name_dict.get(type_name, type_name) for type_name in self.Column_DF[self.col_inf_columns[5]]]
+        #列カタログ構築
+        catalog:Dict[str,ColumnInfo] = {}
+        for ordinal,(col_name,col_dtype) in enumerate(zip(self.Column_DF[self.col_inf_columns[3]], self.Column_DF[self.col_inf_columns[5]])):
+            if(type(col_dtype) == AccessDataType):
+                catalog[col_name] = ColumnInfo(col_name, col_dtype, Access_dtype_py[col_dtype], ordinal, Access_dtype_literal[col_dtype])
+            else:
+                catalog[col_name] = ColumnInfo(col_name, col_dtype, None, ordinal, None)
+        self.ColumnCatalog = catalog
+        return True
         
+    @Instrumented
     def IsTableExist(self) -> bool:
         """データテーブルが存在するかどうか確認する。
 
@@ -1175,22 +4000,394 @@ class DataBaseCtrl():
         """
         ret_bool:bool
         try:
-            self.__wait_busy()
-            self.busy=True
-            self.cursor.columns(table=self.TableName)            
-            res = self.cursor.fetchall()
-            self.busy=False
+            with self.Lock.Read():
+                cursor = self.__ReadCursor()
+                cursor.columns(table=self.TableName)            
+                res = cursor.fetchall()
             if len(res) < 1:
                 ret_bool = False
             else:
                 ret_bool = True
         except pyodbc.ProgrammingError:
-            self.busy=False
             ret_bool = False
         return ret_bool
         
-    def __wait_busy(self) -> None:
-        """SQLデータベース使用中は待つ
+    def __Connect(self) -> None:
+        """接続プールから接続を借りてカーソルを作る。"""
+        with self.__connect_lock:
+            if(not(self.__connect_pending)):
+                return
+            self.__conn = connection_pool.Acquire(self.DataBase_Path, self.strCon)
+            # ODBCドライバーに送信する属性を指定する
+            #attrs_before = {pyodbc.SQL_MAX_COLUMNS_IN_SELECT: 255}
+            #self.conn.set_attr(pyodbc.SQL_MAX_COLUMNS_IN_SELECT,255)
+            #self.conn = pyodbc.connect(self.strCon,attrs_before=attrs_before)
+            self.__cursor = self.__conn.cursor()
+            self.__connect_pending = False
+    
+    def __ReadConnection(self) -> Connection:
+        """読み込みに使う接続、読み込み共有モードではスレッド毎の接続
+
+        Returns:
+            Connection: 接続オブジェクト
+            
+        Remarks:
+            pyodbcの接続はスレッド間で共有できない(threadsafety=1)ため、読み込み共有モードではスレッド毎に接続する。
+            トランザクション中は未コミットの変更が見えるように書き込みの接続で読む。
+        """
+        if(not(self.Lock.ReaderWriter) or self.__txn_owner == threading.get_ident()):
+            return self.conn
+        read_conn:Optional[Connection] = getattr(self.__thread_local, 'conn', None)
+        if(read_conn == None):
+            read_conn = connection_pool.Acquire(self.DataBase_Path, self.strCon)
+            cursor = read_conn.cursor()
+            self.__thread_local.conn = read_conn
+            self.__thread_local.cursor = cursor
+            self.__read_conns.append((read_conn, cursor))
+        return read_conn
+
+    def __ReadCursor(self) -> Cursor:
+        """読み込みに使うカーソル、読み込み共有モードではスレッド毎の接続のカーソル（__ReadConnection()）
+
+        Returns:
+            Cursor: カーソル
         """
-        while self.busy:
-            pass    
\ No newline at end of file
+        if(not(self.Lock.ReaderWriter) or self.__txn_owner == threading.get_ident()):
+            return self.cursor
+        self.__ReadConnection()
+        cursor:Cursor = self.__thread_local.cursor
+        if(self.Instrument != None):
+            return InstrumentedCursor(cursor, self.Instrument)
+        return cursor
+
+    def __ReadChunkCursor(self) -> Cursor:
+        """分割読み込み(fetchmany)専用のカーソル、__ReadCursor()と同じ接続に作る
+
+        Returns:
+            Cursor: カーソル（使い終わったら閉じる）
+            
+        Remarks:
+            分割読み込みの途中で他の読み込みが同じカーソルを使うと結果が変わるので、カーソルだけ別に作る。
+        """
+        cursor = self.__ReadConnection().cursor()
+        if(self.Instrument != None):
+            return InstrumentedCursor(cursor, self.Instrument)
+        return cursor
+
+class AsyncDataBaseCtrl():
+    """DataBaseCtrlのasyncio用ラッパー（専用のスレッドプールでpyodbcを呼び出す）
+    
+    Remarks:
+        ダイレクトモードはワーカースレッド毎にDataBaseCtrl（接続）を作り、読み込みを並列に実行する。
+        データフレームモードは内部データフレームを共有するため、1つのDataBaseCtrlを1ワーカーで実行する。
+        実行中・待ち中の呼び出しがMaxPendingに達すると、以降の呼び出しはイベントループ上で待つ（バックプレッシャー）。
+        キャンセルされた呼び出しは、未実行なら実行しない。実行中の読み込みはcursor.cancel()で中断を要求し、書き込みは最後まで実行する。
+    """
+    DataBase_Path:str
+    """データベースファイルパス"""
+    TableName:str
+    """テーブル名"""
+    DirectMode:bool
+    """直接データベースアクセスモード"""
+    MaxWorkers:int
+    """ワーカースレッド数（データフレームモードは1）"""
+    MaxPending:int
+    """同時に受け付ける（実行中＋待ち中の）呼び出しの最大数"""
+    err:Error
+    """最後に完了した呼び出しのエラーコード"""
+    Stats:Dict[str,Any]
+    """呼び出しの統計(submitted, completed, cancelled, queued, max_queued, queue_wait_seconds)"""
+    
+    def __init__(self, DataBase_Path:str, TableName:str, DirectMode:bool=False,
+                 MaxWorkers:int=default_async_workers, MaxPending:Optional[int]=None, LazyConnect:bool=False) -> None:
+        """DataBaseCtrlのasyncio用ラッパー（コンストラクター）
+
+        Args:
+            DataBase_Path (str): データベースファイルパス
+            TableName (str): テーブル名
+            DirectMode (bool, optional): 直接データベースアクセスモード=True. Defaults to False.
+            MaxWorkers (int, optional): ワーカースレッド数（ダイレクトモードのみ、データフレームモードは1）. Defaults to default_async_workers.
+            MaxPending (Optional[int], optional): 同時に受け付ける呼び出しの最大数、NoneでMaxWorkersの2倍. Defaults to None.
+            LazyConnect (bool, optional): ワーカーのDataBaseCtrlを遅延接続で作る. Defaults to False.
+            
+        Remarks:
+            ワーカーのDataBaseCtrlは各ワーカースレッドで最初に呼び出された時に作る。（コンストラクターでは接続しない）
+        """
+        if(MaxWorkers < 1 or (MaxPending != None and MaxPending < 1)):
+            raise ValueError(f'MaxWorkers and MaxPending must be positive: {MaxWorkers}, {MaxPending}')
+        self.DataBase_Path = DataBase_Path
+        self.TableName = TableName
+        self.DirectMode = DirectMode
+        self.MaxWorkers = MaxWorkers if DirectMode else 1
+        self.MaxPending = MaxPending if MaxPending != None else self.MaxWorkers * 2
+        self.err = Error.NO_ERR
+        self.Stats = {'submitted':0, 'completed':0, 'cancelled':0, 'queued':0, 'max_queued':0, 'queue_wait_seconds':0.0}
+        self.__lazy_connect = LazyConnect
+        self.__executor = ThreadPoolExecutor(max_workers=self.MaxWorkers, thread_name_prefix='AsyncDataBaseCtrl')
+        self.__slots = asyncio.Semaphore(self.MaxPending)
+        self.__local = threading.local()
+        self.__ctrls:List[DataBaseCtrl] = []
+        self.__ctrls_lock = threading.Lock()
+        self.__closed = False
+    
+    async def __aenter__(self) -> 'AsyncDataBaseCtrl':
+        """非同期コンテキストマネージャー開始時に自身を返す。"""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
+        """非同期コンテキストマネージャー終了時に閉じる。"""
+        await self.Close()
+        return False
+    
+    async def Close(self) -> None:
+        """実行中の呼び出しの完了を待ってスレッドプールを終了し、ワーカーのDataBaseCtrlを閉じる。"""
+        if(self.__closed):
+            return
+        self.__closed = True
+        await asyncio.get_running_loop().run_in_executor(None, self.__Shutdown)
+    
+    async def Call(self, MethodName:str, *args, **kwargs) -> Any:
+        """DataBaseCtrlのpublicメソッドをワーカーで実行する。
+
+        Args:
+            MethodName (str): メソッド名
+            
+        Returns:
+            Any: メソッドの戻り値
+            
+        Remarks:
+            ダイレクトモードでは1つのワーカーのDataBaseCtrlだけで実行されるので、設定系のメソッド(SetXxx)には使わないこと。
+        """
+        if(MethodName.startswith('_') or not(callable(getattr(DataBaseCtrl, MethodName, None)))):
+            raise AttributeError(f'DataBaseCtrl has no public method: {MethodName}')
+        return await self.__Run(MethodName, args, kwargs, False)
+    
+    async def UpdateInternalDataFrame(self, set_index:Optional[str]='ID', incremental:Optional[bool]=None, chunk_size:Optional[int]=None,
+                                      columns:Optional[List[str]]=None, lazy_large_objects:bool=False) -> bool:
+        """UpdateInternalDataFrame()の非同期版"""
+        return await self.__Run('UpdateInternalDataFrame', (set_index, incremental, chunk_size, columns, lazy_large_objects), {}, True)
+    
+    async def SaveSnapshot(self, SnapshotDir:str) -> bool:
+        """SaveSnapshot()の非同期版"""
+        return await self.__Run('SaveSnapshot', (SnapshotDir,), {}, False)
+    
+    async def LoadSnapshot(self, SnapshotDir:str, catch_up:bool=True) -> bool:
+        """LoadSnapshot()の非同期版"""
+        return await self.__Run('LoadSnapshot', (SnapshotDir, catch_up), {}, False)
+    
+    async def CreateIndex(self, ColumnName:str) -> bool:
+        """CreateIndex()の非同期版"""
+        return await self.__Run('CreateIndex', (ColumnName,), {}, False)
+    
+    async def GetCopyInternalDataFrame(self) -> pd.DataFrame:
+        """GetCopyInternalDataFrame()の非同期版"""
+        return await self.__Run('GetCopyInternalDataFrame', (), {}, False)
+    
+    async def SelectRowByID(self, ID:Union[int,str,None], Ext_DF:pd.DataFrame=None, columns:Optional[List[str]]=None) -> pd.DataFrame:
+        """SelectRowByID()の非同期版"""
+        return await self.__Run('SelectRowByID', (ID, Ext_DF, columns), {}, True)
+    
+    async def SerchRows(self, SerchDict:Dict[str,Union[str,int,float,Decimal,bool]],
+                        Serch_condition:SerchCondition=SerchCondition.Exact,
+                        MultiSerch_Type:bool=True,
+                        Ext_DF:pd.DataFrame=None,
+                        columns:Optional[List[str]]=None) -> pd.DataFrame:
+        """SerchRows()の非同期版"""
+        return await self.__Run('SerchRows', (SerchDict, Serch_condition, MultiSerch_Type, Ext_DF, columns), {}, True)
+    
+    async def SerchRowsByQuery(self, Query:SerchQuery, Ext_DF:pd.DataFrame=None, columns:Optional[List[str]]=None) -> pd.DataFrame:
+        """SerchRowsByQuery()の非同期版"""
+        return await self.__Run('SerchRowsByQuery', (Query, Ext_DF, columns), {}, True)
+    
+    async def UpdateRow(self, ID:Union[int,str], UpdateDict:Dict[str,Any]) -> bool:
+        """UpdateRow()の非同期版"""
+        return await self.__Run('UpdateRow', (ID, UpdateDict), {}, False)
+    
+    async def UpdateRows(self, Rows:Dict[Union[int,str],Dict[str,Any]], CheckExist:bool=False,
+                         batch_size:int=max_batch_rows, fast_executemany:bool=True) -> bool:
+        """UpdateRows()の非同期版"""
+        return await self.__Run('UpdateRows', (Rows, CheckExist, batch_size, fast_executemany), {}, False)
+    
+    async def UpdateRowByDataFrame(self, df:pd.DataFrame, batch_size:int=max_batch_rows, fast_executemany:bool=True) -> bool:
+        """UpdateRowByDataFrame()の非同期版"""
+        return await self.__Run('UpdateRowByDataFrame', (df, batch_size, fast_executemany), {}, False)
+    
+    async def AddRow(self, AddDict:Dict[str,Any], ID:Union[int,str]=None) -> bool:
+        """AddRow()の非同期版"""
+        return await self.__Run('AddRow', (AddDict, ID), {}, False)
+    
+    async def AddRowByDataFrame(self, df:pd.DataFrame) -> bool:
+        """AddRowByDataFrame()の非同期版"""
+        return await self.__Run('AddRowByDataFrame', (df,), {}, False)
+    
+    async def DeleteRow(self, ID:Union[int,str], Del:bool=True) -> bool:
+        """DeleteRow()の非同期版"""
+        return await self.__Run('DeleteRow', (ID, Del), {}, False)
+    
+    async def DeleteRows(self, IDs:List[Union[int,str]], Del:bool=True) -> bool:
+        """DeleteRows()の非同期版"""
+        return await self.__Run('DeleteRows', (IDs, Del), {}, False)
+    
+    async def UpdateDataBase(self, batch_size:int=max_batch_rows, fast_executemany:bool=True, reload:bool=True) -> bool:
+        """UpdateDataBase()の非同期版"""
+        return await self.__Run('UpdateDataBase', (batch_size, fast_executemany, reload), {}, False)
+    
+    async def IsTableExist(self) -> bool:
+        """IsTableExist()の非同期版"""
+        return await self.__Run('IsTableExist', (), {}, True)
+    
+    async def __Run(self, MethodName:str, args:tuple, kwargs:Dict[str,Any], cancel_running:bool) -> Any:
+        """受付数の上限まで待ってから、ワーカーでメソッドを実行して結果を待つ。
+
+        Args:
+            MethodName (str): DataBaseCtrlのメソッド名
+            args (tuple): 位置引数
+            kwargs (Dict[str,Any]): キーワード引数
+            cancel_running (bool): キャンセル時に実行中のSQLの中断を要求する（読み込みのみ）
+
+        Returns:
+            Any: メソッドの戻り値
+        """
+        if(self.__closed):
+            raise RuntimeError('AsyncDataBaseCtrl is closed')
+        loop = asyncio.get_running_loop()
+        self.Stats['submitted'] += 1
+        #受付数の上限に達している場合はイベントループ上で待つ
+        self.Stats['queued'] += 1
+        self.Stats['max_queued'] = max(self.Stats['max_queued'], self.Stats['queued'])
+        start = perf_counter()
+        try:
+            await self.__slots.acquire()
+        except asyncio.CancelledError:
+            self.Stats['cancelled'] += 1
+            raise
+        finally:
+            self.Stats['queued'] -= 1
+            self.Stats['queue_wait_seconds'] += perf_counter() - start
+        running:Dict[str,DataBaseCtrl] = {}
+        try:
+            cf = self.__executor.submit(self.__Call, running, MethodName, args, kwargs)
+        except BaseException:
+            self.__slots.release()
+            raise
+        #受付枠はワーカーの実行が終わった時に返す（キャンセルされても実行中は枠を使う）
+        cf.add_done_callback(lambda _: self.__ReleaseSlot(loop))
+        try:
+            ret, err = await asyncio.wrap_future(cf)
+        except asyncio.CancelledError:
+            self.Stats['cancelled'] += 1
+            ctrl = running.get('ctrl')
+            if(cancel_running and ctrl != None and not(cf.done())):
+                try:
+                    ctrl.cursor.cancel()
+                except (pyodbc.Error, AttributeError):
+                    pass #中断できない場合は最後まで実行される
+            raise
+        self.err = err
+        self.Stats['completed'] += 1
+        return ret
+    
+    def __ReleaseSlot(self, loop:asyncio.AbstractEventLoop) -> None:
+        """受付枠をイベントループのスレッドで返す。"""
+        try:
+            loop.call_soon_threadsafe(self.__slots.release)
+        except RuntimeError:
+            pass #イベントループが終了している
+    
+    def __Call(self, running:Dict[str,'DataBaseCtrl'], MethodName:str, args:tuple, kwargs:Dict[str,Any]) -> Tuple[Any,Error]:
+        """ワーカースレッドでDataBaseCtrlのメソッドを実行する。
+
+        Returns:
+            Tuple[Any,Error]: (戻り値, エラーコード)
+        """
+        ctrl = self.__WorkerCtrl()
+        running['ctrl'] = ctrl
+        ret = getattr(ctrl, MethodName)(*args, **kwargs)
+        return ret, ctrl.err
+    
+    def __WorkerCtrl(self) -> 'DataBaseCtrl':
+        """ワーカースレッドのDataBaseCtrl（最初に呼び出された時に作る）"""
+        ctrl:Optional[DataBaseCtrl] = getattr(self.__local, 'ctrl', None)
+        if(ctrl == None):
+            ctrl = DataBaseCtrl(self.DataBase_Path, self.TableName, self.DirectMode, LazyConnect=self.__lazy_connect)
+            self.__local.ctrl = ctrl
+            with self.__ctrls_lock:
+                self.__ctrls.append(ctrl)
+        return ctrl
+    
+    def __Shutdown(self) -> None:
+        """スレッドプールを終了してワーカーのDataBaseCtrlを閉じる。"""
+        self.__executor.shutdown(wait=True)
+        with self.__ctrls_lock:
+            for ctrl in self.__ctrls:
+                ctrl.Close()
+            self.__ctrls = []
+
+
+def LoadTables(DataBase_Path:str, TableNames:List[str], set_index:Optional[str]='ID',
+               MaxWorkers:int=default_load_workers, SnapshotDir:Optional[str]=None) -> Tuple[Dict[str,DataBaseCtrl],Dict[str,Dict[str,Any]]]:
+    """同じデータベースファイルの複数のテーブルをデータフレームモードで並列に読み込む。
+
+    Args:
+        DataBase_Path (str): データベースファイルパス
+        TableNames (List[str]): テーブル名のリスト
+        set_index (Optional[str], optional): インデクスにする行名. Defaults to 'ID'.
+        MaxWorkers (int, optional): 同時に読み込むテーブル数. Defaults to default_load_workers.
+        SnapshotDir (Optional[str], optional): スナップショットのディレクトリ、指定するとLoadSnapshot()を先に試す. Defaults to None.
+
+    Returns:
+        Tuple[Dict[str,DataBaseCtrl],Dict[str,Dict[str,Any]]]: (読み込めたテーブルのインスタンス<テーブル名,DataBaseCtrl>,
+            テーブル毎の時間<テーブル名,<connect, load, seconds, rows, snapshot, err>>)
+        
+    Remarks:
+        テーブル毎にスレッドプールのワーカーでDataBaseCtrlを作り、別々の接続(接続プールから借りる)で読み込む。
+        読み込めなかったテーブルはインスタンスを閉じ、時間の方のerrにエラーコードを残す。
+        pyodbc.Error以外の例外は、全てのテーブルのインスタンスを閉じてから呼び出し元に伝える。
+    """
+    if(MaxWorkers < 1):
+        raise ValueError(f'MaxWorkers must be positive: {MaxWorkers}')
+    
+    def LoadTable(TableName:str) -> Tuple[Optional[DataBaseCtrl],Dict[str,Any]]:
+        """1テーブルを読み込む。（ワーカースレッドで実行）"""
+        start = perf_counter()
+        ctrl = DataBaseCtrl(DataBase_Path, TableName)
+        connected = perf_counter()
+        timing:Dict[str,Any] = {'connect':connected - start, 'load':0.0, 'seconds':0.0, 'rows':0, 'snapshot':False, 'err':ctrl.err}
+        ok = False
+        if(ctrl.err == Error.NO_ERR):
+            try:
+                if(SnapshotDir != None):
+                    ok = timing['snapshot'] = ctrl.LoadSnapshot(SnapshotDir)
+                if(not(ok)):
+                    ok = ctrl.UpdateInternalDataFrame(set_index=set_index)
+                timing['err'] = ctrl.err
+            except pyodbc.Error:
+                ok = False
+                timing['err'] = Error.SQL_EXECUTE_ERR #テーブルが無いなど
+            except BaseException:
+                ctrl.Close() #接続を返してから伝える
+                raise
+        timing['load'] = perf_counter() - connected
+        timing['seconds'] = perf_counter() - start
+        if(not(ok)):
+            ctrl.Close()
+            return None, timing
+        timing['rows'] = len(ctrl.Int_DF)
+        return ctrl, timing
+    
+    ctrl_dict:Dict[str,DataBaseCtrl] = {}
+    timing_dict:Dict[str,Dict[str,Any]] = {}
+    with ThreadPoolExecutor(max_workers=min(MaxWorkers, max(1, len(TableNames))), thread_name_prefix='LoadTables') as executor:
+        future_dict = {TableName:executor.submit(LoadTable, TableName) for TableName in dict.fromkeys(TableNames)}
+        try:
+            for TableName,future in future_dict.items():
+                ctrl, timing_dict[TableName] = future.result()
+                if(ctrl != None):
+                    ctrl_dict[TableName] = ctrl
+        except BaseException:
+            #他のテーブルのインスタンスを閉じて接続を返してから伝える
+            for future in future_dict.values():
+                if(not(future.cancel()) and future.exception() == None and future.result()[0] != None):
+                    future.result()[0].Close()
+            raise
+    return ctrl_dict, timing_dict
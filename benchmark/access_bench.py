@@ -0,0 +1,267 @@
+"""Access用DataBaseCtrlのベンチマーク（SQLiteのpyodbcスタンドインで実行）
+
+使用方法:
+    python benchmark/access_bench.py [--rows 1000,100000,1000000] [--ops 200] [--out access_bench.json] [--compare 前回.json]
+
+テストと同じtests/odbc_standin/pyodbc.py(SQLite)をpyodbcの代わりに読み込むので、Accessドライバーが無い環境(Linux CI)でも動く。
+使用できる全てのAccessDataType(使用不能のDECIMAL, HYPERLINKを除く)の列を持つテーブルを行数毎に作り、操作毎にops/sec, レイテンシのパーセンタイル, ピークメモリを測ってJSONに保存する。
+OLEOBJECTの列はリテラルのSQL(ダイレクトモードのUpdateRowなど)で書けないので、値はNULLにする。
+ピークメモリはtracemallocを有効にした別の実行(最大--mem-ops回)で測るので、時間の測定には影響しない。
+値はSQLite上の値なので、Accessの絶対性能ではなくバージョン間の比較(--compare)に使う。
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+import warnings
+from time import perf_counter_ns
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(bench_dir, '..'))
+sys.path.insert(0, os.path.join(bench_dir, '..', 'tests', 'odbc_standin')) #pyodbcよりスタンドインを先に読み込む
+import pyodbc
+import DataBaseCtrl as dbc
+from DataBaseCtrl import DataBaseCtrl, AccessDataType, Access_dtype_py
+
+table_name = 'Bench'
+"""ベンチマーク用テーブル名"""
+default_rows = '1000,100000,1000000'
+"""測定する行数"""
+bench_types = [dtype for dtype in AccessDataType if Access_dtype_py[dtype] != None]
+"""テーブルの列のデータ型（リテラル変換の無い使用不能の型は除く）"""
+
+
+class Case(NamedTuple):
+    """測定する操作"""
+    name:str
+    """操作名"""
+    setup:Callable[[], None]
+    """測定前の準備（時間に含めない）"""
+    op:Callable[[int], Any]
+    """1回の操作(i回目)"""
+    count:int
+    """時間を測る回数"""
+    rows:Callable[[], int]
+    """1回の操作で処理する行数（rows_per_secの計算用）"""
+
+
+def ColumnName(dtype:AccessDataType) -> str:
+    """データ型の列名"""
+    return f'c_{dtype.name.lower()}'
+
+
+def MakeColumns(rows:int, start_id:int=1) -> Dict[str, List[Any]]:
+    """bench_typesの列の値を作る。（SQLiteへ保存する形）"""
+    rng = np.random.default_rng(start_id)
+    ids = np.arange(start_id, start_id + rows)
+    stamps = np.datetime64('2024-01-01T00:00:00') + rng.integers(0, 10**8, rows).astype('timedelta64[s]')
+    stamp_text = np.char.replace(np.datetime_as_string(stamps, unit='s'), 'T', ' ')
+    long_values:List[Any] = rng.integers(-10**6, 10**6, rows).tolist()
+    for i in range(0, rows, 50): #NULLを含む整数列
+        long_values[i] = None
+    time_text = np.char.add('1899-12-30 ', np.char.partition(stamp_text, ' ')[:, 2])
+    cent = rng.integers(0, 10**7, rows)
+    columns:Dict[str, List[Any]] = {
+        'ID': ids.tolist(),
+        ColumnName(AccessDataType.CHAR): [f'C{ID:09d}' for ID in ids.tolist()],
+        ColumnName(AccessDataType.VARCHAR): [f'Name{ID}' for ID in ids.tolist()],
+        ColumnName(AccessDataType.MEMO): [f'memo {ID} ' + 'x' * 40 for ID in ids.tolist()],
+        ColumnName(AccessDataType.BYTE): rng.integers(0, 256, rows).tolist(),
+        ColumnName(AccessDataType.INTEGER): rng.integers(-2**15, 2**15, rows).tolist(),
+        ColumnName(AccessDataType.LONG): long_values,
+        ColumnName(AccessDataType.SINGLE): rng.random(rows).astype(np.float32).astype(float).tolist(),
+        ColumnName(AccessDataType.DOUBLE): (rng.random(rows) * 1000).tolist(),
+        ColumnName(AccessDataType.CURRENCY): [f'{c // 100}.{c % 100:02d}' for c in cent.tolist()],
+        ColumnName(AccessDataType.AUTOINCREMENT): ids.tolist(),
+        ColumnName(AccessDataType.DATE): np.char.add(np.char.partition(stamp_text, ' ')[:, 0], ' 00:00:00').tolist(),
+        ColumnName(AccessDataType.TIME): time_text.tolist(),
+        ColumnName(AccessDataType.DATETIME): stamp_text.tolist(),
+        ColumnName(AccessDataType.TIMESTAMP): stamp_text.tolist(),
+        ColumnName(AccessDataType.YESNO): (ids % 2).tolist(),
+        ColumnName(AccessDataType.OLEOBJECT): [None] * rows, #バイナリはリテラルのSQLで書けない
+        ColumnName(AccessDataType.GUID): [f'{{{ID:08X}-0000-4000-8000-000000000000}}' for ID in ids.tolist()],
+        ColumnName(AccessDataType.REAL): rng.random(rows).tolist(),
+        ColumnName(AccessDataType.VARBINARY): time_text.tolist(),
+        ColumnName(AccessDataType.BIT): (ids % 3 == 0).astype(int).tolist(),
+    }
+    return columns
+
+
+def MakeDataBase(path:str, rows:int) -> None:
+    """bench_typesの列を持つテーブルを作る。（SQLiteのファイル、拡張子は.accdb）"""
+    decl_list = ['ID LONG PRIMARY KEY']
+    for dtype in bench_types:
+        size = '(255)' if dtype in (AccessDataType.CHAR, AccessDataType.VARCHAR) else ''
+        decl_list.append(f'{ColumnName(dtype)} {dtype.name}{size}')
+    conn = pyodbc.connect(f'DBQ={path};')
+    cursor = conn.cursor()
+    cursor.execute(f'CREATE TABLE [{table_name}] ({", ".join(decl_list)});')
+    chunk = 100000
+    for start in range(0, rows, chunk):
+        columns = MakeColumns(min(chunk, rows - start), start + 1)
+        cursor.executemany(f'INSERT INTO [{table_name}] VALUES ({", ".join(["?"] * len(columns))});', list(zip(*columns.values())))
+    conn.commit()
+    conn.close()
+
+
+def Percentile(lat_ns:List[int]) -> Dict[str, float]:
+    """レイテンシ[ms]の統計"""
+    lat = np.array(lat_ns, dtype=np.float64) / 1e6
+    p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+    return {'mean':float(lat.mean()), 'p50':float(p50), 'p90':float(p90), 'p99':float(p99), 'max':float(lat.max())}
+
+
+def Run(case:Case, mem_ops:int) -> Dict[str, Any]:
+    """操作の時間を測り、tracemallocを有効にした別の実行でピークメモリを測る。"""
+    case.setup()
+    lat_ns:List[int] = []
+    for i in range(case.count):
+        start = perf_counter_ns()
+        case.op(i)
+        lat_ns.append(perf_counter_ns() - start)
+    seconds = sum(lat_ns) / 1e9
+    rows = case.rows() * case.count
+    #ピークメモリ（時間とは別に測る）
+    case.setup()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for i in range(min(case.count, mem_ops)):
+        case.op(case.count + i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'ops':case.count,
+        'seconds':seconds,
+        'ops_per_sec':case.count / seconds if seconds > 0 else None,
+        'rows_per_sec':rows / seconds if seconds > 0 else None,
+        'latency_ms':Percentile(lat_ns),
+        'peak_mb':(peak - base) / 2**20,
+    }
+
+
+def MakeCases(path:str, rows:int, ops:int) -> List[Case]:
+    """行数毎の測定する操作を作る。"""
+    df_ctrl = DataBaseCtrl(path, table_name)
+    direct_ctrl = DataBaseCtrl(path, table_name, DirectMode=True)
+    rng = np.random.default_rng(1)
+    ids = rng.integers(1, rows + 1, ops * 2).tolist()
+    names = [f'Name{ID}' for ID in ids]
+    next_id = [rows + 1]
+    sync_rows = [0]
+    load_count = 3 if rows <= 100000 else 1
+    varchar = ColumnName(AccessDataType.VARCHAR)
+    double = ColumnName(AccessDataType.DOUBLE)
+
+    def Nothing() -> None:
+        pass
+
+    def AddDict() -> Dict[str, Any]:
+        return {varchar:f'Added{next_id[0]}', double:1.5, ColumnName(AccessDataType.YESNO):True}
+
+    def DirectAddRow(i:int) -> None:
+        direct_ctrl.AddRow(AddDict(), ID=next_id[0])
+        next_id[0] += 1
+
+    def DataFrameAddRow(i:int) -> None:
+        df_ctrl.AddRow(AddDict(), ID=next_id[0])
+        next_id[0] += 1
+
+    def PrepareSync() -> None:
+        #更新・追加をops行ずつ作っておく
+        for i in range(ops):
+            df_ctrl.UpdateRow(ids[i], {double:float(i)})
+            DataFrameAddRow(i)
+        sync_rows[0] = len(df_ctrl.UpdatedIDs) + len(df_ctrl.AddedIDs)
+
+    return [
+        Case('UpdateInternalDataFrame', Nothing, lambda i: df_ctrl.UpdateInternalDataFrame(), load_count, lambda: rows),
+        Case('SerchRows(DataFrame)', Nothing, lambda i: df_ctrl.SerchRows({varchar:names[i % len(names)]}), ops, lambda: 1),
+        Case('UpdateRow(DataFrame)', Nothing, lambda i: df_ctrl.UpdateRow(ids[i % len(ids)], {double:float(i)}), ops, lambda: 1),
+        Case('AddRow(DataFrame)', Nothing, DataFrameAddRow, ops, lambda: 1),
+        Case('UpdateDataBase', PrepareSync, lambda i: df_ctrl.UpdateDataBase(reload=False), 1, lambda: sync_rows[0]),
+        Case('SelectRowByID(Direct)', Nothing, lambda i: direct_ctrl.SelectRowByID(ids[i % len(ids)]), ops, lambda: 1),
+        Case('SerchRows(Direct)', Nothing, lambda i: direct_ctrl.SerchRows({varchar:names[i % len(names)]}), ops, lambda: 1),
+        Case('UpdateRow(Direct)', Nothing, lambda i: direct_ctrl.UpdateRow(ids[i % len(ids)], {double:float(i)}), ops, lambda: 1),
+        Case('AddRow(Direct)', Nothing, DirectAddRow, ops, lambda: 1),
+    ]
+
+
+def GitCommit() -> Optional[str]:
+    """測定したリポジトリのコミット"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=bench_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def Compare(new:Dict[str, Any], old:Dict[str, Any]) -> None:
+    """前回の結果とops/secとp50を比較して表示する。"""
+    print(f"\ncompare with {old['meta'].get('commit')} ({old['meta'].get('date')})")
+    for rows, case_dict in new['results'].items():
+        for name, res in case_dict.items():
+            old_res = old['results'].get(rows, {}).get(name)
+            if(old_res == None or not(old_res['ops_per_sec']) or not(res['ops_per_sec'])):
+                continue
+            speed = res['ops_per_sec'] / old_res['ops_per_sec']
+            p50 = res['latency_ms']['p50'] / old_res['latency_ms']['p50']
+            print(f'{rows:>8} {name:<26} ops/sec x{speed:.2f}  p50 x{p50:.2f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='DataBaseCtrl benchmark on a SQLite pyodbc stand-in')
+    parser.add_argument('--rows', default=default_rows, help='測定する行数(カンマ区切り)')
+    parser.add_argument('--ops', type=int, default=200, help='1行操作の測定回数')
+    parser.add_argument('--mem-ops', type=int, default=20, help='ピークメモリを測る実行の最大回数')
+    parser.add_argument('--out', default='access_bench.json', help='結果のJSONファイル')
+    parser.add_argument('--compare', default=None, help='比較する前回の結果のJSONファイル')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', FutureWarning) #pandasの非推奨警告が操作毎に出るので表示しない
+
+    result:Dict[str, Any] = {
+        'meta':{
+            'date':datetime.now().isoformat(timespec='seconds'),
+            'commit':GitCommit(),
+            'python':platform.python_version(),
+            'platform':platform.platform(),
+            'pandas':pd.__version__,
+            'numpy':np.__version__,
+            'pyodbc':pyodbc.version,
+            'ops':args.ops,
+            'mem_ops':args.mem_ops,
+        },
+        'results':{},
+    }
+    for rows in [int(r) for r in args.rows.split(',')]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, f'bench_{rows}.accdb')
+            MakeDataBase(path, rows)
+            case_dict:Dict[str, Any] = {}
+            for case in MakeCases(path, rows, args.ops):
+                case_dict[case.name] = Run(case, args.mem_ops)
+                res = case_dict[case.name]
+                print(f"{rows:>8} {case.name:<26} {res['ops_per_sec']:>10.1f} ops/s  "
+                      f"p50={res['latency_ms']['p50']:.3f}ms p99={res['latency_ms']['p99']:.3f}ms  peak={res['peak_mb']:.1f}MiB")
+            result['results'][str(rows)] = case_dict
+            dbc.connection_pool.Clear() #一時ファイルを消す前に接続を閉じる
+            dbc.schema_cache.Clear()
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f'saved: {args.out}')
+    if(args.compare != None):
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            Compare(result, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""SQL結果→データフレーム変換のメモリ使用量比較（全列object vs 列毎の型変換）
+
+使用方法:
+    python benchmark/decode_memory_bench.py [行数]
+
+データベースには接続せず、pyodbcの結果と同じ形(行のタプルのリスト)のデータを変換してメモリ使用量と変換時間を比較する。
+"""
+import sys
+from time import perf_counter
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from sql_render_bench import MakeCtrl
+
+
+def MakeRows(rows:int) -> List[tuple]:
+    """SQLの結果に相当する行リストを作る。数値・日時の一部はNULL"""
+    rng = np.random.default_rng(0)
+    base = datetime(2024, 1, 1)
+    out_list:List[tuple] = []
+    for i in range(rows):
+        qty = int(rng.integers(0, 1000)) if i % 50 else None
+        out_list.append((i + 1, f'Name{i}', 'memo ' * 4, qty, float(rng.random() * 1000), bool(i % 2),
+                         base + timedelta(minutes=i), base + timedelta(days=i % 3650)))
+    return out_list
+
+
+def main(rows:int) -> None:
+    ctrl = MakeCtrl()
+    res = MakeRows(rows)
+    columns = list(ctrl.ColumnCatalog)
+
+    start = perf_counter()
+    obj_df = pd.DataFrame(np.array(res, dtype=object), columns=columns).set_index('ID')
+    t_obj = perf_counter() - start
+    start = perf_counter()
+    typed_df = ctrl._DataBaseCtrl__SqlResultToDataFrame(res)
+    t_typed = perf_counter() - start
+
+    mem_obj = obj_df.memory_usage(deep=True).sum()
+    mem_typed = typed_df.memory_usage(deep=True).sum()
+    print(f'rows={rows}')
+    print(f'object: {mem_obj / 2**20:.1f} MiB  decode={t_obj:.3f}s')
+    print(f'typed : {mem_typed / 2**20:.1f} MiB  decode={t_typed:.3f}s  ({mem_typed / mem_obj * 100:.0f}%)')
+    print(typed_df.dtypes.to_string())
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,106 @@
+"""INSERT/UPDATE SQL生成のベンチマーク（列毎のまとめ変換 vs iterrowsでの1値ずつ変換）
+
+使用方法:
+    python benchmark/sql_render_bench.py [行数]
+
+データベースには接続せず、列カタログだけを設定したDataBaseCtrlでSQL文字列の生成時間のみを測定する。
+"""
+import os
+import sys
+from time import perf_counter
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from DataBaseCtrl import DataBaseCtrl, DataBaseLock, AccessDataType, Access_dtype_py, Access_dtype_literal, ColumnInfo, Error
+
+bench_columns = [
+    ('ID', AccessDataType.INTEGER),
+    ('Name', AccessDataType.VARCHAR),
+    ('Note', AccessDataType.MEMO),
+    ('Qty', AccessDataType.LONG),
+    ('Price', AccessDataType.DOUBLE),
+    ('Flag', AccessDataType.YESNO),
+    ('Stamp', AccessDataType.DATETIME),
+    ('Day', AccessDataType.DATE),
+]
+"""ベンチマーク用テーブルの列"""
+
+
+def MakeCtrl() -> DataBaseCtrl:
+    """データベースに接続せず列カタログのみ設定したDataBaseCtrlを作る。"""
+    ctrl = DataBaseCtrl.__new__(DataBaseCtrl)
+    ctrl.TableName = 'Bench'
+    ctrl.DirectMode = True
+    ctrl.Lock = DataBaseLock()
+    ctrl.err = Error.NO_ERR
+    ctrl.ColumnCatalog = {name: ColumnInfo(name, dtype, Access_dtype_py[dtype], i, Access_dtype_literal[dtype])
+                          for i, (name, dtype) in enumerate(bench_columns)}
+    return ctrl
+
+
+def MakeData(rows:int) -> pd.DataFrame:
+    """ベンチマーク用データフレームを作る。"""
+    rng = np.random.default_rng(0)
+    base = datetime(2024, 1, 1)
+    df = pd.DataFrame({
+        'ID': np.arange(1, rows + 1),
+        'Name': [f"Name'{i}" for i in range(rows)],
+        'Note': ['memo ' * 4] * rows,
+        'Qty': rng.integers(0, 1000, rows),
+        'Price': rng.random(rows) * 1000,
+        'Flag': rng.integers(0, 2, rows).astype(bool),
+        'Stamp': [base + timedelta(minutes=int(m)) for m in rng.integers(0, 10**6, rows)],
+        'Day': [base + timedelta(days=int(d)) for d in rng.integers(0, 3650, rows)],
+    })
+    return df.set_index('ID')
+
+
+def IterrowsInsertSQL(ctrl:DataBaseCtrl, Data:pd.DataFrame) -> List[str]:
+    """従来方式: iterrowsで1値ずつリテラル変換するINSERT"""
+    out_list:List[str] = []
+    for idx, content_ser in Data.iterrows():
+        sql_col = f'({Data.index.name}, '
+        sql_val = f'VALUES ({idx}, '
+        for col, val in content_ser.items():
+            sql_col += f'{col}, '
+            sql_val += f'{ctrl.ColumnCatalog[col].Literal(val)}, '
+        out_list.append(f'INSERT INTO [{ctrl.TableName}] {sql_col[0:-2]}) {sql_val[0:-2]});')
+    return out_list
+
+
+def IterrowsUpdateSQL(ctrl:DataBaseCtrl, Data:pd.DataFrame) -> List[str]:
+    """従来方式: iterrowsで1値ずつリテラル変換するUPDATE"""
+    out_list:List[str] = []
+    for idx, content_ser in Data.iterrows():
+        sql_str = f'UPDATE [{ctrl.TableName}] SET'
+        for col, val in content_ser.items():
+            sql_str += f' {col} = {ctrl.ColumnCatalog[col].Literal(val)},'
+        out_list.append(sql_str[0:-1] + f' WHERE {Data.index.name} = {idx};')
+    return out_list
+
+
+def Measure(func, *args) -> float:
+    """1回実行の経過時間[s]"""
+    start = perf_counter()
+    func(*args)
+    return perf_counter() - start
+
+
+def main(rows:int) -> None:
+    ctrl = MakeCtrl()
+    df = MakeData(rows)
+    results = [
+        ('INSERT', Measure(IterrowsInsertSQL, ctrl, df), Measure(ctrl._DataBaseCtrl__InsertSQL, df)),
+        ('UPDATE', Measure(IterrowsUpdateSQL, ctrl, df), Measure(ctrl._DataBaseCtrl__UpdateSQL, df)),
+    ]
+    print(f'rows={rows}')
+    for name, t_iter, t_vec in results:
+        print(f'{name}: iterrows={t_iter:.3f}s  columnar={t_vec:.3f}s  speedup=x{t_iter / t_vec:.1f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
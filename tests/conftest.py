@@ -0,0 +1,62 @@
+"""pyodbcのSQLiteスタンドイン(tests/odbc_standin)を使うテストの共通設定
+
+Accessドライバーが無い環境でもDataBaseCtrlの動作を確認できるように、pyodbcよりスタンドインを先に読み込む。
+"""
+import os
+import sys
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import pytest
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(tests_dir, '..'))
+sys.path.insert(0, os.path.join(tests_dir, 'odbc_standin')) #pyodbcよりスタンドインを先に読み込む
+import pyodbc
+import DataBaseCtrl as dbc
+
+names = ['Alice', 'alice', 'BOB', 'bobby', None, "O'Brien"]
+"""db_pathのName列の値（ID=1から）"""
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_state() -> Iterator[None]:
+    """テスト毎に接続プールが保持している接続を閉じ（一時ファイルを開いたままにしない）、列情報キャッシュを空にする。"""
+    yield
+    dbc.connection_pool.Clear()
+    dbc.schema_cache.Clear()
+
+@pytest.fixture
+def table_name() -> str:
+    """テスト用テーブル名"""
+    return 'T'
+
+@pytest.fixture
+def make_db(tmp_path, table_name) -> Callable[..., str]:
+    """CREATE TABLEの列定義と行からデータベースファイルを作る関数を返す。"""
+    def MakeDataBase(columns_sql:str, rows:List[tuple], file_name:str='test.accdb') -> str:
+        path = str(tmp_path / file_name)
+        conn = pyodbc.connect(f'DBQ={path}')
+        conn.execute(f'CREATE TABLE {table_name} ({columns_sql})')
+        if(len(rows) > 0):
+            conn.cursor().executemany(f"INSERT INTO {table_name} VALUES ({', '.join(['?'] * len(rows[0]))})", rows)
+        conn.commit()
+        conn.close()
+        return path
+    return MakeDataBase
+
+@pytest.fixture
+def db_path(make_db) -> str:
+    """Name(VARCHAR), Num(LONG), D(DATETIME)の列を持つテーブルを作り、データベースファイルパスを返す。"""
+    return make_db('ID LONG PRIMARY KEY, Name VARCHAR(50), Num LONG, D DATETIME',
+                   [(i, name, i * 10, datetime(2024, 1, i, 12 if i % 2 else 0)) for i,name in enumerate(names, 1)])
+
+@pytest.fixture
+def fetch_rows(table_name) -> Callable[[str], Dict[int,Tuple]]:
+    """データベースの行を{ID:(Name, Num)}で読み込む関数を返す。"""
+    def FetchRows(path:str) -> Dict[int,Tuple]:
+        conn = pyodbc.connect(f'DBQ={path}')
+        rows = {row[0]:(row[1], row[2]) for row in conn.execute(f'SELECT ID, Name, Num FROM {table_name}').fetchall()}
+        conn.close()
+        return rows
+    return FetchRows
@@ -0,0 +1,301 @@
+"""pyodbcの代わりにSQLiteを使うスタンドイン（テスト・ベンチマーク用）
+
+Accessドライバーが無い環境(Linux CI)でDataBaseCtrlを動かすため、DataBaseCtrlが使うpyodbcのAPIだけをsqlite3で実装する。
+このディレクトリをsys.pathの先頭に入れてからDataBaseCtrlをimportすると、pyodbcの代わりに読み込まれる。
+
+- 接続文字列のDBQ=のファイルをSQLiteのデータベースとして開く。（拡張子は.accdbのまま）
+- 列の型名はCREATE TABLEで宣言したAccessDataTypeの名前をそのまま返す。
+- AUTOINCREMENTはSQLiteの予約語なので、CREATE/ALTERではCOUNTER(Accessの別名)として宣言する。
+- LIKEはAccess(ANSI-92)と同じく大文字小文字を区別せず、%, _, [...]を使える。
+- 文字列型の列はCOLLATE NOCASEで宣言し、Accessと同じく=, <などの比較でも大文字小文字を区別しない。（ASCIIのみ）
+- dateは0時の日時として保存・比較する。
+- 値・速度はSQLite上の値なので、ベンチマークはAccessの絶対性能ではなくバージョン間の比較に使う。
+"""
+import re
+import sqlite3
+from datetime import datetime, date, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+version = '4.0.sqlite-standin'
+apilevel = '2.0'
+threadsafety = 1
+paramstyle = 'qmark'
+
+
+class Error(Exception):
+    """pyodbc.Error"""
+
+class InterfaceError(Error):
+    """pyodbc.InterfaceError"""
+
+class DatabaseError(Error):
+    """pyodbc.DatabaseError"""
+
+class DataError(DatabaseError):
+    """pyodbc.DataError"""
+
+class OperationalError(DatabaseError):
+    """pyodbc.OperationalError"""
+
+class IntegrityError(DatabaseError):
+    """pyodbc.IntegrityError"""
+
+class InternalError(DatabaseError):
+    """pyodbc.InternalError"""
+
+class ProgrammingError(DatabaseError):
+    """pyodbc.ProgrammingError（テーブル・列が無い、構文エラーなど）"""
+
+class NotSupportedError(DatabaseError):
+    """pyodbc.NotSupportedError"""
+
+Row = tuple
+"""pyodbc.Row（タプルで代用）"""
+
+access_epoch = date(1899, 12, 30)
+"""Accessの時刻のみの値の日付"""
+
+odbc_sql_type = {
+    'CHAR':1, 'VARCHAR':12, 'MEMO':-1, 'HYPERLINK':-1, 'GUID':-11,
+    'BYTE':-6, 'INTEGER':5, 'LONG':4, 'AUTOINCREMENT':4,
+    'SINGLE':7, 'REAL':7, 'DOUBLE':8, 'CURRENCY':2, 'DECIMAL':3,
+    'DATE':93, 'TIME':93, 'DATETIME':93, 'TIMESTAMP':93, 'VARBINARY':93,
+    'YESNO':-7, 'BIT':-7, 'OLEOBJECT':-4,
+}
+"""Accessの型名→ODBCのSQLデータ型"""
+
+
+def _ParseDateTime(raw:bytes) -> datetime:
+    """保存された日時文字列('/'区切り、時刻のみも可)をdatetimeにする。"""
+    text = raw.decode('utf-8').replace('/', '-')
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return datetime.combine(access_epoch, time.fromisoformat(text))
+
+def _ParseBool(raw:bytes) -> bool:
+    """Yes/No(0/1/-1/True/False)をboolにする。"""
+    text = raw.decode('utf-8')
+    if(text in ('True', 'False')):
+        return text == 'True'
+    return int(float(text)) != 0
+
+def _ParseText(raw:bytes) -> str:
+    """数値親和性の列(MEMOなど)に数値として保存された文字列も文字列で返す。"""
+    return raw.decode('utf-8')
+
+for _name in ('DATE', 'TIME', 'DATETIME', 'TIMESTAMP', 'VARBINARY'):
+    sqlite3.register_converter(_name, _ParseDateTime)
+for _name in ('YESNO', 'BIT'):
+    sqlite3.register_converter(_name, _ParseBool)
+for _name in ('CURRENCY', 'DECIMAL'):
+    sqlite3.register_converter(_name, lambda raw: Decimal(raw.decode('utf-8')))
+for _name in ('CHAR', 'VARCHAR', 'MEMO', 'HYPERLINK', 'GUID'):
+    sqlite3.register_converter(_name, _ParseText)
+for _name in ('SINGLE', 'REAL', 'DOUBLE'):
+    sqlite3.register_converter(_name, lambda raw: float(raw))
+sqlite3.register_adapter(datetime, lambda val: val.isoformat(' '))
+sqlite3.register_adapter(date, lambda val: datetime.combine(val, time()).isoformat(' '))
+sqlite3.register_adapter(Decimal, str)
+
+
+@lru_cache(maxsize=256)
+def _LikeRegex(pattern:str) -> 're.Pattern[str]':
+    """AccessのLIKEパターンを正規表現にする。"""
+    out_list:List[str] = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        end = pattern.find(']', i + 2) if ch == '[' else -1
+        if(ch == '%'):
+            out_list.append('.*')
+        elif(ch == '_'):
+            out_list.append('.')
+        elif(end > 0):
+            body = pattern[i+1:end]
+            negate = body.startswith('!')
+            body = ''.join('\\' + c if c in '\\[]^' else c for c in (body[1:] if negate else body))
+            out_list.append(f"[{'^' if negate else ''}{body}]")
+            i = end
+        else:
+            out_list.append(re.escape(ch))
+        i += 1
+    return re.compile(''.join(out_list), re.IGNORECASE | re.DOTALL)
+
+def _AccessLike(pattern:Optional[str], value:Any) -> Optional[bool]:
+    """SQLiteのlike(パターン, 値)をAccessのLIKEで置き換える。"""
+    if(pattern is None or value is None):
+        return None
+    return _LikeRegex(pattern).fullmatch(str(value)) is not None
+
+_text_type_regex = re.compile(r'(?<=[\w\]`"])(\s+)(CHAR|VARCHAR|MEMO|HYPERLINK|GUID|TEXT)(\s*\(\s*\d+\s*\))?(?=[\s,)]|$)', re.IGNORECASE)
+"""列名に続く文字列型の宣言"""
+
+def _Rewrite(sql:str) -> str:
+    """SQLiteで書けないAccessのSQLを書き換える。（CREATE/ALTERのAUTOINCREMENT型→COUNTER、文字列型にCOLLATE NOCASE）"""
+    if(re.match(r'\s*(CREATE|ALTER)\b', sql, re.IGNORECASE)):
+        sql = re.sub(r'\bAUTOINCREMENT\b', 'COUNTER', sql, flags=re.IGNORECASE)
+        return _text_type_regex.sub(lambda m: f'{m.group(1)}{m.group(2)}{m.group(3) or ""} COLLATE NOCASE', sql)
+    return sql
+
+def _Translate(err:sqlite3.Error) -> Error:
+    """sqlite3の例外をpyodbcの例外にする。"""
+    message = str(err)
+    if(isinstance(err, sqlite3.IntegrityError)):
+        return IntegrityError(message)
+    if(isinstance(err, sqlite3.OperationalError)):
+        if(re.search(r'no such|syntax error|has no column|already exists|duplicate column', message)):
+            return ProgrammingError(message)
+        return OperationalError(message)
+    if(isinstance(err, sqlite3.DataError)):
+        return DataError(message)
+    if(isinstance(err, sqlite3.DatabaseError)):
+        return DatabaseError(message)
+    return Error(message)
+
+
+class Cursor():
+    """pyodbc.Cursor"""
+    fast_executemany:bool
+    """pyodbcとの互換用（SQLiteでは効果なし）"""
+    rowcount:int
+    """最後のexecute/executemanyで影響した行数、SELECTは-1"""
+
+    def __init__(self, connection:'Connection') -> None:
+        self.connection = connection
+        self.fast_executemany = False
+        self.rowcount = -1
+        self.__cursor = connection._db.cursor()
+        self.__rows:Optional[List[tuple]] = None
+
+    @property
+    def description(self) -> Any:
+        """結果の列情報"""
+        return self.__cursor.description
+
+    def execute(self, sql:str, *params:Any) -> 'Cursor':
+        """SQLを実行する。パラメータは可変長引数または1つのシーケンスで渡す。"""
+        if(len(params) == 1 and isinstance(params[0], (list, tuple))):
+            params = tuple(params[0])
+        self.__rows = None
+        try:
+            self.__cursor.execute(_Rewrite(sql), params)
+        except sqlite3.Error as err:
+            raise _Translate(err) from err
+        self.rowcount = self.__cursor.rowcount
+        return self
+
+    def executemany(self, sql:str, seq_of_params:Sequence[Sequence[Any]]) -> None:
+        """パラメータ行毎にSQLを実行する。"""
+        self.__rows = None
+        try:
+            self.__cursor.executemany(sql, [tuple(params) for params in seq_of_params])
+        except sqlite3.Error as err:
+            raise _Translate(err) from err
+        self.rowcount = self.__cursor.rowcount
+
+    def fetchone(self) -> Optional[tuple]:
+        """結果を1行取得する。"""
+        if(self.__rows != None):
+            return self.__rows.pop(0) if self.__rows else None
+        return self.__cursor.fetchone()
+
+    def fetchmany(self, size:int=1) -> List[tuple]:
+        """結果を最大size行取得する。"""
+        if(self.__rows != None):
+            out_list, self.__rows = self.__rows[:size], self.__rows[size:]
+            return out_list
+        return self.__cursor.fetchmany(size)
+
+    def fetchall(self) -> List[tuple]:
+        """結果の残りの行を全て取得する。"""
+        if(self.__rows != None):
+            out_list, self.__rows = self.__rows, []
+            return out_list
+        return self.__cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def columns(self, table:Optional[str]=None, catalog:Optional[str]=None, schema:Optional[str]=None, column:Optional[str]=None) -> 'Cursor':
+        """テーブルの列情報(SQLColumns + Accessのordinal)を結果にする。テーブルが無い場合は0行。"""
+        try:
+            info = self.connection._db.execute(f'PRAGMA table_info([{table}])').fetchall()
+        except sqlite3.Error as err:
+            raise _Translate(err) from err
+        rows:List[tuple] = []
+        for cid,name,decl_type,not_null,default,_ in info:
+            if(column != None and name != column):
+                continue
+            type_name = re.sub(r'\(.*\)', '', decl_type).strip().upper()
+            type_name = 'AUTOINCREMENT' if type_name == 'COUNTER' else type_name
+            size_match = re.search(r'\((\d+)', decl_type)
+            size = int(size_match.group(1)) if size_match else 255
+            sql_type = odbc_sql_type.get(type_name, 12)
+            rows.append((None, None, table, name, sql_type, type_name, size, size, 0, 10,
+                         0 if not_null else 1, None, default, sql_type, None, size, cid + 1,
+                         'NO' if not_null else 'YES', cid + 1))
+        self.__rows = rows
+        self.rowcount = -1
+        return self
+
+    def cancel(self) -> None:
+        """実行中のSQLの中断を要求する。"""
+        self.connection._db.interrupt()
+
+    def close(self) -> None:
+        """カーソルを閉じる。"""
+        self.__rows = None
+        try:
+            self.__cursor.close()
+        except sqlite3.Error:
+            pass
+
+
+class Connection():
+    """pyodbc.Connection"""
+    autocommit:bool
+    """自動コミット（pyodbcと同じくDefault=False）"""
+
+    def __init__(self, DataBase_Path:str, autocommit:bool=False, timeout:float=30.0) -> None:
+        self._db = sqlite3.connect(DataBase_Path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                   check_same_thread=False, timeout=timeout,
+                                   isolation_level=None if autocommit else 'DEFERRED')
+        self._db.create_function('like', 2, _AccessLike, deterministic=True)
+        self.autocommit = autocommit
+
+    def cursor(self) -> Cursor:
+        """カーソルを作る。"""
+        return Cursor(self)
+
+    def execute(self, sql:str, *params:Any) -> Cursor:
+        """新しいカーソルでSQLを実行する。"""
+        return self.cursor().execute(sql, *params)
+
+    def commit(self) -> None:
+        """コミットする。"""
+        try:
+            self._db.commit()
+        except sqlite3.Error as err:
+            raise _Translate(err) from err
+
+    def rollback(self) -> None:
+        """ロールバックする。"""
+        try:
+            self._db.rollback()
+        except sqlite3.Error as err:
+            raise _Translate(err) from err
+
+    def close(self) -> None:
+        """接続を閉じる。"""
+        self._db.close()
+
+
+def connect(connstring:str, autocommit:bool=False, timeout:float=30.0, **kwargs:Any) -> Connection:
+    """接続文字列のDBQ=のファイルに接続する。"""
+    match = re.search(r'DBQ=([^;]+)', connstring, re.IGNORECASE)
+    if(match == None):
+        raise InterfaceError(f'DBQ= is not in the connection string: {connstring}')
+    return Connection(match.group(1), autocommit=autocommit, timeout=timeout)
@@ -0,0 +1,31 @@
+"""benchmark/access_bench.py（スタンドインでのベンチマーク）のテスト"""
+import json
+import os
+import subprocess
+import sys
+
+bench_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmark', 'access_bench.py')
+"""ベンチマークスクリプトのパス"""
+
+
+def RunBench(*args:str) -> str:
+    """ベンチマークを別のプロセスで実行し、標準出力を返す。"""
+    res = subprocess.run([sys.executable, bench_path, *args], capture_output=True, text=True, timeout=300)
+    assert res.returncode == 0, res.stderr
+    return res.stdout
+
+def test_access_bench_saves_and_compares(tmp_path):
+    """行数毎に全ての操作を測ってJSONに保存し、--compareで前回と比較する。"""
+    first = str(tmp_path / 'first.json')
+    RunBench('--rows', '50,100', '--ops', '3', '--mem-ops', '2', '--out', first)
+    with open(first, 'r', encoding='utf-8') as f:
+        result = json.load(f)
+    assert sorted(result['results']) == ['100', '50']
+    cases = result['results']['50']
+    assert {'UpdateInternalDataFrame', 'SelectRowByID(Direct)', 'UpdateDataBase'} <= set(cases)
+    for res in cases.values():
+        assert res['ops'] > 0
+        assert res['ops_per_sec'] > 0
+        assert res['latency_ms']['p50'] <= res['latency_ms']['max']
+    out = RunBench('--rows', '50', '--ops', '3', '--mem-ops', '2', '--out', str(tmp_path / 'second.json'), '--compare', first)
+    assert 'ops/sec x' in out
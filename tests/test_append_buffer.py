@@ -0,0 +1,50 @@
+"""データフレームモードのAddRow()・AddRowByDataFrame()（追加バッファ）のテスト"""
+from datetime import datetime
+
+import pandas as pd
+from DataBaseCtrl import DataBaseCtrl, DataRowState, Error
+
+
+def test_add_rows_are_flushed_on_read(db_path, table_name, fetch_rows):
+    """追加した行は内部データフレームを使う時に反映され、IDは最大ID+1から払い出す。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    for i in range(3):
+        assert DataBase.AddRow({'Name':f'n{i}', 'Num':i})
+    assert DataBase.AddRowByDataFrame(pd.DataFrame({'Name':['x', 'y'], 'Num':[100, 200]}, index=[20, 21]))
+    assert list(DataBase.Int_DF.index) == [1, 2, 3, 4, 5, 6, 7, 8, 9, 20, 21]
+    assert DataBase.Int_DF.index.name == 'ID'
+    assert DataBase.Int_DF.at[8, 'Name'] == 'n1'
+    assert DataBase.RowState_DF.at[21, 'RowState'] == DataRowState.Added
+    assert DataBase.UpdateDataBase()
+    rows = fetch_rows(db_path)
+    assert rows[9] == ('n2', 2)
+    assert rows[20] == ('x', 100)
+
+def test_flush_keeps_dtypes(db_path, table_name):
+    """追加した行を反映しても列のデータ型を変えない。値の無い整数の列はNULL可能なInt64にする。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    dtypes = DataBase.Int_DF.dtypes.copy()
+    assert DataBase.AddRow({'Name':'n', 'Num':70, 'D':datetime(2024, 2, 1)}, 7)
+    assert DataBase.AddRowByDataFrame(pd.DataFrame({'Name':['x'], 'Num':[80], 'D':[datetime(2024, 2, 2)]}, index=[8]))
+    assert DataBase.Int_DF.dtypes.equals(dtypes)
+    assert DataBase.Int_DF.at[8, 'Num'] == 80
+    assert DataBase.AddRow({'Name':'no num'}, 9)
+    assert str(DataBase.Int_DF['Num'].dtype) == 'Int64'
+    assert DataBase.Int_DF['Num'].isna().sum() == 1
+    assert DataBase.Int_DF.at[7, 'Num'] == 70
+
+def test_add_rows_by_dataframe_validation(db_path, table_name):
+    """データ型の不一致・IDの重複では何も追加しない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.AddRow({'Name':'n', 'Num':70}, 7)
+    assert not(DataBase.AddRowByDataFrame(pd.DataFrame({'Num':['x']}, index=[10])))
+    assert DataBase.err == Error.DATA_TYPE_MISMATCH
+    assert not(DataBase.AddRowByDataFrame(pd.DataFrame({'Nothing':[1]}, index=[10])))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    for ids in ([10, 10], [1], [7]):
+        assert not(DataBase.AddRowByDataFrame(pd.DataFrame({'Num':[1] * len(ids)}, index=ids)))
+        assert DataBase.err == Error.DATA_NOT_UNIQUE_BY_ID
+    assert list(DataBase.Int_DF.index) == [1, 2, 3, 4, 5, 6, 7]
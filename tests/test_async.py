@@ -0,0 +1,55 @@
+"""AsyncDataBaseCtrl（asyncio用ラッパー）のテスト"""
+import asyncio
+
+import pytest
+from DataBaseCtrl import AsyncDataBaseCtrl, Error
+
+
+def test_async_direct_reads(db_path, table_name):
+    """ダイレクトモードは複数のワーカーで読み込み、受付数の上限を超えた呼び出しはイベントループ上で待つ。"""
+    async def Main():
+        async with AsyncDataBaseCtrl(db_path, table_name, True, MaxWorkers=2, MaxPending=2) as DataBase:
+            df_list = await asyncio.gather(*[DataBase.SelectRowByID(ID) for ID in range(1, 7)])
+            assert [df.index[0] for df in df_list] == [1, 2, 3, 4, 5, 6]
+            assert DataBase.Stats['submitted'] == 6
+            assert DataBase.Stats['completed'] == 6
+            assert DataBase.Stats['max_queued'] > 2
+            assert await DataBase.UpdateRow(1, {'Name':'changed'})
+            assert (await DataBase.SelectRowByID(1)).at[1, 'Name'] == 'changed'
+            assert not(await DataBase.UpdateRow(99, {'Name':'x'}))
+            assert DataBase.err == Error.NO_ROW_EXIST
+            assert await DataBase.Call('IsTableExist')
+            with pytest.raises(AttributeError):
+                await DataBase.Call('_DataBaseCtrl__Connect')
+        with pytest.raises(RuntimeError):
+            await DataBase.SelectRowByID(1)
+    asyncio.run(Main())
+
+def test_async_dataframe_mode(db_path, table_name):
+    """データフレームモードは1つのワーカーで内部データフレームを共有する。"""
+    async def Main():
+        async with AsyncDataBaseCtrl(db_path, table_name, False, MaxWorkers=4) as DataBase:
+            assert DataBase.MaxWorkers == 1
+            assert await DataBase.UpdateInternalDataFrame()
+            assert await DataBase.UpdateRow(2, {'Num':200})
+            df = await DataBase.SerchRows({'Num':200})
+            assert list(df.index) == [2]
+            assert await DataBase.UpdateDataBase()
+    asyncio.run(Main())
+
+def test_async_cancel_queued_call(db_path, table_name, fetch_rows):
+    """受付待ちでキャンセルされた呼び出しは実行しない。"""
+    async def Main():
+        async with AsyncDataBaseCtrl(db_path, table_name, True, MaxWorkers=1, MaxPending=1) as DataBase:
+            first = asyncio.create_task(DataBase.UpdateRow(1, {'Num':100}))
+            second = asyncio.create_task(DataBase.UpdateRow(2, {'Num':200}))
+            await asyncio.sleep(0)
+            second.cancel()
+            assert await first
+            with pytest.raises(asyncio.CancelledError):
+                await second
+            assert DataBase.Stats['cancelled'] == 1
+    asyncio.run(Main())
+    rows = fetch_rows(db_path)
+    assert rows[1] == ('Alice', 100)
+    assert rows[2] == ('alice', 20)
@@ -0,0 +1,37 @@
+"""列カタログ(ColumnCatalog)と文字列リテラルのテスト"""
+from DataBaseCtrl import AccessDataType, DataBaseCtrl, Error
+from datetime import datetime
+
+
+def test_column_catalog(db_path, table_name):
+    """列カタログは列名から型・pythonデータ型・列番号を引ける。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert list(DataBase.ColumnCatalog) == ['ID', 'Name', 'Num', 'D']
+    assert DataBase.ColumnCatalog['Name'].DataType == AccessDataType.VARCHAR
+    assert DataBase.ColumnCatalog['Name'].PyType == str
+    assert DataBase.ColumnCatalog['D'].PyType == datetime
+    assert DataBase.ColumnCatalog['Num'].Ordinal == 2
+    assert not(DataBase.UpdateRow(1, {'Missing':1}))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert not(DataBase.UpdateRow(1, {'Num':'text'}))
+    assert DataBase.err == Error.DATA_TYPE_MISMATCH
+
+def test_quote_literal(db_path, table_name, fetch_rows):
+    """文字列リテラルのシングルクォートはそのまま書き込み・検索できる。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.AddRow({'Name':"it's", 'Num':1}, 20)
+    assert DataBase.UpdateRow(6, {'Name':"O'Neil"})
+    assert DataBase.SerchRows({'Name':"it's"}).index.to_list() == [20]
+    rows = fetch_rows(db_path)
+    assert rows[20] == ("it's", 1)
+    assert rows[6] == ("O'Neil", 60)
+
+def test_string_id_with_quote(make_db, table_name):
+    """シングルクォートを含む文字列IDの行を追加・変更・削除できる。"""
+    path = make_db('ID VARCHAR(20) PRIMARY KEY, Num LONG', [])
+    DataBase = DataBaseCtrl(path, table_name, True)
+    assert DataBase.AddRow({'Num':1}, "O'Hara")
+    assert DataBase.UpdateRow("O'Hara", {'Num':2})
+    assert DataBase.SelectRowByID("O'Hara").at["O'Hara", 'Num'] == 2
+    assert DataBase.DeleteRow("O'Hara")
+    assert DataBase.SelectRowByID("O'Hara").empty
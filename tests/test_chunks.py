@@ -0,0 +1,35 @@
+"""ReadByChunks、UpdateInternalDataFrame(chunk_size)（分割読み込み）のテスト"""
+from DataBaseCtrl import DataBaseCtrl, Error, SerchCondition
+
+
+def test_chunked_load_matches_full_load(db_path, table_name):
+    """分割読み込みは一括読み込みと同じデータフレームになる。"""
+    Full = DataBaseCtrl(db_path, table_name, False)
+    assert Full.UpdateInternalDataFrame()
+    for chunk_size in (1, 4, 6, 100):
+        DataBase = DataBaseCtrl(db_path, table_name, False)
+        assert DataBase.UpdateInternalDataFrame(chunk_size=chunk_size)
+        assert DataBase.Int_DF.equals(Full.Int_DF)
+        assert list(DataBase.Int_DF.dtypes) == list(Full.Int_DF.dtypes)
+        assert DataBase.Int_DF.index.name == 'ID'
+        assert len(DataBase.RowState) == 6
+
+def test_chunked_load_invalid(make_db, db_path, table_name):
+    """chunk_sizeが1未満、または行が無い場合は失敗する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert not(DataBase.UpdateInternalDataFrame(chunk_size=0))
+    assert DataBase.err == Error.INVALID_INPUT
+    Empty = DataBaseCtrl(make_db('ID LONG PRIMARY KEY, Name VARCHAR(50)', [], 'empty.accdb'), table_name, False)
+    assert not(Empty.UpdateInternalDataFrame(chunk_size=2))
+    assert Empty.err == Error.NO_DATA_IN_TABLE
+
+def test_read_by_chunks(db_path, table_name):
+    """ReadByChunksはchunk_size行ずつのデータフレームを返し、検索条件も使える。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    chunk_list = list(DataBase.ReadByChunks(4))
+    assert [len(chunk_df) for chunk_df in chunk_list] == [4, 2]
+    assert [ID for chunk_df in chunk_list for ID in chunk_df.index] == [1, 2, 3, 4, 5, 6]
+    serch_list = list(DataBase.ReadByChunks(1, {'Name':'bo'}, SerchCondition.StartWith))
+    assert sorted(chunk_df.index[0] for chunk_df in serch_list) == [3, 4]
+    assert list(DataBase.ReadByChunks(0)) == []
+    assert DataBase.err == Error.INVALID_INPUT
@@ -0,0 +1,42 @@
+"""SQLの結果の列毎のデータ型変換のテスト"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from DataBaseCtrl import DataBaseCtrl
+
+
+def test_decode_native_dtypes(db_path, table_name):
+    """NULLの無い整数・日時列はnumpyの型、NULLを含む文字列列はobjectになる。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    dtypes = DataBase.Int_DF.dtypes
+    assert dtypes['Num'] == np.int64
+    assert dtypes['D'].kind == 'M' #pandasのバージョンで単位(ns/us)が違う
+    assert dtypes['Name'].kind == 'O' #pandas 3ではstr型
+    assert pd.isna(DataBase.Int_DF.at[5, 'Name'])
+    assert DataBase.Int_DF.at[1, 'D'] == pd.Timestamp(2024, 1, 1, 12)
+
+def test_decode_nullable_dtypes(make_db, table_name):
+    """NULLを含む整数・Yes/No列はInt64/booleanになり、分割読み込みでも同じ型になる。"""
+    rows = [(1, 10, True, 1.5, datetime(2024, 1, 1)),
+            (2, None, None, None, None),
+            (3, 30, False, 3.5, datetime(2024, 1, 3))]
+    path = make_db('ID LONG PRIMARY KEY, Num LONG, Flag YESNO, Price DOUBLE, D DATETIME', rows)
+    DataBase = DataBaseCtrl(path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    dtypes = DataBase.Int_DF.dtypes
+    assert dtypes['Num'] == 'Int64'
+    assert dtypes['Flag'] == 'boolean'
+    assert dtypes['Price'] == np.float64
+    assert dtypes['D'].kind == 'M' #pandasのバージョンで単位(ns/us)が違う
+    assert DataBase.Int_DF.at[2, 'Num'] is pd.NA
+    assert DataBase.Int_DF.at[2, 'Flag'] is pd.NA
+    assert np.isnan(DataBase.Int_DF.at[2, 'Price'])
+    assert DataBase.Int_DF.at[2, 'D'] is pd.NaT
+    assert DataBase.Int_DF.at[3, 'Num'] == 30
+    #NULLが途中のチャンクにだけある場合も一括読み込みと同じになる
+    for chunk_size in (1, 2):
+        Chunked = DataBaseCtrl(path, table_name, False)
+        assert Chunked.UpdateInternalDataFrame(chunk_size=chunk_size)
+        assert list(Chunked.Int_DF.dtypes) == list(dtypes)
+        pd.testing.assert_frame_equal(Chunked.Int_DF, DataBase.Int_DF)
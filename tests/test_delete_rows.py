@@ -0,0 +1,43 @@
+"""DeleteRows()とUpdateDataBase()の削除（DELETE ... WHERE ID IN (...)）のテスト"""
+from DataBaseCtrl import DataBaseCtrl, DataRowState, Error
+
+
+def test_delete_rows_direct(db_path, table_name, fetch_rows):
+    """ダイレクトモードは1つのトランザクションで削除し、削除した行数を数える。（存在しないIDは数えない）"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.DeleteRows([1, 3, 99])
+    assert DataBase.SyncStats['rows'] == 3
+    assert DataBase.SyncStats['deleted_rows'] == 2
+    rows = fetch_rows(db_path)
+    assert sorted(rows) == [2, 4, 5, 6]
+    assert DataBase.SelectRowByID(1).empty
+    assert not(DataBase.DeleteRows([2], Del=False))
+    assert DataBase.err == Error.NOT_WORK_THIS_MODE
+
+def test_delete_rows_dataframe(db_path, table_name, fetch_rows):
+    """データフレームモードは行状態だけを変え、存在しないIDがある場合は何も変えない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert not(DataBase.DeleteRows([1, 99]))
+    assert DataBase.err == Error.NO_ROW_EXIST
+    assert DataBase.RowState_DF.at[1, 'RowState'] == DataRowState.NotChange
+    assert DataBase.DeleteRows([1, 2])
+    assert DataBase.RowState_DF.at[1, 'RowState'] == DataRowState.Deleted
+    assert DataBase.RowState_DF.at[2, 'RowState'] == DataRowState.Deleted
+    assert sorted(fetch_rows(db_path)) == [1, 2, 3, 4, 5, 6]
+    assert DataBase.UpdateDataBase()
+    assert DataBase.SyncStats['deleted_rows'] == 2
+    assert DataBase.SyncStats['batches'] == 1
+    assert sorted(fetch_rows(db_path)) == [3, 4, 5, 6]
+    assert sorted(DataBase.Int_DF.index) == [3, 4, 5, 6]
+
+def test_sync_delete_batches(db_path, table_name, fetch_rows):
+    """削除行はbatch_size毎のIN (...)で削除する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.DeleteRows([1, 2, 3, 4, 5])
+    assert DataBase.UpdateDataBase(batch_size=2)
+    assert DataBase.SyncStats['batches'] == 3
+    assert DataBase.SyncStats['deleted_rows'] == 5
+    assert DataBase.SyncStats['failed_ids'] == []
+    assert sorted(fetch_rows(db_path)) == [6]
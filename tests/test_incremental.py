@@ -0,0 +1,60 @@
+"""UpdateInternalDataFrame（差分更新モード）のテスト"""
+import pyodbc
+from DataBaseCtrl import DataBaseCtrl, DataRowState, Error
+
+
+def ExecuteOther(path:str, sql:str) -> None:
+    """別の接続からSQLを実行する。"""
+    conn = pyodbc.connect(f'DBQ={path}')
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+def test_incremental_reads_new_rows(db_path, table_name):
+    """IDを基準とした差分更新で、他から追加された行だけを読み込む。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.SetIncrementalMode(True, None, 0)
+    ExecuteOther(db_path, f"INSERT INTO {table_name} (ID, Name, Num) VALUES (7, 'new', 70)")
+    assert DataBase.UpdateInternalDataFrame()
+    assert len(DataBase.Int_DF) == 7
+    assert DataBase.Int_DF.at[7, 'Name'] == 'new'
+    assert DataBase.RowState_DF.at[7, 'RowState'] == DataRowState.NotChange
+    #全件読み込みと同じ内容になる
+    Full = DataBaseCtrl(db_path, table_name, False)
+    assert Full.UpdateInternalDataFrame()
+    assert DataBase.Int_DF.sort_index()[['Name', 'Num']].equals(Full.Int_DF.sort_index()[['Name', 'Num']])
+
+def test_incremental_keeps_local_changes(make_db, table_name):
+    """基準列で読み込んだ行のうち、未同期の変更がある行はローカルの内容を残す。"""
+    path = make_db('ID LONG PRIMARY KEY, Name VARCHAR(50), Ver LONG', [(1, 'a', 1), (2, 'b', 1)])
+    DataBase = DataBaseCtrl(path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.SetIncrementalMode(True, 'Ver', 0)
+    assert DataBase.UpdateRow(1, {'Name':'local'})
+    ExecuteOther(path, f"UPDATE {table_name} SET Name = 'remote', Ver = 2 WHERE ID IN (1, 2)")
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.Int_DF.at[1, 'Name'] == 'local'
+    assert DataBase.RowState_DF.at[1, 'RowState'] == DataRowState.Updated
+    assert DataBase.Int_DF.at[2, 'Name'] == 'remote'
+
+def test_incremental_reconciles_deleted_rows(db_path, table_name):
+    """ReconcileInterval回毎の照合で、データベースから削除された行を取り除く。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.SetIncrementalMode(True, None, 2)
+    ExecuteOther(db_path, f'DELETE FROM {table_name} WHERE ID = 3')
+    assert DataBase.UpdateInternalDataFrame()
+    assert 3 in DataBase.Int_DF.index
+    assert DataBase.UpdateInternalDataFrame()
+    assert not(3 in DataBase.Int_DF.index)
+    assert not(3 in DataBase.RowState_DF.index)
+
+def test_incremental_mode_validation(db_path, table_name):
+    """存在しない列や文字列の列は基準列にできない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert not(DataBase.SetIncrementalMode(True, 'Nothing'))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert not(DataBase.SetIncrementalMode(True, 'Name'))
+    assert DataBase.err == Error.DATA_TYPE_MISMATCH
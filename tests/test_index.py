@@ -0,0 +1,57 @@
+"""CreateIndex()（データフレームモードの検索インデックス）のテスト"""
+import pytest
+from DataBaseCtrl import DataBaseCtrl, Error, SerchCondition
+
+
+def SerchIDs(DataBase:DataBaseCtrl, SerchDict:dict, Serch_condition:SerchCondition, MultiSerch_Type:bool=True) -> list:
+    """検索結果のIDを並べて返す。"""
+    return sorted(DataBase.SerchRows(SerchDict, Serch_condition, MultiSerch_Type).index)
+
+serch_cases = [
+    ({'Name':'alice'}, SerchCondition.Exact),
+    ({'Name':'bo'}, SerchCondition.StartWith),
+    ({'Num':30}, SerchCondition.Exact),
+    ({'Num':30}, SerchCondition.SmallerThan),
+    ({'Num':30}, SerchCondition.OrSmallerThan),
+    ({'Num':30}, SerchCondition.LargerThan),
+    ({'Num':30}, SerchCondition.OrLargerThan),
+    ({'Name':'bo', 'Num':30}, SerchCondition.StartWith),
+]
+
+@pytest.fixture
+def db_pair(db_path, table_name):
+    """インデックス無し・有り（Name, Num）のDataBaseCtrlを返す。"""
+    Scan = DataBaseCtrl(db_path, table_name, False)
+    assert Scan.UpdateInternalDataFrame()
+    Indexed = DataBaseCtrl(db_path, table_name, False)
+    assert Indexed.UpdateInternalDataFrame()
+    assert Indexed.CreateIndex('Name')
+    assert Indexed.CreateIndex('Num')
+    return Scan, Indexed
+
+@pytest.mark.parametrize('SerchDict,Serch_condition', serch_cases)
+def test_index_matches_scan(db_pair, SerchDict, Serch_condition):
+    """インデックスを使った検索は列全体を走査した検索と同じ結果になる。"""
+    Scan, Indexed = db_pair
+    for MultiSerch_Type in (True, False):
+        assert SerchIDs(Indexed, SerchDict, Serch_condition, MultiSerch_Type) == SerchIDs(Scan, SerchDict, Serch_condition, MultiSerch_Type)
+
+def test_index_follows_changes(db_pair):
+    """UpdateRow/AddRowの後もインデックスの検索結果は走査と同じになる。"""
+    Scan, Indexed = db_pair
+    for DataBase in (Scan, Indexed):
+        assert DataBase.UpdateRow(1, {'Name':'bob', 'Num':35})
+        assert DataBase.AddRow({'Name':'Bo', 'Num':5}, 7)
+    for SerchDict,Serch_condition in serch_cases:
+        assert SerchIDs(Indexed, SerchDict, Serch_condition) == SerchIDs(Scan, SerchDict, Serch_condition)
+    assert SerchIDs(Indexed, {'Name':'alice'}, SerchCondition.Exact) == SerchIDs(Scan, {'Name':'alice'}, SerchCondition.Exact)
+
+def test_index_create_and_drop(db_path, table_name):
+    """存在しない列にはインデックスを作れず、作っていない列は削除できない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert not(DataBase.CreateIndex('Nothing'))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert DataBase.CreateIndex('Num')
+    assert DataBase.DropIndex('Num')
+    assert not(DataBase.DropIndex('Num'))
@@ -0,0 +1,55 @@
+"""SetInstrumentation()（メソッド毎の計測）のテスト"""
+from DataBaseCtrl import DataBaseCtrl
+
+
+def test_instrumentation_counts(db_path, table_name):
+    """公開メソッド毎に呼び出し数・SQL数・取得行数を数え、入れ子の呼び出しは外側に含める。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    calls = []
+    assert DataBase.SetInstrumentation(True, lambda name, rec: calls.append((name, rec['statements'])))
+    for ID in (1, 2):
+        assert len(DataBase.SelectRowByID(ID)) == 1
+    assert DataBase.UpdateRows({1:{'Num':100}, 2:{'Num':200}, 3:{'Num':300}})
+    assert DataBase.UpdateRow(4, {'Name':'changed'})
+    methods = DataBase.InstrumentStats['methods']
+    assert methods['SelectRowByID']['calls'] == 2
+    assert methods['SelectRowByID']['statements'] == 2
+    assert methods['SelectRowByID']['rows_fetched'] == 2
+    assert methods['SelectRowByID']['sql_bytes'] > 0
+    assert methods['UpdateRows']['statements'] == 3 #executemanyはパラメータ行数
+    assert methods['UpdateRow']['calls'] == 1 #UpdateRow内のSelectRowByIDはUpdateRowに含める
+    assert methods['UpdateRow']['statements'] == 2
+    assert methods['SelectRowByID']['calls'] == 2
+    assert [name for name,_ in calls] == ['SelectRowByID', 'SelectRowByID', 'UpdateRows', 'UpdateRow']
+    total = DataBase.InstrumentStats['total']
+    assert total['calls'] == 4
+    assert total['seconds'] >= total['execute_seconds'] > 0
+    DataBase.Instrument.Reset()
+    assert DataBase.InstrumentStats['total']['calls'] == 0
+
+def test_instrumentation_dataframe_mode_and_disable(db_path, table_name):
+    """読み込みの取得行数・変換時間を数え、Callbackの例外は操作を失敗させない。無効にすると数えない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    def Callback(name, rec):
+        raise RuntimeError('callback')
+    assert DataBase.SetInstrumentation(True, Callback)
+    assert DataBase.UpdateInternalDataFrame()
+    rec = DataBase.InstrumentStats['methods']['UpdateInternalDataFrame']
+    assert rec['rows_fetched'] == 6
+    assert rec['decode_seconds'] > 0
+    assert DataBase.InstrumentStats['callback_errors'] == 1
+    assert DataBase.SetInstrumentation(False)
+    assert DataBase.Instrument == None
+    assert DataBase.UpdateInternalDataFrame()
+
+def test_instrumentation_reader_writer_mode(db_path, table_name):
+    """読み込み共有モードのスレッド毎の接続・分割読み込みのカーソルも数える。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.SetReaderWriterMode(True)
+    assert DataBase.SetInstrumentation(True)
+    assert len(DataBase.SelectRowByID(1)) == 1
+    assert sum(len(df) for df in DataBase.ReadByChunks(4)) == 6
+    methods = DataBase.InstrumentStats['methods']
+    assert methods['SelectRowByID']['statements'] == 1
+    assert methods['SelectRowByID']['rows_fetched'] == 1
+    assert methods['ReadByChunks']['rows_fetched'] == 6
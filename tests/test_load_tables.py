@@ -0,0 +1,59 @@
+"""LoadTables()（複数のテーブルの並列読み込み）のテスト"""
+import threading
+
+import pyodbc
+import pytest
+import DataBaseCtrl as dbc
+from DataBaseCtrl import Error, LoadTables
+
+
+def AddTable(path:str, table_name:str, rows:int) -> None:
+    """別のテーブルを作る。"""
+    conn = pyodbc.connect(f'DBQ={path}')
+    conn.execute(f'CREATE TABLE {table_name} (ID LONG PRIMARY KEY, Num LONG)')
+    conn.cursor().executemany(f'INSERT INTO {table_name} VALUES (?, ?)', [(i, i) for i in range(1, rows + 1)])
+    conn.commit()
+    conn.close()
+
+def test_load_tables(db_path, table_name):
+    """テーブル毎に読み込み、読み込めなかったテーブルはerrだけを残す。"""
+    AddTable(db_path, 'U', 3)
+    tables, timings = LoadTables(db_path, [table_name, 'U', 'Nothing'], MaxWorkers=3)
+    assert sorted(tables) == [table_name, 'U']
+    assert len(tables['U'].Int_DF) == 3
+    assert timings[table_name]['rows'] == 6
+    assert timings['U']['err'] == Error.NO_ERR
+    assert timings['Nothing']['err'] == Error.SQL_EXECUTE_ERR
+    for ctrl in tables.values():
+        ctrl.Close()
+    with pytest.raises(ValueError):
+        LoadTables(db_path, [table_name], MaxWorkers=0)
+
+def test_load_tables_closes_on_exception(db_path, table_name, monkeypatch):
+    """pyodbc.Error以外の例外は、作った全てのインスタンスを閉じてから伝える。"""
+    AddTable(db_path, 'U', 3)
+    created = []
+    closed = []
+    guard = threading.Lock()
+    original_init = dbc.DataBaseCtrl.__init__
+    original_update = dbc.DataBaseCtrl.UpdateInternalDataFrame
+    original_close = dbc.DataBaseCtrl.Close
+    def Init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        with guard:
+            created.append(self)
+    def Update(self, *args, **kwargs):
+        if(self.TableName == 'U'):
+            raise MemoryError('load failed')
+        return original_update(self, *args, **kwargs)
+    def Close(self):
+        with guard:
+            closed.append(self)
+        return original_close(self)
+    monkeypatch.setattr(dbc.DataBaseCtrl, '__init__', Init)
+    monkeypatch.setattr(dbc.DataBaseCtrl, 'UpdateInternalDataFrame', Update)
+    monkeypatch.setattr(dbc.DataBaseCtrl, 'Close', Close)
+    with pytest.raises(MemoryError):
+        LoadTables(db_path, ['U', table_name], MaxWorkers=2)
+    assert len(created) == 2
+    assert all(ctrl in closed for ctrl in created)
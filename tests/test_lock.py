@@ -0,0 +1,79 @@
+"""DataBaseLock、SetReaderWriterMode()（排他制御）のテスト"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from DataBaseCtrl import DataBaseCtrl, DataBaseLock
+
+
+def test_lock_readers_share_writer_excludes():
+    """読み込み共有モードでは読み込み同士が同時に入り、書き込みは単独で入る。"""
+    Lock = DataBaseLock(True)
+    inside = {'read':0, 'write':0, 'max_read':0, 'overlap':False}
+    guard = threading.Lock()
+    def Reader() -> None:
+        with Lock.Read():
+            with guard:
+                inside['read'] += 1
+                inside['max_read'] = max(inside['max_read'], inside['read'])
+                inside['overlap'] |= inside['write'] > 0
+            time.sleep(0.05)
+            with guard:
+                inside['read'] -= 1
+    def Writer() -> None:
+        with Lock.Write():
+            with guard:
+                inside['write'] += 1
+                inside['overlap'] |= inside['read'] > 0 or inside['write'] > 1
+            time.sleep(0.02)
+            with guard:
+                inside['write'] -= 1
+    threads = [threading.Thread(target=Reader) for _ in range(4)] + [threading.Thread(target=Writer) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert inside['max_read'] > 1
+    assert not(inside['overlap'])
+    assert Lock.Stats['read_acquires'] == 4 and Lock.Stats['write_acquires'] == 2
+    assert not(Lock.busy)
+
+def test_lock_exclusive_by_default():
+    """通常は読み込みも排他で、例外でも解放される。"""
+    Lock = DataBaseLock()
+    try:
+        with Lock.Read():
+            assert Lock.busy
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+    assert not(Lock.busy)
+    order = []
+    def Reader(n:int) -> None:
+        with Lock.Read():
+            order.append(('in', n))
+            time.sleep(0.02)
+            order.append(('out', n))
+    with ThreadPoolExecutor(3) as executor:
+        list(executor.map(Reader, range(3)))
+    assert all(order[i][1] == order[i + 1][1] for i in range(0, len(order), 2)) #入った順に出る
+    assert Lock.Stats['waits'] > 0
+
+def test_reader_writer_threads_read_same_rows(db_path, table_name):
+    """読み込み共有モードで複数スレッドから検索・分割読み込みをしても結果が変わらない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.SetReaderWriterMode(True)
+    expected = DataBase.SelectRowByID('*')
+    def Work(n:int) -> bool:
+        if(n % 2 == 0):
+            chunk_ids = [ID for chunk_df in DataBase.ReadByChunks(2) for ID in chunk_df.index]
+            return chunk_ids == list(expected.index)
+        return DataBase.SelectRowByID('*')['Name'].equals(expected['Name'])
+    with ThreadPoolExecutor(4) as executor:
+        assert all(executor.map(Work, range(32)))
+    assert DataBase.LockStats['read_acquires'] > 32
+    #書き込みは共有の接続で行い、スレッド毎の接続から読める
+    assert DataBase.UpdateRow(6, {'Num':600})
+    with ThreadPoolExecutor(2) as executor:
+        assert list(executor.map(lambda ID: DataBase.SelectRowByID(ID).at[ID, 'Num'], [6, 6])) == [600, 600]
+    assert DataBase.LockStats['write_acquires'] > 0
+    DataBase.Close()
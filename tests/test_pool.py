@@ -0,0 +1,64 @@
+"""ConnectionPool（プロセス内で共有する接続プール）のテスト"""
+import threading
+import pytest
+import DataBaseCtrl as dbc
+from DataBaseCtrl import DataBaseCtrl
+
+
+def test_pool_reuses_connection(db_path, table_name):
+    """Close()で返した接続を次のインスタンスが使いまわす。"""
+    pool = dbc.connection_pool
+    before = dict(pool.Stats)
+    for _ in range(3):
+        with DataBaseCtrl(db_path, table_name, True) as DataBase:
+            assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'Alice'
+            assert pool.InUse(db_path) == 1
+    assert pool.InUse(db_path) == 0
+    assert pool.Stats['connects'] - before['connects'] == 1
+    assert pool.Stats['reuses'] - before['reuses'] == 2
+
+def test_pool_max_open(db_path):
+    """MaxOpenに達するとAcquireは待ち、AcquireTimeoutでTimeoutErrorになる。"""
+    pool = dbc.ConnectionPool(MaxIdle=1, MaxOpen=1, AcquireTimeout=0.05)
+    conn = pool.Acquire(db_path, f'DBQ={db_path}')
+    with pytest.raises(TimeoutError):
+        pool.Acquire(db_path, f'DBQ={db_path}')
+    assert pool.Stats['wait_timeouts'] == 1
+    #他のスレッドが返すまで待つ
+    timer = threading.Timer(0.05, pool.Release, (db_path, conn))
+    timer.start()
+    pool.AcquireTimeout = 5.0
+    conn = pool.Acquire(db_path, f'DBQ={db_path}')
+    timer.join()
+    assert pool.Stats['waits'] == 2
+    assert pool.Stats['reuses'] == 1
+    assert pool.InUse(db_path) == 1
+    pool.Release(db_path, conn)
+    assert pool.InUse(db_path) == 0
+    pool.Clear()
+
+def test_pool_closes_idle(db_path):
+    """IdleTimeoutを過ぎた接続は次のAcquireでプールから取り出して閉じる。"""
+    pool = dbc.ConnectionPool(MaxIdle=2, IdleTimeout=0.0)
+    conn = pool.Acquire(db_path, f'DBQ={db_path}')
+    pool.Release(db_path, conn)
+    conn = pool.Acquire(db_path, f'DBQ={db_path}')
+    assert pool.Stats['idle_closed'] == 1
+    assert pool.Stats['connects'] == 2
+    pool.Release(db_path, conn)
+    pool.Clear()
+
+def test_pool_discards_and_health_check(db_path):
+    """MaxIdleを超えて返された接続は閉じ、使えない接続は貸し出さない。"""
+    pool = dbc.ConnectionPool(MaxIdle=1)
+    conn_list = [pool.Acquire(db_path, f'DBQ={db_path}') for _ in range(2)]
+    for conn in conn_list:
+        pool.Release(db_path, conn)
+    assert pool.Stats['discarded'] == 1
+    pool.HealthCheckSQL = 'SELECT * FROM NoTable;' #保持している接続が使えない
+    conn = pool.Acquire(db_path, f'DBQ={db_path}')
+    assert pool.Stats['health_failures'] == 1
+    assert pool.Stats['connects'] == 3
+    assert not(conn is conn_list[0])
+    pool.Release(db_path, conn)
+    pool.Clear()
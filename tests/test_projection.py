@@ -0,0 +1,80 @@
+"""columns（列の射影）とlazy_large_objects（大きなデータの列を読み込まない）のテスト"""
+import pandas as pd
+import pyodbc
+import pytest
+from DataBaseCtrl import DataBaseCtrl, Error, SerchCondition, SerchQuery
+
+
+@pytest.fixture
+def memo_db(make_db) -> str:
+    """MEMOの列(Note)を持つテーブルを作る。"""
+    return make_db('ID LONG PRIMARY KEY, Name VARCHAR(50), Num LONG, Note MEMO',
+                   [(i, f'n{i}', i * 10, 'x' * 100 * i) for i in range(1, 6)])
+
+def test_lazy_large_objects(memo_db, table_name):
+    """MEMOの列は読み込まず、columnsに指定した場合だけIDでデータベースから読み込む。"""
+    DataBase = DataBaseCtrl(memo_db, table_name, False)
+    assert DataBase.UpdateInternalDataFrame(lazy_large_objects=True)
+    assert DataBase.LazyColumns == ['Note']
+    assert list(DataBase.Int_DF.columns) == ['Name', 'Num']
+    df = DataBase.SelectRowByID(2, columns=['Note', 'Name'])
+    assert list(df.columns) == ['Note', 'Name']
+    assert df.at[2, 'Note'] == 'x' * 200
+    df = DataBase.SerchRows({'Num':30}, SerchCondition.OrLargerThan, columns=['Note'])
+    assert list(df.index) == [3, 4, 5]
+    assert df.at[5, 'Note'] == 'x' * 500
+    df = DataBase.SerchRowsByQuery(SerchQuery.In('Name', ['n1', 'n4']), columns=['Num', 'Note'])
+    assert list(df.columns) == ['Num', 'Note']
+    assert df.at[4, 'Note'] == 'x' * 400
+
+def test_lazy_columns_cannot_be_searched_or_written(memo_db, table_name):
+    """読み込んでいない列は検索・変更に使えない（INVALID_COLUMN_NAME）。"""
+    DataBase = DataBaseCtrl(memo_db, table_name, False)
+    assert DataBase.UpdateInternalDataFrame(lazy_large_objects=True)
+    assert DataBase.SerchRowsByQuery(SerchQuery.Where('Note', SerchCondition.Exact, 'x')).empty
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert not(DataBase.UpdateRow(1, {'Note':'y'}))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert not(DataBase.UpdateRows({1:{'Name':'a'}, 2:{'Note':'y'}}))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert DataBase.Int_DF.at[1, 'Name'] == 'n1'
+    assert not(DataBase.AddRow({'Name':'new', 'Note':'y'}))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert DataBase.SelectRowByID(1, columns=['Nothing']).empty
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+
+def test_loaded_columns_are_kept(memo_db, table_name):
+    """差分更新とUpdateDataBase()後の読み直しは前回と同じ列で行う。"""
+    DataBase = DataBaseCtrl(memo_db, table_name, False)
+    assert DataBase.UpdateInternalDataFrame(columns=['Num'])
+    assert DataBase.LazyColumns == ['Name', 'Note']
+    assert DataBase.UpdateRow(1, {'Num':100})
+    assert DataBase.UpdateDataBase()
+    assert list(DataBase.Int_DF.columns) == ['Num']
+    assert DataBase.Int_DF.at[1, 'Num'] == 100
+    assert DataBase.SetIncrementalMode(True, None, 0)
+    conn = pyodbc.connect(f'DBQ={memo_db}')
+    conn.execute(f"INSERT INTO {table_name} (ID, Name, Num, Note) VALUES (6, 'n6', 60, 'y')")
+    conn.commit()
+    conn.close()
+    assert DataBase.UpdateInternalDataFrame()
+    assert list(DataBase.Int_DF.columns) == ['Num']
+    assert DataBase.Int_DF.at[6, 'Num'] == 60
+
+def test_direct_mode_projection(memo_db, table_name):
+    """ダイレクトモードは指定の列だけSELECTし、データフレームモードと同じ結果になる。"""
+    Direct = DataBaseCtrl(memo_db, table_name, True)
+    Frame = DataBaseCtrl(memo_db, table_name, False)
+    assert Frame.UpdateInternalDataFrame()
+    df = Direct.SelectRowByID(3, columns=['Name'])
+    assert list(df.columns) == ['Name']
+    assert df.at[3, 'Name'] == 'n3'
+    query = SerchQuery.Range('Num', 20, 50) & SerchQuery.Where('Name', SerchCondition.StartWith, 'N')
+    direct_df = Direct.SerchRowsByQuery(query, columns=['Num'])
+    frame_df = Frame.SerchRowsByQuery(query, columns=['Num'])
+    assert list(direct_df.columns) == ['Num']
+    assert list(direct_df.index) == list(frame_df.index) == [2, 3, 4]
+    assert direct_df['Num'].tolist() == frame_df['Num'].tolist()
+    ext_df = pd.DataFrame({'Name':['a'], 'Num':[1]}, index=pd.Index([1], name='ID'))
+    assert Frame.SerchRowsByQuery(SerchQuery.In('Num', [1]), ext_df, columns=['Note']).empty
+    assert Frame.err == Error.INVALID_COLUMN_NAME
@@ -0,0 +1,47 @@
+"""SerchQuery、SerchRowsByQuery()（複数条件の検索）のテスト"""
+from datetime import date
+import pytest
+from DataBaseCtrl import DataBaseCtrl, Error, SerchCondition, SerchQuery
+
+
+query_cases = [
+    SerchQuery.Where('Name', SerchCondition.Exact, 'ALICE'),
+    SerchQuery.Where('Name', SerchCondition.StartWith, 'Bo'),
+    SerchQuery.Where('Name', SerchCondition.EndWith, 'E'),
+    SerchQuery.Where('Name', SerchCondition.Contains, "'"),
+    SerchQuery.In('Name', ['alice', 'bob']),
+    SerchQuery.In('ID', [2, 4, 99]),
+    SerchQuery.Range('Num', 20, 50),
+    SerchQuery.Range('Num', 20, 50, False, True),
+    SerchQuery.Where('D', SerchCondition.OrLargerThan, date(2024, 1, 3)),
+    SerchQuery.Where('D', SerchCondition.Exact, date(2024, 1, 2)),
+    SerchQuery.And(SerchQuery.Range('Num', 10, 60), SerchQuery.Where('Name', SerchCondition.StartWith, 'a')),
+    SerchQuery.Where('Num', SerchCondition.SmallerThan, 20) | SerchQuery.Or(SerchQuery.In('Name', ['bobby']), SerchQuery.Where('Num', SerchCondition.LargerThan, 50)),
+]
+
+@pytest.mark.parametrize('Query', query_cases)
+def test_query_dataframe_matches_direct(db_path, table_name, Query):
+    """データフレームモードの検索はダイレクトモード(SQLのWHERE句)と同じ行を返す。"""
+    Direct = DataBaseCtrl(db_path, table_name, True)
+    direct_ids = sorted(Direct.SerchRowsByQuery(Query).index)
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert sorted(DataBase.SerchRowsByQuery(Query).index) == direct_ids
+
+def test_query_results(db_path, table_name):
+    """文字列は大文字小文字を区別せず、NULLは不一致になる。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert sorted(DataBase.SerchRowsByQuery(SerchQuery.Where('Name', SerchCondition.Exact, 'ALICE')).index) == [1, 2]
+    assert sorted(DataBase.SerchRowsByQuery(SerchQuery.Where('Name', SerchCondition.Contains, 'o')).index) == [3, 4, 6]
+    #日付は0時の日時として比較する
+    assert list(DataBase.SerchRowsByQuery(SerchQuery.Where('D', SerchCondition.Exact, date(2024, 1, 2))).index) == [2]
+    assert sorted(DataBase.SerchRowsByQuery(SerchQuery.Where('D', SerchCondition.SmallerThan, date(2024, 1, 2))).index) == [1]
+
+def test_query_validation(db_path, table_name):
+    """存在しない列、列の型と合わない値はエラーになる。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.SerchRowsByQuery(SerchQuery.Where('Nothing', SerchCondition.Exact, 1)).empty
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert DataBase.SerchRowsByQuery(SerchQuery.Where('Num', SerchCondition.Exact, 'x')).empty
+    assert DataBase.err == Error.DATA_TYPE_MISMATCH
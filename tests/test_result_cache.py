@@ -0,0 +1,61 @@
+"""SetResultCache()（ダイレクトモードの検索結果キャッシュ）のテスト"""
+import time
+import pyodbc
+from DataBaseCtrl import DataBaseCtrl, Error, SerchCondition, SerchQuery
+
+
+def UpdateOther(path:str, table_name:str, ID:int, Name:str) -> None:
+    """別の接続から行のNameを書き換える。"""
+    conn = pyodbc.connect(f'DBQ={path}')
+    conn.execute(f'UPDATE {table_name} SET Name = ? WHERE ID = ?', Name, ID)
+    conn.commit()
+    conn.close()
+
+def test_cache_hit_and_write_invalidation(db_path, table_name):
+    """同じ検索はキャッシュから返し、このインスタンスからの書き込みで破棄する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.SetResultCache(8, 60.0)
+    assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'Alice'
+    UpdateOther(db_path, table_name, 1, 'other')
+    #他の接続からの書き込みは有効時間内は反映されない
+    assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'Alice'
+    assert DataBase.CacheStats['hits'] == 1 and DataBase.CacheStats['misses'] == 1
+    #キャッシュのコピーを変更してもキャッシュは変わらない
+    DataBase.SelectRowByID(1).at[1, 'Name'] = 'x'
+    assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'Alice'
+    assert DataBase.UpdateRow(2, {'Num':200})
+    assert DataBase.CacheStats['invalidations'] > 0
+    assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'other'
+    assert DataBase.SelectRowByID(2).at[2, 'Num'] == 200
+
+def test_cache_query_params_and_eviction(db_path, table_name):
+    """パラメータが違う検索は別のキャッシュになり、最大件数を超えると古いものから破棄する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.SetResultCache(1, 60.0)
+    assert list(DataBase.SerchRowsByQuery(SerchQuery.In('ID', [1])).index) == [1]
+    assert list(DataBase.SerchRowsByQuery(SerchQuery.In('ID', [2])).index) == [2]
+    assert DataBase.CacheStats['evictions'] == 1
+    assert list(DataBase.SerchRowsByQuery(SerchQuery.In('ID', [1])).index) == [1]
+    assert DataBase.CacheStats['hits'] == 0 and DataBase.CacheStats['misses'] == 3
+    assert sorted(DataBase.SerchRows({'Name':'bo'}, SerchCondition.StartWith).index) == [3, 4]
+    assert sorted(DataBase.SerchRows({'Name':'bo'}, SerchCondition.StartWith).index) == [3, 4]
+    assert DataBase.CacheStats['hits'] == 1
+
+def test_cache_ttl(db_path, table_name):
+    """有効時間が過ぎたキャッシュは使わない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.SetResultCache(8, 0.05)
+    assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'Alice'
+    UpdateOther(db_path, table_name, 1, 'other')
+    time.sleep(0.1)
+    assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'other'
+    assert DataBase.CacheStats['hits'] == 0
+
+def test_cache_settings(db_path, table_name):
+    """データフレームモードでは使えず、不正な設定は失敗する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert not(DataBase.SetResultCache())
+    assert DataBase.err == Error.NOT_WORK_THIS_MODE
+    Direct = DataBaseCtrl(db_path, table_name, True)
+    assert not(Direct.SetResultCache(-1))
+    assert Direct.err == Error.INVALID_INPUT
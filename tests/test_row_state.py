@@ -0,0 +1,50 @@
+"""行状態（int8のRowStateと変更IDの集合）のテスト"""
+import numpy as np
+from DataBaseCtrl import DataBaseCtrl, DataRowState, Error
+
+
+def test_row_state_tracks_changes(db_path, table_name):
+    """UpdateRow/AddRow/DeleteRowで行状態と変更IDの集合が揃って更新される。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.RowState.dtype == np.int8
+    assert len(DataBase.RowState) == len(DataBase.Int_DF)
+    assert DataBase.UpdateRow(1, {'Name':'changed'})
+    assert DataBase.AddRow({'Name':'new', 'Num':70}, 7)
+    assert DataBase.DeleteRow(3)
+    assert DataBase.UpdatedIDs == {1}
+    assert DataBase.AddedIDs == {7}
+    assert DataBase.DeletedIDs == {3}
+    assert len(DataBase.RowState) == len(DataBase.Int_DF)
+    state_ser = DataBase.RowState_DF['RowState']
+    assert state_ser[1] == DataRowState.Updated
+    assert state_ser[7] == DataRowState.Added
+    assert state_ser[3] == DataRowState.Deleted
+    assert state_ser[2] == DataRowState.NotChange
+    #削除行はコピーに含めない
+    assert list(DataBase.GetCopyInternalDataFrame().index) == [1, 2, 4, 5, 6, 7]
+
+def test_row_state_undelete_and_missing_row(db_path, table_name):
+    """削除の取り消しで元の行状態に戻り、無い行の更新・削除は失敗する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.DeleteRow(2)
+    assert DataBase.DeleteRow(2, False)
+    assert DataBase.DeletedIDs == set()
+    assert DataBase.RowState_DF.at[2, 'RowState'] == DataRowState.NotChange
+    assert not(DataBase.UpdateRow(99, {'Name':'x'}))
+    assert DataBase.err == Error.NO_ROW_EXIST
+    assert not(DataBase.DeleteRow(99))
+    assert DataBase.err == Error.NO_ROW_EXIST
+
+def test_row_state_cleared_after_sync(db_path, table_name):
+    """同期後は変更IDの集合が空になる。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.UpdateRow(1, {'Name':'changed'})
+    assert DataBase.AddRow({'Name':'new', 'Num':70}, 7)
+    assert DataBase.DeleteRow(3)
+    assert DataBase.UpdateDataBase(reload=False)
+    assert DataBase.UpdatedIDs == set() and DataBase.AddedIDs == set() and DataBase.DeletedIDs == set()
+    assert (DataBase.RowState == DataRowState.NotChange.value).all()
+    assert len(DataBase.RowState) == len(DataBase.Int_DF) == 6
@@ -0,0 +1,60 @@
+"""schema_cache（列情報キャッシュ）、LazyConnect（遅延接続）のテスト"""
+import json
+import pyodbc
+import DataBaseCtrl as dbc
+from DataBaseCtrl import AccessDataType, DataBaseCtrl
+
+
+def test_schema_cache_hit_and_lazy_connect(db_path, table_name):
+    """2つ目以降のインスタンスは列情報をキャッシュから取得し、LazyConnectでは最初に使うまで接続しない。"""
+    First = DataBaseCtrl(db_path, table_name, True)
+    assert dbc.schema_cache.Stats['misses'] > 0
+    hits = dbc.schema_cache.Stats['hits']
+    First.Close()
+    Lazy = DataBaseCtrl(db_path, table_name, True, LazyConnect=True)
+    assert dbc.schema_cache.Stats['hits'] == hits + 1
+    assert list(Lazy.ColumnCatalog) == ['ID', 'Name', 'Num', 'D']
+    assert dbc.connection_pool.InUse(db_path) == 0
+    assert Lazy.SelectRowByID(1).at[1, 'Name'] == 'Alice'
+    assert dbc.connection_pool.InUse(db_path) == 1
+    Lazy.Close()
+
+def test_schema_cache_survives_writes(db_path, table_name):
+    """行の書き込みでファイルが更新されても列情報のキャッシュは使う。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.UpdateRow(1, {'Num':100})
+    DataBase.Close()
+    hits = dbc.schema_cache.Stats['hits']
+    Other = DataBaseCtrl(db_path, table_name, True)
+    assert dbc.schema_cache.Stats['hits'] == hits + 1
+    Other.Close()
+
+def test_schema_cache_refresh_on_column_change(db_path, table_name):
+    """列の追加・削除では列情報を取り直し、他のプログラムでの変更はRemove()で無効化する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.AddColumn_DataBase('Note', AccessDataType.VARCHAR, [20])
+    assert 'Note' in DataBase.ColumnCatalog
+    assert 'Note' in DataBaseCtrl(db_path, table_name, True).ColumnCatalog
+    assert DataBase.DeleteColumn_DataBase('Note')
+    assert not('Note' in DataBaseCtrl(db_path, table_name, True).ColumnCatalog)
+    #他のプログラムで列を追加した
+    conn = pyodbc.connect(f'DBQ={db_path}')
+    conn.execute(f'ALTER TABLE {table_name} ADD COLUMN Extra LONG')
+    conn.commit()
+    conn.close()
+    assert not('Extra' in DataBaseCtrl(db_path, table_name, True).ColumnCatalog)
+    dbc.schema_cache.Remove(db_path, table_name)
+    assert 'Extra' in DataBaseCtrl(db_path, table_name, True).ColumnCatalog
+
+def test_schema_cache_persist(db_path, table_name, tmp_path):
+    """列情報をJSONファイルに保存し、新しいキャッシュで読み込める。"""
+    json_path = str(tmp_path / 'schema_cache.json')
+    cache = dbc.SchemaCache(json_path)
+    cache.Put(db_path, table_name, [('c', None, table_name, 'ID', 4, 'LONG')])
+    with open(json_path, 'r', encoding='utf-8') as f:
+        entry_list = json.load(f)
+    assert len(entry_list) == 1 and not('mtime' in entry_list[0])
+    loaded = dbc.SchemaCache(json_path)
+    assert loaded.Get(db_path, table_name) == [('c', None, table_name, 'ID', 4, 'LONG')]
+    assert loaded.Get(db_path, 'Other') == None
+    assert loaded.Stats == {'hits':1, 'misses':1}
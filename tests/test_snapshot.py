@@ -0,0 +1,62 @@
+"""SaveSnapshot()・LoadSnapshot()（内部データフレームのスナップショット）のテスト"""
+import os
+
+import pyodbc
+from DataBaseCtrl import DataBaseCtrl, DataRowState, Error
+
+
+def ExecuteOther(path:str, sql:str) -> None:
+    """別の接続からSQLを実行し、データベースファイルの更新日時を進める。"""
+    conn = pyodbc.connect(f'DBQ={path}')
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+    mtime = os.path.getmtime(path)
+    os.utime(path, (mtime + 10, mtime + 10))
+
+def test_snapshot_round_trip(db_path, table_name, tmp_path, monkeypatch):
+    """保存した内部データフレームと行状態をそのまま読み込み、データベースが変わっていなければ問い合わせない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.UpdateRow(1, {'Name':'changed'})
+    assert DataBase.SaveSnapshot(str(tmp_path / 'snap'))
+    Loaded = DataBaseCtrl(db_path, table_name, False)
+    def NoQuery(*args, **kwargs):
+        raise AssertionError('database was queried')
+    monkeypatch.setattr(Loaded, '_DataBaseCtrl__IncrementalUpdate', NoQuery)
+    monkeypatch.setattr(Loaded, 'UpdateInternalDataFrame', NoQuery)
+    assert Loaded.LoadSnapshot(str(tmp_path / 'snap'))
+    assert Loaded.Int_DF.equals(DataBase.Int_DF)
+    assert Loaded.Int_DF.dtypes.equals(DataBase.Int_DF.dtypes)
+    assert Loaded.RowState_DF.at[1, 'RowState'] == DataRowState.Updated
+    assert Loaded.UpdatedIDs == {1}
+
+def test_snapshot_catch_up(db_path, table_name, tmp_path):
+    """保存後に追加・削除された行を照合と差分更新で反映する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.SaveSnapshot(str(tmp_path / 'snap'))
+    ExecuteOther(db_path, f"INSERT INTO {table_name} (ID, Name, Num) VALUES (7, 'new', 70)")
+    ExecuteOther(db_path, f"DELETE FROM {table_name} WHERE ID = 2")
+    Loaded = DataBaseCtrl(db_path, table_name, False)
+    assert Loaded.LoadSnapshot(str(tmp_path / 'snap'))
+    assert sorted(Loaded.Int_DF.index) == [1, 3, 4, 5, 6, 7]
+    assert Loaded.Int_DF.at[7, 'Name'] == 'new'
+    Stale = DataBaseCtrl(db_path, table_name, False)
+    assert Stale.LoadSnapshot(str(tmp_path / 'snap'), catch_up=False)
+    assert sorted(Stale.Int_DF.index) == [1, 2, 3, 4, 5, 6]
+
+def test_snapshot_mismatch(db_path, make_db, table_name, tmp_path):
+    """別のテーブル・列構成のスナップショットは読み込まない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.SaveSnapshot(str(tmp_path / 'snap'))
+    other_path = make_db('ID LONG PRIMARY KEY, Name VARCHAR(50)', [(1, 'a')], 'other.accdb')
+    Other = DataBaseCtrl(other_path, table_name, False)
+    assert not(Other.LoadSnapshot(str(tmp_path / 'snap')))
+    assert Other.err == Error.SNAPSHOT_MISMATCH
+    assert not(Other.LoadSnapshot(str(tmp_path / 'nothing')))
+    assert Other.err == Error.SNAPSHOT_MISMATCH
+    Direct = DataBaseCtrl(db_path, table_name, True)
+    assert not(Direct.LoadSnapshot(str(tmp_path / 'snap')))
+    assert Direct.err == Error.NOT_WORK_THIS_MODE
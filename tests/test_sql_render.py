@@ -0,0 +1,40 @@
+"""列毎にまとめたINSERT/UPDATEのSQLリテラル生成のテスト"""
+from datetime import datetime
+
+import pandas as pd
+from DataBaseCtrl import DataBaseCtrl
+
+columns_sql = 'ID LONG PRIMARY KEY, Name VARCHAR(50), Num LONG, Val DOUBLE, D DATETIME, Flag YESNO'
+"""全ての種類のリテラルを使うテーブルの列定義"""
+
+
+def test_add_rows_by_dataframe(make_db, table_name):
+    """複数行のデータフレームを行毎のINSERTにして書き込む。"""
+    path = make_db(columns_sql, [])
+    DataBase = DataBaseCtrl(path, table_name, True)
+    df = pd.DataFrame({'Name':["it's", 'b', 'c'], 'Num':[1, 2, 3], 'Val':[0.5, 1.5, -2.0],
+                       'D':[datetime(2024, 1, 2, 3, 4, 5), datetime(2024, 2, 29), datetime(2024, 12, 31)], 'Flag':[True, False, True]},
+                      index=pd.Index([1, 2, 3], name='ID'))
+    assert DataBase.AddRowByDataFrame(df)
+    res = DataBase.SelectRowByID(1)
+    assert res.at[1, 'Name'] == "it's"
+    assert res.at[1, 'Val'] == 0.5
+    assert res.at[1, 'D'] == datetime(2024, 1, 2, 3, 4, 5)
+    assert bool(res.at[1, 'Flag'])
+    res = DataBase.SelectRowByID(2)
+    assert res.at[2, 'Num'] == 2
+    assert res.at[2, 'D'] == datetime(2024, 2, 29)
+    assert not(bool(res.at[2, 'Flag']))
+    assert DataBase.SelectRowByID(3).at[3, 'Val'] == -2.0
+
+def test_update_row_literals(make_db, table_name):
+    """UPDATEの値も列の型毎のリテラルで書き込む。"""
+    path = make_db(columns_sql, [(1, 'a', 1, 0.0, datetime(2024, 1, 1), False)])
+    DataBase = DataBaseCtrl(path, table_name, True)
+    assert DataBase.UpdateRow(1, {'Name':"O'Neil", 'Val':2.25, 'D':datetime(2025, 6, 7, 8, 9, 10), 'Flag':True})
+    res = DataBase.SelectRowByID(1)
+    assert res.at[1, 'Name'] == "O'Neil"
+    assert res.at[1, 'Val'] == 2.25
+    assert res.at[1, 'D'] == datetime(2025, 6, 7, 8, 9, 10)
+    assert bool(res.at[1, 'Flag'])
+    assert res.at[1, 'Num'] == 1
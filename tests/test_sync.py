@@ -0,0 +1,94 @@
+"""UpdateDataBase（パラメータ化したexecutemanyでの同期）のテスト"""
+import pyodbc
+import pytest
+from DataBaseCtrl import DataBaseCtrl, DataRowState, Error
+
+
+def test_sync_writes_all_changes(db_path, table_name, fetch_rows):
+    """更新・追加・削除した行をバッチで書き込み、読み直す。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.UpdateRow(1, {'Name':'changed'})
+    assert DataBase.UpdateRow(2, {'Num':200})
+    assert DataBase.AddRow({'Name':'new', 'Num':70}, 7)
+    assert DataBase.DeleteRow(3)
+    assert DataBase.UpdateDataBase(batch_size=1)
+    assert DataBase.SyncStats['failed_ids'] == []
+    assert DataBase.SyncStats['batches'] == 4
+    assert DataBase.SyncStats['reloaded']
+    rows = fetch_rows(db_path)
+    assert rows[1] == ('changed', 10)
+    assert rows[2] == ('alice', 200)
+    assert rows[7] == ('new', 70)
+    assert not(3 in rows)
+    assert not(3 in DataBase.Int_DF.index)
+
+def test_sync_keeps_failed_row(db_path, table_name, fetch_rows):
+    """書き込めなかった行は内部データフレームに残し、読み直さない。他の行は書き込む。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    #他の書き込みが同じIDの行を先に追加する
+    conn = pyodbc.connect(f'DBQ={db_path}')
+    conn.execute(f"INSERT INTO {table_name} (ID, Name, Num) VALUES (7, 'other', 0)")
+    conn.commit()
+    conn.close()
+    assert DataBase.AddRow({'Name':'mine', 'Num':1}, 7)
+    assert DataBase.UpdateRow(2, {'Name':'changed'})
+    assert not(DataBase.UpdateDataBase())
+    assert DataBase.err == Error.SQL_EXECUTE_ERR
+    assert DataBase.SyncStats['failed_ids'] == [7]
+    assert not(DataBase.SyncStats['reloaded'])
+    assert DataBase.Int_DF.at[7, 'Name'] == 'mine'
+    assert DataBase.RowState_DF.at[7, 'RowState'] == DataRowState.Added
+    assert DataBase.RowState_DF.at[2, 'RowState'] == DataRowState.NotChange
+    rows = fetch_rows(db_path)
+    assert rows[2] == ('changed', 20)
+    assert rows[7] == ('other', 0)
+
+def test_failed_batch_is_bisected(make_db, table_name, fetch_rows):
+    """失敗したバッチだけを分割して実行し直し、失敗した行以外は書き込む。"""
+    path = make_db('ID LONG PRIMARY KEY, Name VARCHAR(50), Num LONG CHECK (Num >= 0)', [(i, 'n', i) for i in range(1, 21)])
+    DataBase = DataBaseCtrl(path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    for i in range(1, 21):
+        assert DataBase.UpdateRow(i, {'Num':-1 if i in (5, 13) else 100 + i})
+    for i in range(30, 40):
+        assert DataBase.AddRow({'Name':'a', 'Num':-1 if i == 33 else i}, i)
+    assert not(DataBase.UpdateDataBase(batch_size=8))
+    assert sorted(DataBase.SyncStats['failed_ids']) == [5, 13, 33]
+    assert DataBase.SyncStats['batch_rows'] + DataBase.SyncStats['fallback_rows'] == 27
+    assert DataBase.SyncStats['retries'] > 0
+    rows = fetch_rows(path)
+    assert rows[5] == ('n', 5)
+    assert rows[6] == ('n', 106)
+    assert rows[20] == ('n', 120)
+    assert not(33 in rows)
+    assert rows[39] == ('a', 39)
+    assert DataBase.RowState_DF.at[13, 'RowState'] == DataRowState.Updated
+    assert DataBase.RowState_DF.at[33, 'RowState'] == DataRowState.Added
+    #直してから再度同期すると書き込める
+    assert DataBase.UpdateRow(5, {'Num':5})
+    assert DataBase.UpdateRow(13, {'Num':13})
+    assert DataBase.UpdateRow(33, {'Num':33})
+    assert DataBase.UpdateDataBase()
+    assert fetch_rows(path)[33] == ('a', 33)
+
+def test_sync_without_reload(db_path, table_name, fetch_rows, monkeypatch):
+    """reload=Falseでは読み直さず、内部データフレームの行状態だけを同期済みにする。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.UpdateRow(1, {'Name':'changed'})
+    assert DataBase.AddRow({'Name':'new', 'Num':70}, 7)
+    assert DataBase.DeleteRow(3)
+    monkeypatch.setattr(DataBase, 'UpdateInternalDataFrame', lambda *args, **kwargs: pytest.fail('reloaded'))
+    assert DataBase.UpdateDataBase(reload=False)
+    assert not(DataBase.SyncStats['reloaded'])
+    assert (DataBase.RowState_DF['RowState'] == DataRowState.NotChange).all()
+    assert not(3 in DataBase.Int_DF.index)
+    assert not(3 in DataBase.RowState_DF.index)
+    assert DataBase.Int_DF.at[1, 'Name'] == 'changed'
+    assert DataBase.Int_DF.at[7, 'Name'] == 'new'
+    rows = fetch_rows(db_path)
+    assert rows[1] == ('changed', 10)
+    assert rows[7] == ('new', 70)
+    assert not(3 in rows)
@@ -0,0 +1,46 @@
+"""Transaction()（ダイレクトモードのコミットをまとめる）のテスト"""
+import pyodbc
+import pytest
+from DataBaseCtrl import DataBaseCtrl
+
+
+def test_transaction_batches_commits(db_path, table_name, fetch_rows):
+    """batch_size文毎とwithを抜ける時にコミットする。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    with DataBase.Transaction(batch_size=2) as stats:
+        for ID in range(1, 6):
+            assert DataBase.UpdateRow(ID, {'Num':ID * 100})
+    assert stats['statements'] == 5
+    assert stats['statements_per_commit'] == [2, 2, 1]
+    assert DataBase.TransactionStats['commits'] == 3
+    assert [fetch_rows(db_path)[ID][1] for ID in range(1, 6)] == [100, 200, 300, 400, 500]
+    with pytest.raises(ValueError):
+        with DataBase.Transaction(batch_size=0):
+            pass
+
+def test_transaction_rolls_back_on_exception(db_path, table_name, fetch_rows):
+    """with内の例外で、1文ずつの書き込みも一括書き込みも未コミットの文は全てロールバックする。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.SetReaderWriterMode(True)
+    before = fetch_rows(db_path)
+    with pytest.raises(RuntimeError):
+        with DataBase.Transaction() as stats:
+            assert DataBase.UpdateRow(1, {'Name':'changed'})
+            assert DataBase.UpdateRows({2:{'Num':200}, 3:{'Num':300}})
+            assert DataBase.DeleteRows([4])
+            assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'changed' #未コミットの変更が見える
+            raise RuntimeError('stop')
+    assert stats['rolled_back_statements'] == 4
+    assert fetch_rows(db_path) == before
+    assert DataBase.SelectRowByID(1).at[1, 'Name'] == 'Alice'
+
+def test_transaction_bulk_write_error_rolls_back(make_db, table_name, fetch_rows):
+    """Transaction()中の一括書き込みが失敗した場合はpyodbc.Errorを伝え、全体をロールバックする。"""
+    path = make_db('ID LONG PRIMARY KEY, Name VARCHAR(50), Num LONG CHECK (Num >= 0)', [(i, 'n', i) for i in range(1, 4)])
+    DataBase = DataBaseCtrl(path, table_name, True)
+    before = fetch_rows(path)
+    with pytest.raises(pyodbc.Error):
+        with DataBase.Transaction():
+            assert DataBase.UpdateRow(1, {'Name':'changed'})
+            DataBase.UpdateRows({2:{'Num':100}, 3:{'Num':-1}})
+    assert fetch_rows(path) == before
@@ -0,0 +1,40 @@
+"""UpdateRowByDataFrame()（複数行の変わったセルだけの更新）のテスト"""
+import pandas as pd
+from DataBaseCtrl import DataBaseCtrl, Error
+
+
+def test_update_changed_cells(db_path, table_name, fetch_rows):
+    """変わったセルだけを書き込み、NaNのセルは変えない。NULLのセルは変更とする。存在しないIDは無視する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    df = pd.DataFrame({'Name':['Alice', None, 'E', 'x'], 'Num':[100, 20, float('nan'), 1]}, index=[1, 2, 5, 99])
+    assert DataBase.UpdateRowByDataFrame(df, batch_size=1)
+    assert DataBase.SyncStats['rows'] == 4
+    assert DataBase.SyncStats['changed_rows'] == 2
+    assert DataBase.SyncStats['changed_cells'] == 2
+    rows = fetch_rows(db_path)
+    assert rows[1] == ('Alice', 100)
+    assert rows[2] == ('alice', 20)
+    assert rows[5] == ('E', 50)
+    assert not(99 in rows)
+    assert not(DataBase.UpdateRowByDataFrame(df))
+    assert DataBase.err == Error.NO_DATA_IN_TABLE
+
+def test_update_errors(make_db, table_name, fetch_rows):
+    """失敗した場合は全てのFalseでerrを設定し、何も書き込まない。"""
+    path = make_db('ID LONG PRIMARY KEY, Name VARCHAR(50), Num LONG CHECK (Num >= 0)', [(i, 'n', i) for i in range(1, 4)])
+    DataBase = DataBaseCtrl(path, table_name, True)
+    before = fetch_rows(path)
+    assert not(DataBase.UpdateRowByDataFrame(pd.DataFrame({'Num':[]})))
+    assert DataBase.err == Error.INVALID_INPUT
+    assert not(DataBase.UpdateRowByDataFrame(pd.DataFrame({'Nothing':[1]}, index=[1])))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert not(DataBase.UpdateRowByDataFrame(pd.DataFrame({'Num':['x']}, index=[1])))
+    assert DataBase.err == Error.DATA_TYPE_MISMATCH
+    assert not(DataBase.UpdateRowByDataFrame(pd.DataFrame({'Num':[1]}, index=[99])))
+    assert DataBase.err == Error.NO_ROW_EXIST
+    assert not(DataBase.UpdateRowByDataFrame(pd.DataFrame({'Num':[100, -1]}, index=[1, 2])))
+    assert DataBase.err == Error.SQL_EXECUTE_ERR
+    assert fetch_rows(path) == before
+    DataFrameMode = DataBaseCtrl(path, table_name, False)
+    assert not(DataFrameMode.UpdateRowByDataFrame(pd.DataFrame({'Num':[1]}, index=[1])))
+    assert DataFrameMode.err == Error.NOT_WORK_THIS_MODE
@@ -0,0 +1,43 @@
+"""UpdateRows()（複数行の指定した列だけの更新）のテスト"""
+from DataBaseCtrl import DataBaseCtrl, Error
+
+
+def test_update_rows_direct(db_path, table_name, fetch_rows):
+    """指定した列だけを書き込み、他の列は変えない。"""
+    DataBase = DataBaseCtrl(db_path, table_name, True)
+    assert DataBase.UpdateRows({1:{'Name':'A'}, 2:{'Num':200}, 3:{'Name':"C'", 'Num':300}}, CheckExist=True, batch_size=1)
+    assert DataBase.SyncStats['batches'] == 3
+    assert DataBase.SyncStats['missing_ids'] == []
+    rows = fetch_rows(db_path)
+    assert rows[1] == ('A', 10)
+    assert rows[2] == ('alice', 200)
+    assert rows[3] == ("C'", 300)
+    assert rows[4] == ('bobby', 40)
+
+def test_update_rows_writes_nothing_on_error(make_db, table_name, fetch_rows):
+    """データ型の不一致、存在しない行(CheckExist)、書き込みの失敗ではどの行も書き込まない。"""
+    path = make_db('ID LONG PRIMARY KEY, Name VARCHAR(50), Num LONG CHECK (Num >= 0)', [(i, 'n', i) for i in range(1, 6)])
+    DataBase = DataBaseCtrl(path, table_name, True)
+    before = fetch_rows(path)
+    assert not(DataBase.UpdateRows({1:{'Num':100}, 2:{'Num':'x'}}))
+    assert DataBase.err == Error.DATA_TYPE_MISMATCH
+    assert not(DataBase.UpdateRows({1:{'Nothing':1}}))
+    assert DataBase.err == Error.INVALID_COLUMN_NAME
+    assert not(DataBase.UpdateRows({1:{'Num':100}, 99:{'Num':1}}, CheckExist=True))
+    assert DataBase.err == Error.NO_ROW_EXIST
+    assert DataBase.SyncStats['missing_ids'] == [99]
+    assert not(DataBase.UpdateRows({i:{'Num':-1 if i == 4 else 100} for i in range(1, 6)}, batch_size=2))
+    assert DataBase.err == Error.SQL_EXECUTE_ERR
+    assert fetch_rows(path) == before
+
+def test_update_rows_dataframe(db_path, table_name):
+    """データフレームモードは内部データフレームの行を更新する。"""
+    DataBase = DataBaseCtrl(db_path, table_name, False)
+    assert DataBase.UpdateInternalDataFrame()
+    assert DataBase.UpdateRows({1:{'Name':'A'}, 2:{'Num':200}})
+    assert DataBase.Int_DF.at[1, 'Name'] == 'A'
+    assert DataBase.Int_DF.at[2, 'Num'] == 200
+    assert DataBase.UpdatedIDs == {1, 2}
+    assert not(DataBase.UpdateRows({1:{'Name':'B'}, 99:{'Name':'x'}}))
+    assert DataBase.err == Error.NO_ROW_EXIST
+    assert DataBase.Int_DF.at[1, 'Name'] == 'A'